@@ -87,6 +87,7 @@ wss.on('connection', (ws) => {
             // Get the last 50 tokens from the database
             const tokens = await db.all(`
               SELECT * FROM scan_records 
+              WHERE status != 'reorged'
               ORDER BY scan_timestamp DESC 
               LIMIT 50
             `);
@@ -204,6 +205,7 @@ async function checkForNewTokens() {
     updateStatus('Checking for new tokens...', 'blue');
     const latestToken = await db.get(`
       SELECT * FROM scan_records 
+      WHERE status != 'reorged'
       ORDER BY scan_timestamp DESC 
       LIMIT 1
     `);
@@ -384,28 +386,6 @@ function broadcastNewToken(token) {
       lastError: token.last_error,
       status: token.status,
       
-      // Liquidity history
-      liq10: token.liq10,
-      liq20: token.liq20,
-      liq30: token.liq30,
-      liq40: token.liq40,
-      liq50: token.liq50,
-      liq60: token.liq60,
-      liq70: token.liq70,
-      liq80: token.liq80,
-      liq90: token.liq90,
-      liq100: token.liq100,
-      liq110: token.liq110,
-      liq120: token.liq120,
-      liq130: token.liq130,
-      liq140: token.liq140,
-      liq150: token.liq150,
-      liq160: token.liq160,
-      liq170: token.liq170,
-      liq180: token.liq180,
-      liq190: token.liq190,
-      liq200: token.liq200,
-      
       // Scan info
       scanTimestamp: token.scan_timestamp
     }
@@ -430,6 +410,7 @@ app.post('/api/test/new-token', async (req, res) => {
     // Get the most recent token from scan_records
     const token = await db.get(`
       SELECT * FROM scan_records 
+      WHERE status != 'reorged'
       ORDER BY scan_timestamp DESC 
       LIMIT 1
     `);
@@ -470,6 +451,7 @@ app.get('/api/tokens', async (req, res) => {
     const tokens = await db.all(`
       SELECT *
       FROM scan_records
+      WHERE status != 'reorged'
       ORDER BY scan_timestamp DESC
     `);
     
@@ -618,28 +600,6 @@ app.get('/api/tokens', async (req, res) => {
           lastError: token.last_error,
           status: token.status,
           
-          // Liquidity history
-          liq10: token.liq10,
-          liq20: token.liq20,
-          liq30: token.liq30,
-          liq40: token.liq40,
-          liq50: token.liq50,
-          liq60: token.liq60,
-          liq70: token.liq70,
-          liq80: token.liq80,
-          liq90: token.liq90,
-          liq100: token.liq100,
-          liq110: token.liq110,
-          liq120: token.liq120,
-          liq130: token.liq130,
-          liq140: token.liq140,
-          liq150: token.liq150,
-          liq160: token.liq160,
-          liq170: token.liq170,
-          liq180: token.liq180,
-          liq190: token.liq190,
-          liq200: token.liq200,
-          
           // Scan info
           scanTimestamp: token.scan_timestamp
         };
@@ -664,7 +624,7 @@ app.get('/api/tokens/:address', async (req, res) => {
   try {
     const token = await db.get(`
       SELECT * FROM scan_records
-      WHERE token_address = ?
+      WHERE token_address = ? AND status != 'reorged'
     `, [address]);
     
     if (token) {
@@ -681,7 +641,7 @@ app.get('/api/tokens/:address', async (req, res) => {
 // Debug endpoint to show raw database records
 app.get('/api/debug/records', async (req, res) => {
   try {
-    const records = await db.all('SELECT * FROM scan_records');
+    const records = await db.all("SELECT * FROM scan_records WHERE status != 'reorged'");
     res.setHeader('Content-Type', 'application/json');
     res.send(JSON.stringify(records, null, 2));
   } catch (err) {
@@ -699,7 +659,7 @@ app.get('/api/tokens/:address/history', async (req, res) => {
   try {
     // Find token in scan_records
     const token = await db.get(
-      'SELECT token_name, token_address FROM scan_records WHERE LOWER(token_address) = LOWER(?)',
+      "SELECT token_name, token_address FROM scan_records WHERE LOWER(token_address) = LOWER(?) AND status != 'reorged'",
       [address]
     );
     console.log('Token found in scan_records:', token);
@@ -708,67 +668,46 @@ app.get('/api/tokens/:address/history', async (req, res) => {
       return res.status(404).json({ error: 'Token not found' });
     }
 
-    // Find matching history table
-    const tables = await db.all(
-      "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE ?",
-      [`%${address.toLowerCase()}%`]
-    );
-    console.log('Found tables with matching address:', tables);
-
-    if (tables.length === 0) {
-      return res.status(404).json({ error: 'No history table found for token' });
+    // Liquidity samples are an index range scan on (token_address, ts)
+    let samples = [];
+    try {
+      samples = await db.all(`
+        SELECT ts, scan_no, liquidity, reserves0, reserves1
+        FROM liquidity_samples
+        WHERE token_address = ?
+        ORDER BY ts ASC
+      `, [token.token_address]);
+    } catch (e) {
+      // Sessions recorded before liquidity_samples existed
+      console.log('No liquidity_samples table:', e.message);
     }
+    console.log('Liquidity samples found:', samples.length);
 
-    const historyTable = tables[0].name;
-    console.log('Using history table:', historyTable);
-
-    // First get table info to see what columns exist
-    const tableInfo = await db.all(`PRAGMA table_info("${historyTable}")`);
-    console.log('Table structure:', tableInfo);
-
-    // Build query based on available columns
-    const hasHPLiquidity = tableInfo.some(col => col.name === 'hp_liquidity_amount');
-    const hasGPLiquidity = tableInfo.some(col => col.name === 'gp_dex_info');
-    const hasTimestamp = tableInfo.some(col => col.name === 'scan_timestamp');
-    const hasHolderCount = tableInfo.some(col => col.name === 'gp_holder_count');
-    const hasLpHolderCount = tableInfo.some(col => col.name === 'gp_lp_holder_count');
-
-    if (!hasTimestamp) {
-      throw new Error('Table is missing required timestamp column');
+    // Per-scan rows (GoPlus liquidity and holder counts), a primary key range scan
+    const historyTable = 'scan_history';
+    let history = [];
+    try {
+      history = await db.all(`
+        SELECT scan_timestamp, hp_liquidity_amount, gp_dex_info, gp_holder_count, gp_lp_holder_count
+        FROM scan_history
+        WHERE token_address = ?
+        ORDER BY scan_timestamp ASC
+      `, [token.token_address]);
+    } catch (e) {
+      // Session not opened by the scanner since scan_history was introduced
+      console.log('No scan_history table:', e.message);
     }
+    console.log('Scan history rows found:', history.length);
 
-    let selectClauses = ['scan_timestamp'];
-    if (hasHPLiquidity) selectClauses.push('hp_liquidity_amount');
-    if (hasGPLiquidity) selectClauses.push('gp_dex_info');
-    if (hasHolderCount) selectClauses.push('gp_holder_count');
-    if (hasLpHolderCount) selectClauses.push('gp_lp_holder_count');
-
-    // Query history data
-    const query = `
-      SELECT ${selectClauses.join(', ')}
-      FROM "${historyTable}"
-      ORDER BY scan_timestamp ASC
-    `;
-    console.log('Executing query:', query);
-
-    const history = await db.all(query);
-    console.log('Raw history data:', history);
-    
-    if (!history || history.length === 0) {
+    if (samples.length === 0 && history.length === 0) {
       return res.status(404).json({ error: 'No liquidity history available' });
     }
 
-    // Transform data for chart
-    const chartData = history.map(record => {
+    // Per-scan details in timestamp (ms) order
+    const scanDetails = new Map();
+    history.forEach(record => {
       const timestamp = new Date(record.scan_timestamp).getTime(); // Convert to Unix timestamp in ms
-      let hpLiquidity = 0;
       let gpLiquidity = 0;
-      let holderCount = record.gp_holder_count || 0;
-      let lpHolderCount = record.gp_lp_holder_count || 0;
-
-      if (record.hp_liquidity_amount) {
-        hpLiquidity = parseFloat(record.hp_liquidity_amount);
-      }
 
       if (record.gp_dex_info) {
         try {
@@ -781,21 +720,51 @@ app.get('/api/tokens/:address/history', async (req, res) => {
         }
       }
 
-      return {
-        timestamp,
-        hpLiquidity,
+      scanDetails.set(timestamp, {
+        hpLiquidity: record.hp_liquidity_amount ? parseFloat(record.hp_liquidity_amount) : 0,
         gpLiquidity,
-        totalLiquidity: hpLiquidity + gpLiquidity,
-        holderCount,
-        lpHolderCount
-      };
-    }).filter(point => !isNaN(point.hpLiquidity) || !isNaN(point.gpLiquidity));
+        holderCount: record.gp_holder_count || 0,
+        lpHolderCount: record.gp_lp_holder_count || 0
+      });
+    });
+
+    // Transform data for chart: samples drive the series, older sessions fall back to the scan rows.
+    // Light-rescan and Sync samples have no scan row of their own,
+    // so each sample carries the GoPlus values of the latest scan row at or before it.
+    const scanEntries = Array.from(scanDetails.entries());
+    let scanIndex = 0;
+    let latestDetails = {};
+    const points = samples.length > 0
+      ? samples.map(sample => {
+          const timestamp = sample.ts * 1000;
+          while (scanIndex < scanEntries.length && scanEntries[scanIndex][0] <= timestamp) {
+            latestDetails = scanEntries[scanIndex][1];
+            scanIndex++;
+          }
+          return {
+            timestamp,
+            scanNo: sample.scan_no,
+            hpLiquidity: parseFloat(sample.liquidity) || 0,
+            gpLiquidity: latestDetails.gpLiquidity || 0,
+            holderCount: latestDetails.holderCount || 0,
+            lpHolderCount: latestDetails.lpHolderCount || 0,
+            reserves0: sample.reserves0,
+            reserves1: sample.reserves1
+          };
+        })
+      : Array.from(scanDetails.entries()).map(([timestamp, details]) => ({ timestamp, ...details }));
+
+    const chartData = points.map(point => ({
+      ...point,
+      totalLiquidity: point.hpLiquidity + point.gpLiquidity
+    })).filter(point => !isNaN(point.hpLiquidity) || !isNaN(point.gpLiquidity));
 
     console.log('Transformed chart data:', chartData);
 
     // Add debug info to the response
     const debugInfo = {
       tableName: historyTable,
+      sampleCount: samples.length,
       recordCount: history.length,
       highestLiquidity: Math.max(...chartData.map(d => d.totalLiquidity)),
       lowestLiquidity: Math.min(...chartData.map(d => d.totalLiquidity)),
@@ -807,6 +776,7 @@ app.get('/api/tokens/:address/history', async (req, res) => {
 
     console.log('\n=== Chart Debug Info ===');
     console.log('Table name:', debugInfo.tableName);
+    console.log('Number of samples:', debugInfo.sampleCount);
     console.log('Number of records:', debugInfo.recordCount);
     console.log('Highest liquidity:', debugInfo.highestLiquidity);
     console.log('Lowest liquidity:', debugInfo.lowestLiquidity);
@@ -831,6 +801,7 @@ async function printLatestRecord() {
     // Get the most recent record
     const latestRecord = await db.get(`
       SELECT * FROM scan_records 
+      WHERE status != 'reorged'
       ORDER BY scan_timestamp DESC 
       LIMIT 1
     `);
@@ -973,39 +944,26 @@ async function testDataRetrieval() {
   console.log('\n=== Testing Data Retrieval ===');
   try {
     // Get a sample token from scan_records
-    const sampleToken = await db.get('SELECT token_address FROM scan_records LIMIT 1');
+    const sampleToken = await db.get("SELECT token_address FROM scan_records WHERE status != 'reorged' LIMIT 1");
     if (!sampleToken) {
       console.log('No tokens found in scan_records');
       return;
     }
     console.log('Sample token address:', sampleToken.token_address);
 
-    // Find the history table for this token
-    const tables = await db.all(
-      "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE ?",
-      [`%${sampleToken.token_address.toLowerCase()}%`]
-    );
-    console.log('Found tables:', tables);
-
-    if (tables.length === 0) {
-      console.log('No history table found for token');
-      return;
-    }
-
-    const historyTable = tables[0].name;
-    console.log('Using history table:', historyTable);
-
-    // Get table structure
-    const tableInfo = await db.all(`PRAGMA table_info("${historyTable}")`);
-    console.log('Table columns:', tableInfo.map(col => col.name));
-
-    // Query the last 5 records
+    // Query the last 5 history records for this token
     const records = await db.all(`
       SELECT scan_timestamp, hp_liquidity_amount, gp_dex_info
-      FROM "${historyTable}"
+      FROM scan_history
+      WHERE token_address = ?
       ORDER BY scan_timestamp DESC
       LIMIT 5
-    `);
+    `, [sampleToken.token_address]);
+
+    if (records.length === 0) {
+      console.log('No scan history found for token');
+      return;
+    }
 
     console.log('\nSample records:');
     records.forEach(record => {
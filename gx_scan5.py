@@ -3,7 +3,6 @@ import os
 import sys
 import json
 import copy
-import time
 import asyncio
 import sqlite3
 import threading
@@ -22,7 +21,7 @@ from rich.console import Console
 from rich.table import Table
 
 from terminal_display import console, create_pair_table, create_security_table, log_message
-from api_wrapper import api_wrapper
+from api_wrapper import api_wrapper, goplus_cacheable
 from api_tracker import api_tracker
 
 # Initialize colorama
@@ -293,8 +292,6 @@ class TokenChecker:
         self.web3 = Web3(HTTPProvider(self.tracker.config.node_rpc))
         self.logger = tracker.logger
         self.config = tracker.config
-        self.goplus_cache = {}
-        self.cache_duration = 300
         self.ensure_database_ready()
 
     def ensure_database_ready(self):
@@ -349,35 +346,29 @@ class TokenChecker:
         """Retrieve GoPlus security data"""
         state = self.state_manager.get_state()
         try:
-            # Use configured delays
-            await asyncio.sleep(state['config']['api_delays']['goplus_base'])
-            
-            # Check cache first
-            if token_address in self.goplus_cache:
-                cached_data = self.goplus_cache[token_address]
-                if time.time() - cached_data['timestamp'] < self.cache_duration:
-                    return cached_data['data']
+            async def fetch():
+                # Configured delay, paid only by real API calls
+                await asyncio.sleep(state['config']['api_delays']['goplus_base'])
+                url = f"https://api.gopluslabs.io/api/v1/token_security/1?contract_addresses={token_address}"
+                async with api_wrapper.get(url) as response:
+                    if response.status != 200:
+                        raise Exception(f"GoPlus API error: {response.status}")
+                    
+                    data = await response.json()
+                    
+                    # Update API stats
+                    self.state_manager.update_runtime({
+                        'api_stats': {
+                            'goplus_calls': state['runtime']['api_stats']['goplus_calls'] + 1
+                        }
+                    })
+                    
+                    return data
             
-            # API call
-            url = f"https://api.gopluslabs.io/api/v1/token_security/1?contract_addresses={token_address}"
-            async with api_wrapper.get(url) as response:
-                if response.status != 200:
-                    raise Exception(f"GoPlus API error: {response.status}")
-                
-                data = await response.json()
-                self.goplus_cache[token_address] = {
-                    'data': data,
-                    'timestamp': time.time()
-                }
-                
-                # Update API stats
-                self.state_manager.update_runtime({
-                    'api_stats': {
-                        'goplus_calls': state['runtime']['api_stats']['goplus_calls'] + 1
-                    }
-                })
-                
-                return data
+            # Served from the shared response cache when fresh (or stale and being refreshed)
+            return await api_wrapper.cache.get_or_fetch(
+                "goplus", token_address.lower(), fetch, cacheable=goplus_cacheable(token_address)
+            )
             
         except Exception as e:
             log_message(f"GoPlus API error: {str(e)}", "ERROR")
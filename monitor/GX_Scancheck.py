@@ -1,8 +1,6 @@
-# API Delay Settings
-# These delays help prevent rate limiting and ensure stable API operation
-GOPLUS_BASE_DELAY = 5  # Initial delay before first GoPlus API call (reduced from 30)
-GOPLUS_RETRY_DELAY = 25  # Delay between GoPlus API retries on failure (reduced from 120)
-HONEYPOT_BASE_DELAY = 5  # Delay before Honeypot API call (reduced from 10)
+# API Rate Limits
+# Upstream quotas (GoPlus, Honeypot.is, Infura) are enforced by the shared token-bucket
+# scheduler in rate_limiter.py and can be tuned under "rate_limits" in config.json
 
 # Debug Output Settings
 # Control what information is displayed during program execution
@@ -26,10 +24,54 @@ TOKEN_KICK_CONDITIONS = {
     'CHECK_INTERVAL': 300          # Seconds between condition checks
 }
 
+# Liquidity Sample Downsampling
+# Samples are kept forever; older ones are thinned to one per bucket
+LIQUIDITY_DOWNSAMPLING = {
+    'INTERVAL': 3600,              # Seconds between downsampling passes
+    'TIERS': [
+        (24, 900),                 # Older than 24 hours: one sample per 15 minutes
+        (168, 3600)                # Older than 7 days: one sample per hour
+    ]
+}
+
+# scan_records columns in the order process_token builds its values
+SCAN_RECORD_COLUMNS = (
+    "token_address", "scan_timestamp", "pair_address", "token_name", "token_symbol",
+    "token_decimals", "token_total_supply", "token_age_hours",
+    "hp_simulation_success", "hp_buy_tax", "hp_sell_tax", "hp_transfer_tax",
+    "hp_liquidity_amount", "hp_pair_reserves0", "hp_pair_reserves1",
+    "hp_buy_gas_used", "hp_sell_gas_used", "hp_creation_time",
+    "hp_holder_count", "hp_is_honeypot", "hp_honeypot_reason",
+    "hp_is_open_source", "hp_is_proxy", "hp_is_mintable", "hp_can_be_minted",
+    "hp_owner_address", "hp_creator_address", "hp_deployer_address",
+    "hp_has_proxy_calls", "hp_pair_liquidity", "hp_pair_liquidity_token0",
+    "hp_pair_liquidity_token1", "hp_pair_token0_symbol", "hp_pair_token1_symbol",
+    "hp_flags",
+    # GoPlus columns
+    "gp_is_open_source", "gp_is_proxy", "gp_is_mintable",
+    "gp_owner_address", "gp_creator_address", "gp_can_take_back_ownership",
+    "gp_owner_change_balance", "gp_hidden_owner", "gp_selfdestruct",
+    "gp_external_call", "gp_buy_tax", "gp_sell_tax", "gp_is_anti_whale",
+    "gp_anti_whale_modifiable", "gp_cannot_buy", "gp_cannot_sell_all",
+    "gp_slippage_modifiable", "gp_personal_slippage_modifiable",
+    "gp_trading_cooldown", "gp_is_blacklisted", "gp_is_whitelisted",
+    "gp_is_in_dex", "gp_transfer_pausable", "gp_can_be_minted",
+    "gp_total_supply", "gp_holder_count", "gp_owner_percent",
+    "gp_owner_balance", "gp_creator_percent", "gp_creator_balance",
+    "gp_lp_holder_count", "gp_lp_total_supply", "gp_is_true_token",
+    "gp_is_airdrop_scam", "gp_trust_list", "gp_other_potential_risks",
+    "gp_note", "gp_honeypot_with_same_creator", "gp_fake_token",
+    "gp_holders", "gp_lp_holders", "gp_dex_info",
+    # Metadata columns
+    "total_scans", "honeypot_failures", "last_error", "status"
+)
+
+# Rewritten on every scan; any other column is only written when its value changed
+ALWAYS_WRITTEN_COLUMNS = ('scan_timestamp', 'total_scans')
+
 import asyncio
 import time
 import aiohttp
-from web3 import Web3, HTTPProvider
 from web3.exceptions import TransactionNotFound, ContractLogicError
 from typing import Dict, Optional, Tuple, List, Any
 from datetime import datetime, timedelta 
@@ -37,6 +79,7 @@ import sqlite3
 import json
 import logging
 import os
+import re
 import sys
 import threading
 import traceback
@@ -50,6 +93,14 @@ from rich.table import Table
 from terminal_display import console, create_pair_table, create_security_table, log_message
 from api_wrapper import api_wrapper
 from api_tracker import api_tracker
+from worker_pool import TokenWorkerPool
+from rate_limiter import rate_scheduler
+from session_db import get_session_db, WriteBehindBuffer
+from sync_tracker import SyncTracker
+from backfill import LogBackfill
+from block_time import BlockTimeResolver
+from pair_stream import PairEventLog, PairCreatedPoller
+from normalizer import normalize_honeypot, normalize_goplus, goplus_token_data
 
 init(autoreset=True)  # Initialize colorama
 
@@ -157,27 +208,7 @@ def initialize_database_structure(folder_name: str) -> None:
                     total_scans INTEGER DEFAULT 1,
                     honeypot_failures INTEGER DEFAULT 0,
                     last_error TEXT,
-                    status TEXT DEFAULT 'new',
-                    liq10 REAL,
-                    liq20 REAL,
-                    liq30 REAL,
-                    liq40 REAL,
-                    liq50 REAL,
-                    liq60 REAL,
-                    liq70 REAL,
-                    liq80 REAL,
-                    liq90 REAL,
-                    liq100 REAL,
-                    liq110 REAL,
-                    liq120 REAL,
-                    liq130 REAL,
-                    liq140 REAL,
-                    liq150 REAL,
-                    liq160 REAL,
-                    liq170 REAL,
-                    liq180 REAL,
-                    liq190 REAL,
-                    liq200 REAL
+                    status TEXT DEFAULT 'new'
                 )''')
                 
                 # Create indexes
@@ -388,420 +419,396 @@ def format_table_output(goplus_data: dict) -> None:
         print(json.dumps(dex_info, indent=2))
 
 
-def prepare_goplus_values(self, goplus_data: dict, token_address: str) -> tuple:
-    """
-    Helper function to properly extract and validate GoPlus API values
-    
-    Args:
-        goplus_data: Raw API response from GoPlus
-        token_address: Token contract address
-        
-    Returns:
-        Tuple of validated and formatted values for database storage
-    """
-    # Initialize token_data with empty dict if not found
-    token_data = {}
-    
-    # Check if we have valid response data
-    if isinstance(goplus_data, dict) and 'result' in goplus_data:
-        # Try both lowercase and original address
-        token_data = (goplus_data['result'].get(token_address.lower()) or 
-                     goplus_data['result'].get(token_address) or {})
-
-    def safe_int_bool(value):
-        """Safely convert string to int boolean (0 or 1)"""
-        if isinstance(value, bool):
-            return 1 if value else 0
-        try:
-            return 1 if str(value).strip() == '1' else 0
-        except:
-            return 0
-    
-    def safe_float(value, default=0.0):
-        """Safely convert string to float"""
-        if value is None:
-            return default
-        try:
-            if isinstance(value, (int, float)):
-                return float(value)
-            cleaned = str(value).replace('%', '').strip()
-            return float(cleaned) if cleaned else default
-        except:
-            return default
-
-    def safe_str(value, default=''):
-        """Safely convert value to string"""
-        return str(value) if value is not None else default
-    
-    def safe_int(value, default=0):
-        """Safely convert value to integer"""
-        if value is None:
-            return default
-        try:
-            if isinstance(value, str):
-                cleaned = ''.join(c for c in value if c.isdigit() or c == '.')
-                return int(float(cleaned)) if cleaned else default
-            return int(float(str(value)))
-        except:
-            return default
-
-    # Return tuple with safe default values if data is missing
-    return (
-        safe_int_bool(token_data.get('is_open_source')),
-        safe_int_bool(token_data.get('is_proxy')),
-        safe_int_bool(token_data.get('is_mintable')),
-        safe_str(token_data.get('owner_address')),
-        safe_str(token_data.get('creator_address')),
-        safe_int_bool(token_data.get('can_take_back_ownership')),
-        safe_int_bool(token_data.get('owner_change_balance')),
-        safe_int_bool(token_data.get('hidden_owner')),
-        safe_int_bool(token_data.get('selfdestruct')),
-        safe_int_bool(token_data.get('external_call')),
-        safe_float(token_data.get('buy_tax')),
-        safe_float(token_data.get('sell_tax')),
-        safe_int_bool(token_data.get('is_anti_whale')),
-        safe_int_bool(token_data.get('anti_whale_modifiable')),
-        safe_int_bool(token_data.get('cannot_buy')),
-        safe_int_bool(token_data.get('cannot_sell_all')),
-        safe_int_bool(token_data.get('slippage_modifiable')),
-        safe_int_bool(token_data.get('personal_slippage_modifiable')),
-        safe_int_bool(token_data.get('trading_cooldown')),
-        safe_int_bool(token_data.get('is_blacklisted')),
-        safe_int_bool(token_data.get('is_whitelisted')),
-        safe_int_bool(token_data.get('is_in_dex')),
-        safe_int_bool(token_data.get('transfer_pausable')),
-        safe_int_bool(token_data.get('can_be_minted')),
-        safe_str(token_data.get('total_supply', '0')),
-        safe_int(token_data.get('holder_count')),
-        safe_float(token_data.get('owner_percent')),
-        safe_str(token_data.get('owner_balance', '0')),
-        safe_float(token_data.get('creator_percent')),
-        safe_str(token_data.get('creator_balance', '0')),
-        safe_int(token_data.get('lp_holder_count')),
-        safe_str(token_data.get('lp_total_supply', '0')),
-        safe_int_bool(token_data.get('is_true_token')),
-        safe_int_bool(token_data.get('is_airdrop_scam')),
-        json.dumps(token_data.get('trust_list', {})),
-        json.dumps(token_data.get('other_potential_risks', [])),
-        safe_str(token_data.get('note')),
-        safe_int_bool(token_data.get('honeypot_with_same_creator')),
-        safe_int_bool(token_data.get('fake_token')),
-        json.dumps(token_data.get('holders', [])),
-        json.dumps(token_data.get('lp_holders', [])),
-        json.dumps(token_data.get('dex', []))
-    )
-
-
 class TokenChecker:
-    def __init__(self, tracker: TokenTracker, folder_name: str):
+    def __init__(self, tracker: TokenTracker, folder_name: str, scanning: Optional[Dict] = None):
+        """
+        Args:
+            tracker: Token tracker (web3, contracts, logger)
+            folder_name: Session folder holding the database
+            scanning: Scanning section of config.json (write-behind and rescan settings)
+        """
+        scanning = scanning or {}
         self.tracker = tracker
         self.folder_name = folder_name
-        self.web3 = Web3(HTTPProvider(self.tracker.config.node_rpc))
         self.logger = tracker.logger
         self.config = tracker.config
-        self.goplus_cache = {}  # Cache for GoPlus API responses
-        self.cache_duration = 300  # Cache duration in seconds (5 minutes)
+        self.worker_pool = None  # Set by TokenTrackerMain so rescans share the worker pool
+        self.db = get_session_db(folder_name)  # Long-lived WAL connections + writer thread
+        self.write_behind = WriteBehindBuffer(  # Groups scan upserts into batched transactions
+            self.db,
+            batch_size=scanning.get('write_batch_size', 100),
+            flush_interval=scanning.get('write_flush_interval', 1.0),
+            max_pending=scanning.get('write_max_pending', 1000)
+        )
+        self.last_downsample = 0.0
+        self.rescan_config = scanning
+        self.reserve_baseline = {}  # token address (lowercase) -> WETH reserve at last full scan
         self.ensure_database_ready()
 
     def ensure_database_ready(self):
         """Ensure database and tables exist before operations"""
-        db_path = os.path.join(self.folder_name, 'scan_records.db')
-        
-        # Ensure directory exists
-        os.makedirs(self.folder_name, exist_ok=True)
-        
         try:
-            with sqlite3.connect(db_path) as db:
-                cursor = db.cursor()
-                
-                # Create HONEYPOTS table
-                cursor.execute('''
-                CREATE TABLE IF NOT EXISTS HONEYPOTS (
-                    token_address TEXT PRIMARY KEY,
-                    removal_timestamp TEXT NOT NULL,
-                    original_scan_timestamp TEXT,
-                    token_name TEXT,
-                    token_symbol TEXT,
-                    token_decimals INTEGER,
-                    token_total_supply TEXT,
-                    token_pair_address TEXT,
-                    token_age_hours REAL,
-                    hp_simulation_success INTEGER,
-                    hp_buy_tax REAL,
-                    hp_sell_tax REAL,
-                    hp_transfer_tax REAL,
-                    hp_liquidity_amount REAL,
-                    hp_pair_reserves0 TEXT,
-                    hp_pair_reserves1 TEXT,
-                    hp_buy_gas_used INTEGER,
-                    hp_sell_gas_used INTEGER,
-                    hp_creation_time TEXT,
-                    hp_holder_count INTEGER,
-                    hp_is_honeypot INTEGER,
-                    hp_honeypot_reason TEXT,
-                    total_scans INTEGER,
-                    honeypot_failures INTEGER,
-                    last_error TEXT,
-                    removal_reason TEXT
-                )''')
-                
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_honeypot_timestamp ON HONEYPOTS(removal_timestamp)')
-                
-                # Create scan_records table if it doesn't exist
-                cursor.execute('''
-                CREATE TABLE IF NOT EXISTS scan_records (
-                    token_address TEXT PRIMARY KEY,
-                    scan_timestamp TEXT NOT NULL,
-                    pair_address TEXT,
-                    token_name TEXT,
-                    token_symbol TEXT,
-                    token_decimals INTEGER,
-                    token_total_supply TEXT,
-                    token_age_hours REAL,
-                    hp_simulation_success INTEGER,
-                    hp_buy_tax REAL,
-                    hp_sell_tax REAL,
-                    hp_transfer_tax REAL,
-                    hp_liquidity_amount REAL,
-                    hp_pair_reserves0 TEXT,
-                    hp_pair_reserves1 TEXT,
-                    hp_buy_gas_used INTEGER,
-                    hp_sell_gas_used INTEGER,
-                    hp_creation_time TEXT,
-                    hp_holder_count INTEGER,
-                    hp_is_honeypot INTEGER,
-                    hp_honeypot_reason TEXT,
-                    hp_is_open_source INTEGER,
-                    hp_is_proxy INTEGER,
-                    hp_is_mintable INTEGER,
-                    hp_can_be_minted INTEGER,
-                    hp_owner_address TEXT,
-                    hp_creator_address TEXT,
-                    hp_deployer_address TEXT,
-                    hp_has_proxy_calls INTEGER,
-                    hp_pair_liquidity REAL,
-                    hp_pair_liquidity_token0 REAL,
-                    hp_pair_liquidity_token1 REAL,
-                    hp_pair_token0_symbol TEXT,
-                    hp_pair_token1_symbol TEXT,
-                    hp_flags TEXT,
-                    gp_is_open_source INTEGER,
-                    gp_is_proxy INTEGER,
-                    gp_is_mintable INTEGER,
-                    gp_owner_address TEXT,
-                    gp_creator_address TEXT,
-                    gp_can_take_back_ownership INTEGER,
-                    gp_owner_change_balance INTEGER,
-                    gp_hidden_owner INTEGER,
-                    gp_selfdestruct INTEGER,
-                    gp_external_call INTEGER,
-                    gp_buy_tax REAL,
-                    gp_sell_tax REAL,
-                    gp_is_anti_whale INTEGER,
-                    gp_anti_whale_modifiable INTEGER,
-                    gp_cannot_buy INTEGER,
-                    gp_cannot_sell_all INTEGER,
-                    gp_slippage_modifiable INTEGER,
-                    gp_personal_slippage_modifiable INTEGER,
-                    gp_trading_cooldown INTEGER,
-                    gp_is_blacklisted INTEGER,
-                    gp_is_whitelisted INTEGER,
-                    gp_is_in_dex INTEGER,
-                    gp_transfer_pausable INTEGER,
-                    gp_can_be_minted INTEGER,
-                    gp_total_supply TEXT,
-                    gp_holder_count INTEGER,
-                    gp_owner_percent REAL,
-                    gp_owner_balance TEXT,
-                    gp_creator_percent REAL,
-                    gp_creator_balance TEXT,
-                    gp_lp_holder_count INTEGER,
-                    gp_lp_total_supply TEXT,
-                    gp_is_true_token INTEGER,
-                    gp_is_airdrop_scam INTEGER,
-                    gp_trust_list TEXT,
-                    gp_other_potential_risks TEXT,
-                    gp_note TEXT,
-                    gp_honeypot_with_same_creator INTEGER,
-                    gp_fake_token INTEGER,
-                    gp_holders TEXT,
-                    gp_lp_holders TEXT,
-                    gp_dex_info TEXT,
-                    total_scans INTEGER DEFAULT 1,
-                    honeypot_failures INTEGER DEFAULT 0,
-                    last_error TEXT,
-                    status TEXT DEFAULT 'new',
-                    liq10 REAL,
-                    liq20 REAL,
-                    liq30 REAL,
-                    liq40 REAL,
-                    liq50 REAL,
-                    liq60 REAL,
-                    liq70 REAL,
-                    liq80 REAL,
-                    liq90 REAL,
-                    liq100 REAL,
-                    liq110 REAL,
-                    liq120 REAL,
-                    liq130 REAL,
-                    liq140 REAL,
-                    liq150 REAL,
-                    liq160 REAL,
-                    liq170 REAL,
-                    liq180 REAL,
-                    liq190 REAL,
-                    liq200 REAL
-                )''')
-                
-                # Create token_tables table to track token-specific tables
-                cursor.execute('''
-                CREATE TABLE IF NOT EXISTS token_tables (
-                    table_name TEXT PRIMARY KEY,
-                    token_address TEXT NOT NULL,
-                    token_name TEXT,
-                    created_at TEXT NOT NULL
-                )''')
-                
-                db.commit()
-                print(f"Verified database tables exist in {self.folder_name}")
+            self.db.write_sync(self.create_schema)
+            print(f"Verified database tables exist in {self.folder_name}")
         except sqlite3.Error as e:
             print(f"Database error during table verification: {str(e)}")
             raise
 
-    def create_token_specific_table(self, db, token_address: str, token_name: str, token_table_name: str):
-        """Create a token-specific table if it doesn't exist"""
-        try:
-            cursor = db.cursor()
-            
-            # First check if table already exists
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (token_table_name,))
-            if cursor.fetchone() is None:
-                # Create the token-specific table with the same schema as scan_records
-                cursor.execute(f"""
-                CREATE TABLE IF NOT EXISTS {token_table_name} (
-                    token_address TEXT,
-                    scan_timestamp TEXT NOT NULL,
-                    pair_address TEXT,
-                    token_name TEXT,
-                    token_symbol TEXT,
-                    token_decimals INTEGER,
-                    token_total_supply TEXT,
-                    token_age_hours REAL,
-                    hp_simulation_success INTEGER,
-                    hp_buy_tax REAL,
-                    hp_sell_tax REAL,
-                    hp_transfer_tax REAL,
-                    hp_liquidity_amount REAL,
-                    hp_pair_reserves0 TEXT,
-                    hp_pair_reserves1 TEXT,
-                    hp_buy_gas_used INTEGER,
-                    hp_sell_gas_used INTEGER,
-                    hp_creation_time TEXT,
-                    hp_holder_count INTEGER,
-                    hp_is_honeypot INTEGER,
-                    hp_honeypot_reason TEXT,
-                    hp_is_open_source INTEGER,
-                    hp_is_proxy INTEGER,
-                    hp_is_mintable INTEGER,
-                    hp_can_be_minted INTEGER,
-                    hp_owner_address TEXT,
-                    hp_creator_address TEXT,
-                    hp_deployer_address TEXT,
-                    hp_has_proxy_calls INTEGER,
-                    hp_pair_liquidity REAL,
-                    hp_pair_liquidity_token0 REAL,
-                    hp_pair_liquidity_token1 REAL,
-                    hp_pair_token0_symbol TEXT,
-                    hp_pair_token1_symbol TEXT,
-                    hp_flags TEXT,
-                    gp_is_open_source INTEGER,
-                    gp_is_proxy INTEGER,
-                    gp_is_mintable INTEGER,
-                    gp_owner_address TEXT,
-                    gp_creator_address TEXT,
-                    gp_can_take_back_ownership INTEGER,
-                    gp_owner_change_balance INTEGER,
-                    gp_hidden_owner INTEGER,
-                    gp_selfdestruct INTEGER,
-                    gp_external_call INTEGER,
-                    gp_buy_tax REAL,
-                    gp_sell_tax REAL,
-                    gp_is_anti_whale INTEGER,
-                    gp_anti_whale_modifiable INTEGER,
-                    gp_cannot_buy INTEGER,
-                    gp_cannot_sell_all INTEGER,
-                    gp_slippage_modifiable INTEGER,
-                    gp_personal_slippage_modifiable INTEGER,
-                    gp_trading_cooldown INTEGER,
-                    gp_is_blacklisted INTEGER,
-                    gp_is_whitelisted INTEGER,
-                    gp_is_in_dex INTEGER,
-                    gp_transfer_pausable INTEGER,
-                    gp_can_be_minted INTEGER,
-                    gp_total_supply TEXT,
-                    gp_holder_count INTEGER,
-                    gp_owner_percent REAL,
-                    gp_owner_balance TEXT,
-                    gp_creator_percent REAL,
-                    gp_creator_balance TEXT,
-                    gp_lp_holder_count INTEGER,
-                    gp_lp_total_supply TEXT,
-                    gp_is_true_token INTEGER,
-                    gp_is_airdrop_scam INTEGER,
-                    gp_trust_list TEXT,
-                    gp_other_potential_risks TEXT,
-                    gp_note TEXT,
-                    gp_honeypot_with_same_creator INTEGER,
-                    gp_fake_token INTEGER,
-                    gp_holders TEXT,
-                    gp_lp_holders TEXT,
-                    gp_dex_info TEXT,
-                    total_scans INTEGER DEFAULT 1,
-                    honeypot_failures INTEGER DEFAULT 0,
-                    last_error TEXT,
-                    status TEXT DEFAULT 'new',
-                    liq10 REAL,
-                    liq20 REAL,
-                    liq30 REAL,
-                    liq40 REAL,
-                    liq50 REAL,
-                    liq60 REAL,
-                    liq70 REAL,
-                    liq80 REAL,
-                    liq90 REAL,
-                    liq100 REAL,
-                    liq110 REAL,
-                    liq120 REAL,
-                    liq130 REAL,
-                    liq140 REAL,
-                    liq150 REAL,
-                    liq160 REAL,
-                    liq170 REAL,
-                    liq180 REAL,
-                    liq190 REAL,
-                    liq200 REAL
-                )""")
-                
-                # Record the table creation
-                cursor.execute('''
-                    INSERT INTO token_tables (table_name, token_address, token_name, created_at)
-                    VALUES (?, ?, ?, ?)
-                ''', (token_table_name, token_address, token_name, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
-                
-                db.commit()
-                return True
-            return False
-        except sqlite3.Error as e:
-            print(f"Error creating token-specific table: {str(e)}")
-            return False
+    def create_schema(self, db):
+        """Create session tables (runs on the writer connection)"""
+        cursor = db.cursor()
+        
+        # Create HONEYPOTS table
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS HONEYPOTS (
+            token_address TEXT PRIMARY KEY,
+            removal_timestamp TEXT NOT NULL,
+            original_scan_timestamp TEXT,
+            token_name TEXT,
+            token_symbol TEXT,
+            token_decimals INTEGER,
+            token_total_supply TEXT,
+            token_pair_address TEXT,
+            token_age_hours REAL,
+            hp_simulation_success INTEGER,
+            hp_buy_tax REAL,
+            hp_sell_tax REAL,
+            hp_transfer_tax REAL,
+            hp_liquidity_amount REAL,
+            hp_pair_reserves0 TEXT,
+            hp_pair_reserves1 TEXT,
+            hp_buy_gas_used INTEGER,
+            hp_sell_gas_used INTEGER,
+            hp_creation_time TEXT,
+            hp_holder_count INTEGER,
+            hp_is_honeypot INTEGER,
+            hp_honeypot_reason TEXT,
+            total_scans INTEGER,
+            honeypot_failures INTEGER,
+            last_error TEXT,
+            removal_reason TEXT
+        )''')
+        
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_honeypot_timestamp ON HONEYPOTS(removal_timestamp)')
+        
+        # Create scan_records table if it doesn't exist
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scan_records (
+            token_address TEXT PRIMARY KEY,
+            scan_timestamp TEXT NOT NULL,
+            pair_address TEXT,
+            token_name TEXT,
+            token_symbol TEXT,
+            token_decimals INTEGER,
+            token_total_supply TEXT,
+            token_age_hours REAL,
+            hp_simulation_success INTEGER,
+            hp_buy_tax REAL,
+            hp_sell_tax REAL,
+            hp_transfer_tax REAL,
+            hp_liquidity_amount REAL,
+            hp_pair_reserves0 TEXT,
+            hp_pair_reserves1 TEXT,
+            hp_buy_gas_used INTEGER,
+            hp_sell_gas_used INTEGER,
+            hp_creation_time TEXT,
+            hp_holder_count INTEGER,
+            hp_is_honeypot INTEGER,
+            hp_honeypot_reason TEXT,
+            hp_is_open_source INTEGER,
+            hp_is_proxy INTEGER,
+            hp_is_mintable INTEGER,
+            hp_can_be_minted INTEGER,
+            hp_owner_address TEXT,
+            hp_creator_address TEXT,
+            hp_deployer_address TEXT,
+            hp_has_proxy_calls INTEGER,
+            hp_pair_liquidity REAL,
+            hp_pair_liquidity_token0 REAL,
+            hp_pair_liquidity_token1 REAL,
+            hp_pair_token0_symbol TEXT,
+            hp_pair_token1_symbol TEXT,
+            hp_flags TEXT,
+            gp_is_open_source INTEGER,
+            gp_is_proxy INTEGER,
+            gp_is_mintable INTEGER,
+            gp_owner_address TEXT,
+            gp_creator_address TEXT,
+            gp_can_take_back_ownership INTEGER,
+            gp_owner_change_balance INTEGER,
+            gp_hidden_owner INTEGER,
+            gp_selfdestruct INTEGER,
+            gp_external_call INTEGER,
+            gp_buy_tax REAL,
+            gp_sell_tax REAL,
+            gp_is_anti_whale INTEGER,
+            gp_anti_whale_modifiable INTEGER,
+            gp_cannot_buy INTEGER,
+            gp_cannot_sell_all INTEGER,
+            gp_slippage_modifiable INTEGER,
+            gp_personal_slippage_modifiable INTEGER,
+            gp_trading_cooldown INTEGER,
+            gp_is_blacklisted INTEGER,
+            gp_is_whitelisted INTEGER,
+            gp_is_in_dex INTEGER,
+            gp_transfer_pausable INTEGER,
+            gp_can_be_minted INTEGER,
+            gp_total_supply TEXT,
+            gp_holder_count INTEGER,
+            gp_owner_percent REAL,
+            gp_owner_balance TEXT,
+            gp_creator_percent REAL,
+            gp_creator_balance TEXT,
+            gp_lp_holder_count INTEGER,
+            gp_lp_total_supply TEXT,
+            gp_is_true_token INTEGER,
+            gp_is_airdrop_scam INTEGER,
+            gp_trust_list TEXT,
+            gp_other_potential_risks TEXT,
+            gp_note TEXT,
+            gp_honeypot_with_same_creator INTEGER,
+            gp_fake_token INTEGER,
+            gp_holders TEXT,
+            gp_lp_holders TEXT,
+            gp_dex_info TEXT,
+            total_scans INTEGER DEFAULT 1,
+            honeypot_failures INTEGER DEFAULT 0,
+            last_error TEXT,
+            status TEXT DEFAULT 'new'
+        )''')
+        
+        # Liquidity time series, one narrow row per sample
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS liquidity_samples (
+            token_address TEXT NOT NULL,
+            ts INTEGER NOT NULL,
+            scan_no INTEGER NOT NULL,
+            liquidity REAL,
+            reserves0 TEXT,
+            reserves1 TEXT
+        )''')
+        
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_liquidity_samples_token_ts ON liquidity_samples(token_address, ts)')
+        
+        # Full scan history, one row per token per scan
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scan_history (
+            token_address TEXT NOT NULL,
+            scan_timestamp TEXT NOT NULL,
+            pair_address TEXT,
+            token_name TEXT,
+            token_symbol TEXT,
+            token_decimals INTEGER,
+            token_total_supply TEXT,
+            token_age_hours REAL,
+            hp_simulation_success INTEGER,
+            hp_buy_tax REAL,
+            hp_sell_tax REAL,
+            hp_transfer_tax REAL,
+            hp_liquidity_amount REAL,
+            hp_pair_reserves0 TEXT,
+            hp_pair_reserves1 TEXT,
+            hp_buy_gas_used INTEGER,
+            hp_sell_gas_used INTEGER,
+            hp_creation_time TEXT,
+            hp_holder_count INTEGER,
+            hp_is_honeypot INTEGER,
+            hp_honeypot_reason TEXT,
+            hp_is_open_source INTEGER,
+            hp_is_proxy INTEGER,
+            hp_is_mintable INTEGER,
+            hp_can_be_minted INTEGER,
+            hp_owner_address TEXT,
+            hp_creator_address TEXT,
+            hp_deployer_address TEXT,
+            hp_has_proxy_calls INTEGER,
+            hp_pair_liquidity REAL,
+            hp_pair_liquidity_token0 REAL,
+            hp_pair_liquidity_token1 REAL,
+            hp_pair_token0_symbol TEXT,
+            hp_pair_token1_symbol TEXT,
+            hp_flags TEXT,
+            gp_is_open_source INTEGER,
+            gp_is_proxy INTEGER,
+            gp_is_mintable INTEGER,
+            gp_owner_address TEXT,
+            gp_creator_address TEXT,
+            gp_can_take_back_ownership INTEGER,
+            gp_owner_change_balance INTEGER,
+            gp_hidden_owner INTEGER,
+            gp_selfdestruct INTEGER,
+            gp_external_call INTEGER,
+            gp_buy_tax REAL,
+            gp_sell_tax REAL,
+            gp_is_anti_whale INTEGER,
+            gp_anti_whale_modifiable INTEGER,
+            gp_cannot_buy INTEGER,
+            gp_cannot_sell_all INTEGER,
+            gp_slippage_modifiable INTEGER,
+            gp_personal_slippage_modifiable INTEGER,
+            gp_trading_cooldown INTEGER,
+            gp_is_blacklisted INTEGER,
+            gp_is_whitelisted INTEGER,
+            gp_is_in_dex INTEGER,
+            gp_transfer_pausable INTEGER,
+            gp_can_be_minted INTEGER,
+            gp_total_supply TEXT,
+            gp_holder_count INTEGER,
+            gp_owner_percent REAL,
+            gp_owner_balance TEXT,
+            gp_creator_percent REAL,
+            gp_creator_balance TEXT,
+            gp_lp_holder_count INTEGER,
+            gp_lp_total_supply TEXT,
+            gp_is_true_token INTEGER,
+            gp_is_airdrop_scam INTEGER,
+            gp_trust_list TEXT,
+            gp_other_potential_risks TEXT,
+            gp_note TEXT,
+            gp_honeypot_with_same_creator INTEGER,
+            gp_fake_token INTEGER,
+            gp_holders TEXT,
+            gp_lp_holders TEXT,
+            gp_dex_info TEXT,
+            total_scans INTEGER DEFAULT 1,
+            honeypot_failures INTEGER DEFAULT 0,
+            last_error TEXT,
+            status TEXT DEFAULT 'new',
+            PRIMARY KEY (token_address, scan_timestamp)
+        )''')
+        
+        # Compact log of the columns each scan changed ({column: new value} JSON)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scan_changes (
+            token_address TEXT NOT NULL,
+            scan_timestamp TEXT NOT NULL,
+            changed TEXT NOT NULL,
+            PRIMARY KEY (token_address, scan_timestamp)
+        )''')
+        
+        # Fold per-token tables from older sessions into scan_history
+        migrated = self.migrate_token_tables(db)
+        if migrated:
+            print(f"Migrated {migrated} per-token tables into scan_history")
+
+    SELECT_SCAN_RECORD_SQL = f"SELECT {', '.join(SCAN_RECORD_COLUMNS)} FROM scan_records WHERE token_address = ?"
+    UPSERT_SCAN_RECORD_SQL = (
+        f"INSERT INTO scan_records ({', '.join(SCAN_RECORD_COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in SCAN_RECORD_COLUMNS)}) "
+        f"ON CONFLICT(token_address) DO UPDATE SET "
+        f"{', '.join(f'{column} = excluded.{column}' for column in SCAN_RECORD_COLUMNS[1:])}"
+    )
+    INSERT_SCAN_HISTORY_SQL = (
+        f"INSERT OR REPLACE INTO scan_history ({', '.join(SCAN_RECORD_COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in SCAN_RECORD_COLUMNS)})"
+    )
+
+    @staticmethod
+    def same_value(stored, value) -> bool:
+        """Whether a new value equals the stored one after SQLite's type conversion"""
+        if isinstance(value, bool):
+            value = int(value)
+        if stored == value:
+            return True
+        return isinstance(stored, str) and value is not None and not isinstance(value, str) and stored == str(value)
+
+    def write_scan_record(self, cursor, record: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> Optional[List[str]]:
+        """
+        Write a scan to scan_records touching only the columns that changed (runs on the writer connection)
+
+        A new token is inserted with a real UPSERT (no delete + re-insert). For an
+        existing row only the timestamps and the changed columns are updated, and
+        the changed values are appended to the scan_changes log.
+
+        Args:
+            cursor: Writer connection cursor
+            record: New row, column -> value
+            previous: Current row, or None if the token has no row yet
+
+        Returns:
+            Changed column names (besides the timestamps), or None for an insert
+        """
+        if previous is None:
+            cursor.execute(self.UPSERT_SCAN_RECORD_SQL, [record[column] for column in SCAN_RECORD_COLUMNS])
+            return None
+
+        changed = [
+            column for column in SCAN_RECORD_COLUMNS
+            if column not in ALWAYS_WRITTEN_COLUMNS and not self.same_value(previous[column], record[column])
+        ]
+        set_columns = list(ALWAYS_WRITTEN_COLUMNS) + changed
+        cursor.execute(
+            f"UPDATE scan_records SET {', '.join(f'{column} = ?' for column in set_columns)} WHERE token_address = ?",
+            [record[column] for column in set_columns] + [record['token_address']]
+        )
+        if cursor.rowcount == 0:
+            # Row removed since it was read (moved to HONEYPOTS / removed)
+            cursor.execute(self.UPSERT_SCAN_RECORD_SQL, [record[column] for column in SCAN_RECORD_COLUMNS])
+            return None
+
+        if changed:
+            cursor.execute(
+                'INSERT OR REPLACE INTO scan_changes (token_address, scan_timestamp, changed) VALUES (?, ?, ?)',
+                (record['token_address'], record['scan_timestamp'], json.dumps({column: record[column] for column in changed}))
+            )
+        return changed
+
+    def downsample_liquidity_samples(self, db) -> int:
+        """Thin old liquidity samples to one per bucket, keeping the latest (runs on the writer connection)"""
+        now = int(time.time())
+        removed = 0
+        for age_hours, bucket_seconds in LIQUIDITY_DOWNSAMPLING['TIERS']:
+            cutoff = now - int(age_hours * 3600)
+            cursor = db.execute('''
+                DELETE FROM liquidity_samples
+                WHERE ts < ? AND rowid NOT IN (
+                    SELECT MAX(rowid) FROM liquidity_samples
+                    WHERE ts < ?
+                    GROUP BY token_address, ts / ?
+                )
+            ''', (cutoff, cutoff, bucket_seconds))
+            removed += cursor.rowcount
+        return removed
+
+    def migrate_token_tables(self, db) -> int:
+        """
+        Fold legacy per-token {name}_{address} tables into scan_history and drop them
+        (runs on the writer connection)
+
+        Returns:
+            Number of tables migrated
+        """
+        cursor = db.cursor()
+        history_columns = [row[1] for row in cursor.execute('PRAGMA table_info(scan_history)')]
+
+        # Tables registered in token_tables plus any unregistered ones following the naming scheme
+        legacy_tables = set()
+        if cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='token_tables'").fetchone():
+            legacy_tables.update(row[0] for row in cursor.execute('SELECT table_name FROM token_tables'))
+        for (name,) in cursor.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall():
+            if re.fullmatch(r'[A-Za-z0-9]*_0x[0-9a-fA-F]{40}', name):
+                legacy_tables.add(name)
+
+        migrated = 0
+        for table_name in sorted(legacy_tables):
+            if not cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table_name,)).fetchone():
+                continue
+            table_columns = {row[1] for row in cursor.execute(f'PRAGMA table_info("{table_name}")')}
+            shared = ", ".join(col for col in history_columns if col in table_columns)
+            cursor.execute(f'INSERT OR IGNORE INTO scan_history ({shared}) SELECT {shared} FROM "{table_name}" WHERE token_address IS NOT NULL')
+            cursor.execute(f'DROP TABLE "{table_name}"')
+            migrated += 1
+
+        cursor.execute('DROP TABLE IF EXISTS token_tables')
+        return migrated
 
     async def check_honeypot(self, address: str) -> Dict:
         """Check token using Honeypot API with improved tracking"""
-        return await api_wrapper.call_honeypot_api(address, delay=HONEYPOT_BASE_DELAY)
+        return await api_wrapper.call_honeypot_api(address)
 
     async def check_goplus(self, address: str) -> Dict:
         """Check token using GoPlus API with improved tracking"""
-        return await api_wrapper.call_goplus_api(address, delay=GOPLUS_BASE_DELAY)
+        return await api_wrapper.call_goplus_api(address)
 
     async def process_new_pair(self, token_address: str, pair_address: str):
         """Process and update token data silently"""
@@ -815,9 +822,9 @@ class TokenChecker:
             return True
         return False
 
-    async def move_token_to_removed(self, db_path: str, token_address: str, reason: str):
+    async def move_token_to_removed(self, token_address: str, reason: str):
         """Move token to REMOVED table"""
-        with sqlite3.connect(db_path) as db:
+        def move(db):
             cursor = db.cursor()
             
             # Get token data from scan_records
@@ -888,12 +895,11 @@ class TokenChecker:
                 
                 # Delete from scan_records
                 cursor.execute('DELETE FROM scan_records WHERE token_address = ?', (token_address,))
-                db.commit()
+
+        await self.db.write(move)
 
     async def process_token(self, token_address: str, pair_address: str):
         """Process a token by checking its honeypot status and other data"""
-        # Define db_path at start to ensure availability in error handlers
-        db_path = os.path.join(self.folder_name, 'scan_records.db')
         error_message = None
         
         try:
@@ -931,6 +937,10 @@ class TokenChecker:
                 honeypot_data = {}
                 goplus_data = {}
 
+            # Normalized column values, shared by the display tables and persistence
+            hp = normalize_honeypot(honeypot_data)
+            gp = normalize_goplus(goplus_data, token_address)
+
             # Now process creation time after we have honeypot_data
             creation_time_str = honeypot_data.get('pair', {}).get('createdAtTimestamp')
             if creation_time_str:
@@ -963,47 +973,43 @@ class TokenChecker:
 
             # Display honeypot data in a nice table
             if honeypot_data:
-                # Token Info
-                token_info = honeypot_data.get('token', {})
+                # Fields that are displayed but not stored
                 pair_info = honeypot_data.get('pair', {})
-                simulation = honeypot_data.get('simulationResult', {})
-                contract = honeypot_data.get('contractCode', {})
-                honeypot_result = honeypot_data.get('honeypotResult', {})
                 holder_analysis = honeypot_data.get('holderAnalysis', {})
 
                 pair_data = {
                     "Token Info": {
                         "Token Address": token_address,
                         "Pair Address": pair_address,
-                        "Token Name": token_info.get('name', 'Unknown'),
-                        "Token Symbol": token_info.get('symbol', 'Unknown'),
-                        "Decimals": token_info.get('decimals', 'Unknown'),
-                        "Total Supply": token_info.get('totalSupply', '0'),
-                        "Total Holders": token_info.get('totalHolders', '0')
+                        "Token Name": hp['token_name'],
+                        "Token Symbol": hp['token_symbol'],
+                        "Decimals": hp['token_decimals'],
+                        "Total Supply": hp['token_total_supply'],
+                        "Total Holders": hp['hp_holder_count']
                     },
                     "Pair Info": {
-                        "Liquidity": f"${float(pair_info.get('liquidity', 0)):,.2f}",
-                        "Creation Time": pair_info.get('createdAtTimestamp', 'Unknown'),
-                        "Reserves Token0": pair_info.get('reserves0', '0'),
-                        "Reserves Token1": pair_info.get('reserves1', '0'),
+                        "Liquidity": f"${hp['hp_liquidity_amount']:,.2f}",
+                        "Creation Time": hp['hp_creation_time'] or 'Unknown',
+                        "Reserves Token0": hp['hp_pair_reserves0'] or '0',
+                        "Reserves Token1": hp['hp_pair_reserves1'] or '0',
                         "Creation Tx": pair_info.get('creationTxHash', 'Unknown')
                     },
                     "Simulation": {
-                        "Success": "Yes" if honeypot_data.get('simulationSuccess', False) else "No",
-                        "Buy Tax": f"{float(simulation.get('buyTax', 0)):.2f}%",
-                        "Sell Tax": f"{float(simulation.get('sellTax', 0)):.2f}%",
-                        "Transfer Tax": f"{float(simulation.get('transferTax', 0)):.2f}%",
-                        "Buy Gas": simulation.get('buyGas', 'Unknown'),
-                        "Sell Gas": simulation.get('sellGas', 'Unknown')
+                        "Success": "Yes" if hp['hp_simulation_success'] else "No",
+                        "Buy Tax": f"{hp['hp_buy_tax']:.2f}%",
+                        "Sell Tax": f"{hp['hp_sell_tax']:.2f}%",
+                        "Transfer Tax": f"{hp['hp_transfer_tax']:.2f}%",
+                        "Buy Gas": hp['hp_buy_gas_used'] or 'Unknown',
+                        "Sell Gas": hp['hp_sell_gas_used'] or 'Unknown'
                     },
                     "Contract": {
-                        "Open Source": "Yes" if contract.get('openSource', False) else "No",
-                        "Is Proxy": "Yes" if contract.get('isProxy', False) else "No",
-                        "Has Proxy Calls": "Yes" if contract.get('hasProxyCalls', False) else "No"
+                        "Open Source": "Yes" if hp['hp_is_open_source'] else "No",
+                        "Is Proxy": "Yes" if hp['hp_is_proxy'] else "No",
+                        "Has Proxy Calls": "Yes" if hp['hp_has_proxy_calls'] else "No"
                     },
                     "Honeypot Analysis": {
-                        "Is Honeypot": "Yes" if honeypot_result.get('isHoneypot', True) else "No",
-                        "Honeypot Reason": honeypot_result.get('honeypotReason', 'None'),
+                        "Is Honeypot": "Yes" if hp['hp_is_honeypot'] else "No",
+                        "Honeypot Reason": hp['hp_honeypot_reason'] or 'None',
                         "Risk Level": honeypot_data.get('summary', {}).get('riskLevel', 'Unknown'),
                         "Risk Type": honeypot_data.get('summary', {}).get('risk', 'Unknown')
                     },
@@ -1023,95 +1029,74 @@ class TokenChecker:
             
             # Display security data in a nice table
             if goplus_data and 'result' in goplus_data:
-                token_data = goplus_data['result'].get(token_address.lower(), {})
-                
-                def safe_float(value, default=0.0):
-                    """Safely convert value to float, handling empty strings"""
-                    if not value or value == '':
-                        return default
-                    try:
-                        return float(value)
-                    except (ValueError, TypeError):
-                        return default
+                token_data = goplus_token_data(goplus_data, token_address)
+                taxes_known = token_data.get('buy_tax') not in (None, '') and token_data.get('sell_tax') not in (None, '')
 
                 security_data = {
                     "Token Info": {
                         "passed": True,
-                        "details": f"Name: {token_data.get('token_name')}\nSymbol: {token_data.get('token_symbol')}\nTotal Supply: {token_data.get('total_supply')}"
+                        "details": f"Name: {gp['gp_token_name']}\nSymbol: {gp['gp_token_symbol']}\nTotal Supply: {gp['gp_total_supply']}"
                     },
                     "Security Status": {
-                        "passed": not any([
-                            bool(int(token_data.get('is_honeypot', '0'))),
-                            bool(int(token_data.get('honeypot_with_same_creator', '0'))),
-                            bool(int(token_data.get('is_blacklisted', '0')))
-                        ]),
+                        "passed": not (gp['gp_is_honeypot'] or gp['gp_honeypot_with_same_creator'] or gp['gp_is_blacklisted']),
                         "details": "\n".join([
-                            f"Is Honeypot: {'Yes' if bool(int(token_data.get('is_honeypot', '0'))) else 'No'}",
-                            f"Honeypot Same Creator: {'Yes' if bool(int(token_data.get('honeypot_with_same_creator', '0'))) else 'No'}",
-                            f"Blacklisted: {'Yes' if bool(int(token_data.get('is_blacklisted', '0'))) else 'No'}",
-                            f"Whitelisted: {'Yes' if bool(int(token_data.get('is_whitelisted', '0'))) else 'No'}"
+                            f"Is Honeypot: {'Yes' if gp['gp_is_honeypot'] else 'No'}",
+                            f"Honeypot Same Creator: {'Yes' if gp['gp_honeypot_with_same_creator'] else 'No'}",
+                            f"Blacklisted: {'Yes' if gp['gp_is_blacklisted'] else 'No'}",
+                            f"Whitelisted: {'Yes' if gp['gp_is_whitelisted'] else 'No'}"
                         ])
                     },
                     "Contract": {
-                        "passed": bool(int(token_data.get('is_open_source', '0'))),
+                        "passed": bool(gp['gp_is_open_source']),
                         "details": "\n".join([
-                            f"Open Source: {'Yes' if bool(int(token_data.get('is_open_source', '0'))) else 'No'}",
-                            f"Proxy: {'Yes' if bool(int(token_data.get('is_proxy', '0'))) else 'No'}",
-                            f"Mintable: {'Yes' if bool(int(token_data.get('is_mintable', '0'))) else 'No'}",
-                            f"External Calls: {'Yes' if bool(int(token_data.get('external_call', '0'))) else 'No'}",
-                            f"Can Self-Destruct: {'Yes' if bool(int(token_data.get('selfdestruct', '0'))) else 'No'}"
+                            f"Open Source: {'Yes' if gp['gp_is_open_source'] else 'No'}",
+                            f"Proxy: {'Yes' if gp['gp_is_proxy'] else 'No'}",
+                            f"Mintable: {'Yes' if gp['gp_is_mintable'] else 'No'}",
+                            f"External Calls: {'Yes' if gp['gp_external_call'] else 'No'}",
+                            f"Can Self-Destruct: {'Yes' if gp['gp_selfdestruct'] else 'No'}"
                         ])
                     },
                     "Taxes": {
-                        "passed": safe_float(token_data.get('buy_tax', '100')) <= 10 and safe_float(token_data.get('sell_tax', '100')) <= 10,
-                        "details": f"Buy Tax: {safe_float(token_data.get('buy_tax', '0')) * 100:.2f}%\nSell Tax: {safe_float(token_data.get('sell_tax', '0')) * 100:.2f}%"
+                        "passed": taxes_known and gp['gp_buy_tax'] <= 10 and gp['gp_sell_tax'] <= 10,
+                        "details": f"Buy Tax: {gp['gp_buy_tax'] * 100:.2f}%\nSell Tax: {gp['gp_sell_tax'] * 100:.2f}%"
                     },
                     "Ownership": {
-                        "passed": not any([
-                            bool(int(token_data.get('hidden_owner', '0'))),
-                            bool(int(token_data.get('can_take_back_ownership', '0'))),
-                            bool(int(token_data.get('owner_change_balance', '0')))
-                        ]),
+                        "passed": not (gp['gp_hidden_owner'] or gp['gp_can_take_back_ownership'] or gp['gp_owner_change_balance']),
                         "details": "\n".join([
-                            f"Hidden Owner: {'Yes' if bool(int(token_data.get('hidden_owner', '0'))) else 'No'}",
-                            f"Can Take Back Ownership: {'Yes' if bool(int(token_data.get('can_take_back_ownership', '0'))) else 'No'}",
-                            f"Owner Change Balance: {'Yes' if bool(int(token_data.get('owner_change_balance', '0'))) else 'No'}",
-                            f"Owner Address: {token_data.get('owner_address', 'Unknown')}",
-                            f"Owner Balance: {token_data.get('owner_balance', '0')}",
-                            f"Owner Percent: {float(token_data.get('owner_percent', '0')) * 100:.2f}%"
+                            f"Hidden Owner: {'Yes' if gp['gp_hidden_owner'] else 'No'}",
+                            f"Can Take Back Ownership: {'Yes' if gp['gp_can_take_back_ownership'] else 'No'}",
+                            f"Owner Change Balance: {'Yes' if gp['gp_owner_change_balance'] else 'No'}",
+                            f"Owner Address: {gp['gp_owner_address'] or 'Unknown'}",
+                            f"Owner Balance: {gp['gp_owner_balance']}",
+                            f"Owner Percent: {gp['gp_owner_percent'] * 100:.2f}%"
                         ])
                     },
                     "Trading Restrictions": {
-                        "passed": not any([
-                            bool(int(token_data.get('cannot_buy', '0'))),
-                            bool(int(token_data.get('cannot_sell_all', '0'))),
-                            bool(int(token_data.get('trading_cooldown', '0'))),
-                            bool(int(token_data.get('transfer_pausable', '0')))
-                        ]),
+                        "passed": not (gp['gp_cannot_buy'] or gp['gp_cannot_sell_all'] or gp['gp_trading_cooldown'] or gp['gp_transfer_pausable']),
                         "details": "\n".join([
-                            f"Cannot Buy: {'Yes' if bool(int(token_data.get('cannot_buy', '0'))) else 'No'}",
-                            f"Cannot Sell All: {'Yes' if bool(int(token_data.get('cannot_sell_all', '0'))) else 'No'}",
-                            f"Trading Cooldown: {'Yes' if bool(int(token_data.get('trading_cooldown', '0'))) else 'No'}",
-                            f"Transfer Pausable: {'Yes' if bool(int(token_data.get('transfer_pausable', '0'))) else 'No'}"
+                            f"Cannot Buy: {'Yes' if gp['gp_cannot_buy'] else 'No'}",
+                            f"Cannot Sell All: {'Yes' if gp['gp_cannot_sell_all'] else 'No'}",
+                            f"Trading Cooldown: {'Yes' if gp['gp_trading_cooldown'] else 'No'}",
+                            f"Transfer Pausable: {'Yes' if gp['gp_transfer_pausable'] else 'No'}"
                         ])
                     },
                     "Anti-Whale": {
                         "passed": True,
                         "details": "\n".join([
-                            f"Anti-Whale: {'Yes' if bool(int(token_data.get('is_anti_whale', '0'))) else 'No'}",
-                            f"Anti-Whale Modifiable: {'Yes' if bool(int(token_data.get('anti_whale_modifiable', '0'))) else 'No'}",
-                            f"Slippage Modifiable: {'Yes' if bool(int(token_data.get('slippage_modifiable', '0'))) else 'No'}",
-                            f"Personal Slippage Modifiable: {'Yes' if bool(int(token_data.get('personal_slippage_modifiable', '0'))) else 'No'}"
+                            f"Anti-Whale: {'Yes' if gp['gp_is_anti_whale'] else 'No'}",
+                            f"Anti-Whale Modifiable: {'Yes' if gp['gp_anti_whale_modifiable'] else 'No'}",
+                            f"Slippage Modifiable: {'Yes' if gp['gp_slippage_modifiable'] else 'No'}",
+                            f"Personal Slippage Modifiable: {'Yes' if gp['gp_personal_slippage_modifiable'] else 'No'}"
                         ])
                     },
                     "Holders": {
                         "passed": True,
                         "details": "\n".join([
-                            f"Total Holders: {token_data.get('holder_count', '0')}",
-                            f"LP Holders: {token_data.get('lp_holder_count', '0')}",
-                            f"Creator Balance: {token_data.get('creator_balance', '0')}",
-                            f"Creator %: {float(token_data.get('creator_percent', '0')) * 100:.2f}%",
-                            f"LP Total Supply: {token_data.get('lp_total_supply', '0')}"
+                            f"Total Holders: {gp['gp_holder_count']}",
+                            f"LP Holders: {gp['gp_lp_holder_count']}",
+                            f"Creator Balance: {gp['gp_creator_balance']}",
+                            f"Creator %: {gp['gp_creator_percent'] * 100:.2f}%",
+                            f"LP Total Supply: {gp['gp_lp_total_supply']}"
                         ])
                     },
                     "Liquidity": {
@@ -1149,267 +1134,69 @@ class TokenChecker:
                 except (ValueError, TypeError):
                     token_age_hours = None
 
-            # Get current scan count and create token-specific table
-            with sqlite3.connect(db_path) as db:
+            # Get current scan count and store the scan in scan_records and scan_history.
+            # Queued on the write-behind buffer and committed with the rest of its batch
+            def persist(db):
                 cursor = db.cursor()
                 
-                # Create token-specific table first
-                token_name_safe = ''.join(c for c in token_info.get('name', 'Unknown') if c.isalnum())
-                token_table_name = f"{token_name_safe}_{token_address.lower()}"
-                self.create_token_specific_table(db, token_address, token_info.get('name', 'Unknown'), token_table_name)
-
-                # Rest of the database operations...
-                cursor.execute('SELECT total_scans, honeypot_failures FROM scan_records WHERE token_address = ?', 
-                            (token_address,))
-                result = cursor.fetchone()
-                total_scans = (result[0] + 1) if result else 1
-                honeypot_failures = result[1] if result else 0
-
-                # Extract all data components
-                token_info = honeypot_data.get('token', {})
-                simulation = honeypot_data.get('simulationResult', {})
-                contract = honeypot_data.get('contractCode', {})
-                pair_info = honeypot_data.get('pair', {})
-                pair_details = pair_info.get('pair', {})
-                honeypot_result = honeypot_data.get('honeypotResult', {})
-
-                # Prepare Honeypot values
-                honeypot_values = [
-                    token_address,
-                    datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    pair_address,
-                    token_info.get('name', 'Unknown'),
-                    token_info.get('symbol', 'Unknown'),
-                    token_info.get('decimals', 18),
-                    token_info.get('totalSupply', '0'),
-                    token_age_hours,
-                    bool(honeypot_data.get('simulationSuccess', False)),
-                    float(simulation.get('buyTax', 0)),
-                    float(simulation.get('sellTax', 0)),
-                    float(simulation.get('transferTax', 0)),
-                    float(pair_info.get('liquidity', 0)),
-                    str(pair_info.get('reserves0', '')),
-                    str(pair_info.get('reserves1', '')),
-                    int(simulation.get('buyGas', 0)),
-                    int(simulation.get('sellGas', 0)),
-                    pair_info.get('createdAtTimestamp', ''),
-                    int(token_info.get('totalHolders', 0)),
-                    bool(honeypot_result.get('isHoneypot', True)),
-                    honeypot_result.get('honeypotReason', ''),
-                    bool(contract.get('openSource', False)),
-                    bool(contract.get('isProxy', False)),
-                    bool(contract.get('isMintable', False)),
-                    bool(contract.get('canBeMinted', False)),
-                    token_info.get('owner', ''),
-                    token_info.get('creator', ''),
-                    token_info.get('deployer', ''),
-                    bool(contract.get('hasProxyCalls', False)),
-                    float(pair_info.get('liquidity', 0)),
-                    float(pair_info.get('liquidityToken0', 0)),
-                    float(pair_info.get('liquidityToken1', 0)),
-                    pair_details.get('token0Symbol', ''),
-                    pair_details.get('token1Symbol', ''),
-                    json.dumps(honeypot_data.get('flags', []))
-                ]
-
-                # Use the prepare_goplus_values helper function to get GoPlus values
-                goplus_values = list(prepare_goplus_values(self, goplus_data, token_address))
-
-                # Get existing liquidity values first
-                cursor.execute("""
-                    SELECT liq10, liq20, liq30, liq40, liq50, liq60, liq70, liq80, liq90, liq100,
-                           liq110, liq120, liq130, liq140, liq150, liq160, liq170, liq180, liq190, liq200 
-                    FROM scan_records 
-                    WHERE token_address = ?""", (token_address,))
+                # Previous row, diffed against the new one below
+                cursor.execute(self.SELECT_SCAN_RECORD_SQL, (token_address,))
+                previous = cursor.fetchone()
+                previous_record = dict(zip(SCAN_RECORD_COLUMNS, previous)) if previous else None
                 
-                previous_values = cursor.fetchone() or [None] * 20
-
-                # Prepare liquidity tracking values
-                liquidity_values = []
-                current_liquidity = float(pair_info.get('liquidity', 0))
-                multiplier = getattr(self.config, 'liquidity_multiplier', 1)
-
-                # Calculate which liquidity field should be updated (if any)
-                update_field = None
-                if total_scans % multiplier == 0:  # Only update on multiples of multiplier
-                    update_field = total_scans  # This will be the field number to update (e.g., 10, 20, 30, etc.)
-
-                for i, field_num in enumerate(range(10, 201, 10)):
-                    if update_field and field_num == update_field:
-                        # Update this field with current liquidity
-                        liquidity_values.append(current_liquidity)
-                    else:
-                        # Keep previous value if it exists
-                        liquidity_values.append(previous_values[i] if previous_values else None)
+                # A pair that was reorged out keeps its tombstone
+                if previous_record and previous_record['status'] == 'reorged':
+                    return
+                
+                total_scans = (previous_record['total_scans'] + 1) if previous_record else 1
+                honeypot_failures = previous_record['honeypot_failures'] if previous_record else 0
+
+                scanned_at = datetime.now()
+                record = {
+                    **hp,
+                    **gp,
+                    'token_address': token_address,
+                    'scan_timestamp': scanned_at.strftime('%Y-%m-%d %H:%M:%S'),
+                    'pair_address': pair_address,
+                    'token_age_hours': token_age_hours,
+                    'total_scans': total_scans,
+                    'honeypot_failures': honeypot_failures,
+                    'last_error': '',
+                    'status': 'active'
+                }
+                values = [record[column] for column in SCAN_RECORD_COLUMNS]
 
-                # Add liquidity values to values list
-                values = honeypot_values + goplus_values + [total_scans, honeypot_failures, '', 'active'] + liquidity_values
+                # Record a liquidity sample every liquidity_multiplier scans
+                multiplier = max(1, int(getattr(self.config, 'liquidity_multiplier', 1) or 1))
+                if total_scans % multiplier == 0:
+                    cursor.execute('''
+                        INSERT INTO liquidity_samples (token_address, ts, scan_no, liquidity, reserves0, reserves1)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (
+                        token_address,
+                        int(scanned_at.timestamp()),
+                        total_scans,
+                        hp['hp_liquidity_amount'],
+                        hp['hp_pair_reserves0'],
+                        hp['hp_pair_reserves1']
+                    ))
 
-                # Create token-specific table if it doesn't exist
-                token_name_safe = ''.join(c for c in token_info.get('name', 'Unknown') if c.isalnum())
-                token_table_name = f"{token_name_safe}_{token_address.lower()}"
-                
-                # Create token-specific table
-                cursor.execute(f"""
-                    CREATE TABLE IF NOT EXISTS {token_table_name} (
-                        token_address TEXT,
-                        scan_timestamp TEXT NOT NULL,
-                        pair_address TEXT,
-                        token_name TEXT,
-                        token_symbol TEXT,
-                        token_decimals INTEGER,
-                        token_total_supply TEXT,
-                        token_age_hours REAL,
-                        hp_simulation_success INTEGER,
-                        hp_buy_tax REAL,
-                        hp_sell_tax REAL,
-                        hp_transfer_tax REAL,
-                        hp_liquidity_amount REAL,
-                        hp_pair_reserves0 TEXT,
-                        hp_pair_reserves1 TEXT,
-                        hp_buy_gas_used INTEGER,
-                        hp_sell_gas_used INTEGER,
-                        hp_creation_time TEXT,
-                        hp_holder_count INTEGER,
-                        hp_is_honeypot INTEGER,
-                        hp_honeypot_reason TEXT,
-                        hp_is_open_source INTEGER,
-                        hp_is_proxy INTEGER,
-                        hp_is_mintable INTEGER,
-                        hp_can_be_minted INTEGER,
-                        hp_owner_address TEXT,
-                        hp_creator_address TEXT,
-                        hp_deployer_address TEXT,
-                        hp_has_proxy_calls INTEGER,
-                        hp_pair_liquidity REAL,
-                        hp_pair_liquidity_token0 REAL,
-                        hp_pair_liquidity_token1 REAL,
-                        hp_pair_token0_symbol TEXT,
-                        hp_pair_token1_symbol TEXT,
-                        hp_flags TEXT,
-                        gp_is_open_source INTEGER,
-                        gp_is_proxy INTEGER,
-                        gp_is_mintable INTEGER,
-                        gp_owner_address TEXT,
-                        gp_creator_address TEXT,
-                        gp_can_take_back_ownership INTEGER,
-                        gp_owner_change_balance INTEGER,
-                        gp_hidden_owner INTEGER,
-                        gp_selfdestruct INTEGER,
-                        gp_external_call INTEGER,
-                        gp_buy_tax REAL,
-                        gp_sell_tax REAL,
-                        gp_is_anti_whale INTEGER,
-                        gp_anti_whale_modifiable INTEGER,
-                        gp_cannot_buy INTEGER,
-                        gp_cannot_sell_all INTEGER,
-                        gp_slippage_modifiable INTEGER,
-                        gp_personal_slippage_modifiable INTEGER,
-                        gp_trading_cooldown INTEGER,
-                        gp_is_blacklisted INTEGER,
-                        gp_is_whitelisted INTEGER,
-                        gp_is_in_dex INTEGER,
-                        gp_transfer_pausable INTEGER,
-                        gp_can_be_minted INTEGER,
-                        gp_total_supply TEXT,
-                        gp_holder_count INTEGER,
-                        gp_owner_percent REAL,
-                        gp_owner_balance TEXT,
-                        gp_creator_percent REAL,
-                        gp_creator_balance TEXT,
-                        gp_lp_holder_count INTEGER,
-                        gp_lp_total_supply TEXT,
-                        gp_is_true_token INTEGER,
-                        gp_is_airdrop_scam INTEGER,
-                        gp_trust_list TEXT,
-                        gp_other_potential_risks TEXT,
-                        gp_note TEXT,
-                        gp_honeypot_with_same_creator INTEGER,
-                        gp_fake_token INTEGER,
-                        gp_holders TEXT,
-                        gp_lp_holders TEXT,
-                        gp_dex_info TEXT,
-                        total_scans INTEGER DEFAULT 1,
-                        honeypot_failures INTEGER DEFAULT 0,
-                        last_error TEXT,
-                        status TEXT DEFAULT 'new',
-                        liq10 REAL,
-                        liq20 REAL,
-                        liq30 REAL,
-                        liq40 REAL,
-                        liq50 REAL,
-                        liq60 REAL,
-                        liq70 REAL,
-                        liq80 REAL,
-                        liq90 REAL,
-                        liq100 REAL,
-                        liq110 REAL,
-                        liq120 REAL,
-                        liq130 REAL,
-                        liq140 REAL,
-                        liq150 REAL,
-                        liq160 REAL,
-                        liq170 REAL,
-                        liq180 REAL,
-                        liq190 REAL,
-                        liq200 REAL
-                    )
-                """)
+                # Narrow update of the changed columns (or upsert of a new token)
+                self.write_scan_record(cursor, record, previous_record)
                 
-                # Single INSERT OR REPLACE operation for main table
-                columns = [
-                    "token_address", "scan_timestamp", "pair_address", "token_name", "token_symbol",
-                    "token_decimals", "token_total_supply", "token_age_hours",
-                    "hp_simulation_success", "hp_buy_tax", "hp_sell_tax", "hp_transfer_tax",
-                    "hp_liquidity_amount", "hp_pair_reserves0", "hp_pair_reserves1",
-                    "hp_buy_gas_used", "hp_sell_gas_used", "hp_creation_time",
-                    "hp_holder_count", "hp_is_honeypot", "hp_honeypot_reason",
-                    "hp_is_open_source", "hp_is_proxy", "hp_is_mintable", "hp_can_be_minted",
-                    "hp_owner_address", "hp_creator_address", "hp_deployer_address",
-                    "hp_has_proxy_calls", "hp_pair_liquidity", "hp_pair_liquidity_token0",
-                    "hp_pair_liquidity_token1", "hp_pair_token0_symbol", "hp_pair_token1_symbol",
-                    "hp_flags",
-                    # GoPlus columns
-                    "gp_is_open_source", "gp_is_proxy", "gp_is_mintable",
-                    "gp_owner_address", "gp_creator_address", "gp_can_take_back_ownership",
-                    "gp_owner_change_balance", "gp_hidden_owner", "gp_selfdestruct",
-                    "gp_external_call", "gp_buy_tax", "gp_sell_tax", "gp_is_anti_whale",
-                    "gp_anti_whale_modifiable", "gp_cannot_buy", "gp_cannot_sell_all",
-                    "gp_slippage_modifiable", "gp_personal_slippage_modifiable",
-                    "gp_trading_cooldown", "gp_is_blacklisted", "gp_is_whitelisted",
-                    "gp_is_in_dex", "gp_transfer_pausable", "gp_can_be_minted",
-                    "gp_total_supply", "gp_holder_count", "gp_owner_percent",
-                    "gp_owner_balance", "gp_creator_percent", "gp_creator_balance",
-                    "gp_lp_holder_count", "gp_lp_total_supply", "gp_is_true_token",
-                    "gp_is_airdrop_scam", "gp_trust_list", "gp_other_potential_risks",
-                    "gp_note", "gp_honeypot_with_same_creator", "gp_fake_token",
-                    "gp_holders", "gp_lp_holders", "gp_dex_info",
-                    # Metadata columns
-                    "total_scans", "honeypot_failures", "last_error", "status",
-                    "liq10", "liq20", "liq30", "liq40", "liq50", "liq60", "liq70", "liq80", "liq90", "liq100",
-                    "liq110", "liq120", "liq130", "liq140", "liq150", "liq160", "liq170", "liq180", "liq190", "liq200"
-                ]
-                placeholders = ", ".join(["?" for _ in range(len(columns))])
-                
-                # Insert into main table
-                cursor.execute(f"""
-                    INSERT OR REPLACE INTO scan_records ({", ".join(columns)})
-                    VALUES ({placeholders})
-                """, values)
-                
-                # Insert into token-specific table
-                cursor.execute(f"""
-                    INSERT OR REPLACE INTO {token_table_name} ({", ".join(columns)})
-                    VALUES ({placeholders})
-                """, values)
-                
-                db.commit()
+                # One scan_history row per scan, changed or not
+                cursor.execute(self.INSERT_SCAN_HISTORY_SQL, values)
+
+            persisted = await self.write_behind.put(persist)
 
             # Check if token should be moved to HONEYPOTS table
-            is_honeypot = bool(honeypot_result.get('isHoneypot', True))
+            is_honeypot = bool(hp['hp_is_honeypot'])
             if token_age_hours is not None:
                 await self.check_and_move_honeypot(token_address, token_age_hours, is_honeypot)
 
+            # The scan row must be committed before the caller marks the pair event processed
+            await persisted
+
             # Print API stats after processing
             print("\nAPI Call Statistics:")
             print("=" * 50)
@@ -1423,23 +1210,8 @@ class TokenChecker:
             stats_table.add_column("Errors", style="red")
             stats_table.add_column("Rate Limits", style="magenta")
             
-            # Initialize empty response counters
-            empty_responses = {
-                'goplus': 0,
-                'honeypot': 0
-            }
-            
-            # Check for empty responses
-            if not goplus_data or not isinstance(goplus_data, dict) or not goplus_data.get('result'):
-                empty_responses['goplus'] = 1
-            if not honeypot_data or not isinstance(honeypot_data, dict) or not honeypot_data.get('simulationSuccess'):
-                empty_responses['honeypot'] = 1
-            
-            # Get stats from api_tracker
+            # Get stats from api_tracker (session totals kept in memory)
             for endpoint, stats in api_tracker.calls_by_endpoint.items():
-                # Update empty response count
-                stats["empty_response_count"] = empty_responses.get(endpoint, 0)
-                
                 stats_table.add_row(
                     endpoint,
                     str(stats["total_calls"]),
@@ -1455,9 +1227,9 @@ class TokenChecker:
 
         except Exception as e:
             error_message = str(e)
-            if db_path:
+            if self.db:
                 try:
-                    with sqlite3.connect(db_path) as error_db:
+                    def record_failure(error_db):
                         error_cursor = error_db.cursor()
                         error_cursor.execute('''
                             UPDATE scan_records 
@@ -1570,7 +1342,7 @@ class TokenChecker:
                             # Delete from scan_records
                             error_cursor.execute('DELETE FROM scan_records WHERE token_address = ?', (token_address,))
 
-                        error_db.commit()
+                    await self.write_behind.put(record_failure)
                 except sqlite3.Error as db_error:
                     log_message(f"Failed to update error status in database: {str(db_error)}", "ERROR")
                 except Exception as unexpected_error:
@@ -1584,388 +1356,185 @@ class TokenChecker:
     async def process_rescan_tokens(self):
         """Process tokens that need rescanning"""
         try:
-            db_path = os.path.join(self.folder_name, 'scan_records.db')
             print("\nChecking for tokens to rescan...")
             
-            with sqlite3.connect(db_path) as db:
-                cursor = db.cursor()
-                
-                # First check how many tokens are in the database
-                cursor.execute('SELECT COUNT(*) FROM scan_records WHERE status = "active"')
-                total_active = cursor.fetchone()[0]
-                print(f"Total active tokens in database: {total_active}")
+            # First check how many tokens are in the database
+            total_active = (await self.db.fetchone('SELECT COUNT(*) FROM scan_records WHERE status = "active"'))[0]
+            print(f"Total active tokens in database: {total_active}")
+            
+            # Get tokens that need rescanning
+            tokens = await self.db.fetchall('''
+                SELECT token_address, pair_address, total_scans, scan_timestamp, hp_liquidity_amount
+                FROM scan_records 
+                WHERE status = 'active'
+                ORDER BY scan_timestamp ASC
+            ''')
+            print(f"Found {len(tokens)} tokens eligible for rescan")
+            
+            if tokens:
+                # Refresh unchanged pairs from on-chain reserves, full API scans for the rest
+                full_tokens, light_samples = await self.select_full_rescans(tokens)
+                if light_samples:
+                    await self.write_behind.put(self.record_light_samples, light_samples)
+                    log_message(f"Refreshed {len(light_samples)} tokens from on-chain reserves, "
+                                f"{len(full_tokens)} need a full rescan", "INFO")
+
+                # First process all tokens
+                if self.worker_pool:
+                    # Queue every token on the shared pool and wait for the batch
+                    futures = []
+                    for token_address, pair_address, total_scans, scan_timestamp, _ in full_tokens:
+                        print(f"\nQueueing rescan for token {token_address} (scan #{total_scans}, last: {scan_timestamp})")
+                        futures.append(await self.worker_pool.submit(token_address, pair_address))
+                    await asyncio.gather(*futures, return_exceptions=True)
+                else:
+                    for token_address, pair_address, total_scans, scan_timestamp, _ in full_tokens:
+                        print(f"\nRescanning token {token_address}")
+                        print(f"Current scan count: {total_scans}")
+                        print(f"Last scan time: {scan_timestamp}")
+                        await self.process_token(token_address, pair_address)
+
+                # After all processing and API stats are shown, display the rescan queue
+                print("\nRescan Queue:")
+                print("=" * 50)
+                rescan_table = Table(title="[bold yellow]RESCAN QUEUE", border_style="yellow")
+                rescan_table.add_column("Token Address", style="cyan")
+                rescan_table.add_column("Token Name", style="green")
+                rescan_table.add_column("Pair Address", style="magenta")
+                rescan_table.add_column("GoPlus Liquidity", style="blue")
+                rescan_table.add_column("Honeypot Liquidity", style="red")
+                rescan_table.add_column("Scan #", style="yellow")
+                rescan_table.add_column("Last Scan", style="white")
                 
-                # Get tokens that need rescanning - reduced to 1 at a time
-                cursor.execute('''
-                    SELECT token_address, pair_address, total_scans, scan_timestamp
+                # Refresh token data after processing (one query instead of one per token)
+                await self.write_behind.flush()
+                updated_tokens = await self.db.fetchall('''
+                    SELECT token_address, pair_address, total_scans, scan_timestamp,
+                           token_name, hp_liquidity_amount, gp_dex_info
                     FROM scan_records 
                     WHERE status = 'active'
                     ORDER BY scan_timestamp ASC
                 ''')
                 
-                tokens = cursor.fetchall()
-                print(f"Found {len(tokens)} tokens eligible for rescan")
-                
-                if tokens:
-                    # First process all tokens
-                    for token_address, pair_address, total_scans, scan_timestamp in tokens:
-                        print(f"\nRescanning token {token_address}")
-                        print(f"Current scan count: {total_scans}")
-                        print(f"Last scan time: {scan_timestamp}")
-                        await self.process_token(token_address, pair_address)
-                        await asyncio.sleep(5)  # Increased delay between rescans
-
-                    # After all processing and API stats are shown, display the rescan queue
-                    print("\nRescan Queue:")
-                    print("=" * 50)
-                    rescan_table = Table(title="[bold yellow]RESCAN QUEUE", border_style="yellow")
-                    rescan_table.add_column("Token Address", style="cyan")
-                    rescan_table.add_column("Token Name", style="green")
-                    rescan_table.add_column("Pair Address", style="magenta")
-                    rescan_table.add_column("GoPlus Liquidity", style="blue")
-                    rescan_table.add_column("Honeypot Liquidity", style="red")
-                    rescan_table.add_column("Scan #", style="yellow")
-                    rescan_table.add_column("Last Scan", style="white")
+                for token_address, pair_address, total_scans, scan_timestamp, db_name, db_liquidity, db_dex_info in updated_tokens:
+                    token_name = db_name if db_name else "Unknown"
+                    honeypot_liquidity = f"${float(db_liquidity):,.2f}" if db_liquidity else "N/A"
                     
-                    # Refresh token data after processing
-                    cursor.execute('''
-                        SELECT token_address, pair_address, total_scans, scan_timestamp
-                        FROM scan_records 
-                        WHERE status = 'active'
-                        ORDER BY scan_timestamp ASC
-                    ''')
-                    updated_tokens = cursor.fetchall()
+                    # Parse GoPlus DEX info to get liquidity
+                    goplus_liquidity = "N/A"
+                    if db_dex_info:
+                        try:
+                            dex_info = json.loads(db_dex_info)
+                            if dex_info and isinstance(dex_info, list):
+                                # Sum up liquidity from all DEXes and multiply by 2
+                                total_liquidity = sum(float(dex.get('liquidity', 0)) for dex in dex_info) * 2
+                                goplus_liquidity = f"${total_liquidity:,.2f}"
+                        except (json.JSONDecodeError, ValueError):
+                            goplus_liquidity = "N/A"
                     
-                    for token_address, pair_address, total_scans, scan_timestamp in updated_tokens:
-                        # Get token info from database
-                        cursor.execute('''
-                            SELECT token_name, hp_liquidity_amount, gp_dex_info 
-                            FROM scan_records 
-                            WHERE token_address = ?
-                        ''', (token_address,))
-                        db_data = cursor.fetchone()
-                        
-                        token_name = db_data[0] if db_data and db_data[0] else "Unknown"
-                        honeypot_liquidity = f"${float(db_data[1]):,.2f}" if db_data and db_data[1] else "N/A"
-                        
-                        # Parse GoPlus DEX info to get liquidity
-                        goplus_liquidity = "N/A"
-                        if db_data and db_data[2]:
-                            try:
-                                dex_info = json.loads(db_data[2])
-                                if dex_info and isinstance(dex_info, list):
-                                    # Sum up liquidity from all DEXes and multiply by 2
-                                    total_liquidity = sum(float(dex.get('liquidity', 0)) for dex in dex_info) * 2
-                                    goplus_liquidity = f"${total_liquidity:,.2f}"
-                            except (json.JSONDecodeError, ValueError):
-                                goplus_liquidity = "N/A"
-                        
-                        rescan_table.add_row(
-                            token_address,
-                            token_name,
-                            pair_address,
-                            goplus_liquidity,
-                            honeypot_liquidity,
-                            str(total_scans + 1),
-                            scan_timestamp
-                        )
-                    
-                    console.print(rescan_table)
-                else:
-                    log_message("No tokens need rescanning at this time", "INFO")
+                    rescan_table.add_row(
+                        token_address,
+                        token_name,
+                        pair_address,
+                        goplus_liquidity,
+                        honeypot_liquidity,
+                        str(total_scans + 1),
+                        scan_timestamp
+                    )
+                
+                console.print(rescan_table)
+
+                # Periodically thin out old liquidity samples
+                if time.time() - self.last_downsample >= LIQUIDITY_DOWNSAMPLING['INTERVAL']:
+                    self.last_downsample = time.time()
+                    removed = await self.db.write(self.downsample_liquidity_samples)
+                    if removed:
+                        log_message(f"Downsampled {removed} old liquidity samples", "INFO")
+            else:
+                log_message("No tokens need rescanning at this time", "INFO")
                 
         except Exception as e:
             log_message(f"Error in process_rescan_tokens: {str(e)}", "ERROR")
             print("\nFull traceback:")
             traceback.print_exc()
 
-    def get_next_spinner(self):
-        """Get next spinner character and rotate index"""
-        char = self.spinner_chars[self.spinner_idx]
-        self.spinner_idx = (self.spinner_idx + 1) % len(self.spinner_chars)
-        return char
+    async def select_full_rescans(self, tokens: List[tuple]) -> Tuple[List[tuple], List[tuple]]:
+        """
+        Split rescans into full API scans and lightweight on-chain refreshes
 
-    def get_rescan_status_table(self, current_time, last_rescan_time, rescan_interval):
-        """Create a table showing rescan status and countdown"""
-        status_table = Table(title="[bold cyan]Rescan Status", border_style="cyan", box=None)
-        status_table.add_column("Active Tokens", style="green")
-        status_table.add_column("Next Rescan In", style="yellow")
-        status_table.add_column("Last Rescan", style="blue")
-        
-        # Calculate time until next rescan
-        time_since_last = (current_time - last_rescan_time).total_seconds()
-        time_until_next = max(0, rescan_interval - time_since_last)
-        minutes = int(time_until_next // 60)
-        seconds = int(time_until_next % 60)
-        
-        # Get active token count
-        try:
-            db_path = os.path.join(self.folder_name, 'scan_records.db')
-            with sqlite3.connect(db_path) as db:
-                cursor = db.cursor()
-                cursor.execute('SELECT COUNT(*) FROM scan_records WHERE status = "active"')
-                active_count = cursor.fetchone()[0]
-                
-                # Get last scan info
-                cursor.execute('''
-                    SELECT token_address, scan_timestamp, total_scans 
-                    FROM scan_records 
-                    WHERE status = "active"
-                    ORDER BY scan_timestamp DESC
-                    LIMIT 1
-                ''')
-                last_scan = cursor.fetchone()
-                if last_scan:
-                    last_token = f"{last_scan[0][:8]}... (Scan #{last_scan[2]})"
-                    last_time = last_scan[1]
-                else:
-                    last_token = "None"
-                    last_time = "Never"
-                
-        except Exception:
-            active_count = "?"
-            last_token = "Error"
-            last_time = "Error"
-        
-        status_table.add_row(
-            f"{active_count} tokens",
-            f"{minutes:02d}:{seconds:02d}",
-            f"{last_token} at {last_time}"
-        )
-        
-        return status_table
+        getReserves for every pair is read in one batched multicall. A token gets a
+        full Honeypot/GoPlus rescan when its WETH reserve moved by at least
+        reserve_change_threshold since its last full scan, when that scan is older
+        than full_rescan_interval, or when its reserves can't be read. Otherwise its
+        liquidity is estimated locally by scaling the last full-scan liquidity by the
+        WETH reserve ratio.
 
-    async def process_token_safe(self, token_address: str, pair_address: str):
-        """Process a token with semaphore to prevent parallel execution"""
-        async with self.process_semaphore:
-            await self.checker.process_token(token_address, pair_address)
+        Args:
+            tokens: (token_address, pair_address, total_scans, scan_timestamp, hp_liquidity_amount) rows
 
-    def stop(self):
-        """Gracefully stop the main loop"""
-        self.running = False
+        Returns:
+            (rows needing a full rescan, liquidity_samples rows for the rest)
+        """
+        settings = self.rescan_config or {}
+        if not settings.get('light_rescan', False):
+            return tokens, []
 
-    async def main_loop(self):
-        """Main event loop with API tracking"""
-        print("\n=== Initializing Main Loop ===")
-        last_check_time = datetime.now()
-        last_rescan_time = datetime.now()
-        check_interval = 1  # seconds between new pair checks
-        rescan_interval = self.config['scanning']['rescan_interval']  # Get from config
-        
-        if not self.event_filter:
-            print("Error: Event filter not initialized")
-            return
-        
-        # Create combined table container
-        combined_table = Table(show_header=False, border_style="bold white")
-        
-        # Create and add config table
-        config_table = Table(show_header=False, border_style="bold white", width=40)
-        config_table.add_column("Setting", style="cyan")
-        config_table.add_column("Value", style="green")
-        config_table.add_row("Check Interval", f"{check_interval} seconds")
-        config_table.add_row("Rescan Interval", f"{rescan_interval} seconds")
-        config_table.add_row("Max Rescans", str(self.config['scanning']['max_rescan_count']))
-        config_table.add_row("Honeypot Failure Limit", str(self.config['scanning']['honeypot_failure_limit']))
-        config_table.add_row("Filter Refresh Interval", f"{self.filter_refresh_interval} seconds")
-        config_table.add_row("Min Blocks Before Refresh", str(self.min_blocks_before_refresh))
-        config_table.add_row("Reorg Protection Blocks", str(self.reorg_protection_blocks))
-        
-        # Create and add block table
-        block_table = Table(show_header=False, border_style="bold white", width=40)
-        block_table.add_column("Field", style="cyan")
-        block_table.add_column("Value", style="green")
-        
-        current_block = await self.tracker.web3.eth.block_number
-        start_block = max(current_block - 1000, 0)  # Look back 1000 blocks
-        
-        block_table.add_row("Current Block", str(current_block))
-        block_table.add_row("Start Block", str(start_block))
-        
-        # Add both tables to combined container
-        combined_table.add_row(config_table, block_table)
-        console.print(combined_table)
-        
         try:
-            # Process last few pairs before starting live monitoring
-            hours = float(input("\nEnter number of hours to scan back (e.g. 1): "))
-            print(f"\nScanning back {hours} hours...")
-            
-            # Calculate blocks to look back based on average block time (13 seconds for Ethereum)
-            blocks_per_hour = int(3600 / 13)  # ~277 blocks per hour
-            blocks_to_scan = int(blocks_per_hour * hours)
-            
-            current_block = await self.tracker.web3.eth.block_number
-            start_block = max(current_block - blocks_to_scan, 0)
-            
-            print(f"Current block: {current_block}")
-            print(f"Start block: {start_block}")
-            print(f"Scanning {blocks_to_scan} blocks...")
-            
-            # Setup event filter for historical range
-            self.event_filter = await self.tracker.factory_contract.events.PairCreated.create_filter(
-                fromBlock=start_block,
-                toBlock=current_block
-            )
-            self.last_processed_block = start_block
-            self.filter_start_block = start_block
-            
-            # Get historical events
-            entries = await self.event_filter.get_all_entries()
-            
-            # Filter entries to only include WETH pairs
-            weth_pairs = []
-            for entry in entries:
-                token0 = entry['args']['token0']
-                token1 = entry['args']['token1']
-                pair = entry['args']['pair']
-                
-                # Check if either token is WETH
-                if token0.lower() == self.tracker.weth_address.lower():
-                    weth_pairs.append((token1, pair))  # Store non-WETH token and pair
-                elif token1.lower() == self.tracker.weth_address.lower():
-                    weth_pairs.append((token0, pair))  # Store non-WETH token and pair
-            
-            # Process all WETH pairs found
-            print(f"\nFound {len(weth_pairs)} WETH pairs in the last {hours} hours")
-            
-            for i, (token_address, pair_address) in enumerate(weth_pairs, 1):
-                print(f"\n{'='*80}")
-                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Processing Historical Pair {i}/{len(weth_pairs)}")
-                print(f"Token: {token_address}")
-                print(f"Pair: {pair_address}")
-                print(f"{'='*80}\n")
-                
-                try:
-                    await self.process_token_safe(token_address, pair_address)
-                except Exception as e:
-                    print(f"Error processing historical token {token_address}: {str(e)}")
-                    continue
-                
-                # Add delay spinner between historical pairs
-                await self.delay_with_spinner(10, "Waiting before next historical pair")
-            
-            print("\nStarting live monitoring...")
-            
-            # Reset event filter for live monitoring
-            self.event_filter = await self.tracker.factory_contract.events.PairCreated.create_filter(fromBlock='latest')
-            self.last_processed_block = current_block
-            self.filter_start_block = current_block
-            
-            while self.running:
-                current_time = datetime.now()
-                
-                # Process rescans on interval
-                if (current_time - last_rescan_time).total_seconds() >= rescan_interval:
-                    print("\n") # Clear line before rescan output
-                    try:
-                        await self.checker.process_rescan_tokens()
-                    except Exception as e:
-                        print(f"Error during rescan: {str(e)}")
-                    last_rescan_time = current_time
-                    print("\nResuming monitoring...")
-                
-                # Check for new pairs on interval
-                if (current_time - last_check_time).total_seconds() >= check_interval:
-                    try:
-                        # First refresh the filter if needed
-                        await self.refresh_event_filter()
-                        
-                        events = await self.event_filter.get_new_entries()
-                        
-                        if events:
-                            print(f"\nFound {len(events)} new pair(s)")
-                            for event in events:
-                                # Skip if we've already processed this block
-                                if event['blockNumber'] <= (self.last_processed_block or 0):
-                                    continue
-                                
-                                # Validate event first
-                                if not await self.validate_event(event):
-                                    print("⏳ Skipping event - needs more confirmations")
-                                    continue
-                                    
-                                token0 = event['args']['token0']
-                                token1 = event['args']['token1']
-                                pair = event['args']['pair']
-                                
-                                # Only process the non-WETH token
-                                token_to_process = None
-                                if token0.lower() == self.tracker.weth_address.lower():
-                                    token_to_process = token1
-                                elif token1.lower() == self.tracker.weth_address.lower():
-                                    token_to_process = token0
-                                
-                                if token_to_process:
-                                    try:
-                                        await self.process_token_safe(token_to_process, pair)
-                                        # Update last processed block ONLY after successful processing
-                                        self.last_processed_block = max(
-                                            self.last_processed_block or 0,
-                                            event['blockNumber']
-                                        )
-                                    except Exception as e:
-                                        print(f"Error processing new token {token_to_process}: {str(e)}")
-                                        continue
-                                    
-                                    # Add delay spinner between new pairs
-                                    await self.delay_with_spinner(30, "Waiting before next pair")
-                                    
-                        else:
-                            # Calculate time until next rescan
-                            time_since_last_rescan = (current_time - last_rescan_time).total_seconds()
-                            time_until_next_rescan = max(0, rescan_interval - time_since_last_rescan)
-                            minutes = int(time_until_next_rescan // 60)
-                            seconds = int(time_until_next_rescan % 60)
-                            
-                            # Update spinner with unified status line
-                            filter_age = (datetime.now() - self.last_filter_refresh).total_seconds()
-                            status = f"\r{self.get_next_spinner()} Status | Block: {current_block} | Filter Age: {filter_age:.0f}s | Next Rescan: {minutes:02d}:{seconds:02d} | Last: {self.last_processed_block}"
-                            print(status, end="", flush=True)
-                            
-                        last_check_time = current_time
-                        
-                    except Exception as e:
-                        print(f"\nError checking for new pairs: {str(e)}")
-                        # Try to refresh the filter on error
-                        await self.refresh_event_filter()
-                        await self.delay_with_spinner(5, "Waiting before retry")
-                    
-                # Small sleep to prevent CPU overuse
-                await asyncio.sleep(0.05)
-                
-        except asyncio.CancelledError:
-            print("\n=== Main Loop Cancelled ===")
-            print("Shutting down gracefully...")
+            reserves = await self.tracker.get_reserves_many([row[1] for row in tokens if row[1]])
         except Exception as e:
-            print("\n=== Main Loop Fatal Error ===")
-            print(f"Error: {str(e)}")
-            print("Full traceback:")
-            traceback.print_exc()
-        finally:
-            self.running = False
-            await api_wrapper.close()
-            print("\n=== Main Loop Stopped ===")
-            print(f"Final time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            # Print final stats
-            api_tracker.print_stats()
+            log_message(f"Batched reserve read failed, doing full rescans: {str(e)}", "WARNING")
+            return tokens, []
+        reserves = {pair.lower(): value for pair, value in reserves.items()}
+
+        weth = self.tracker.weth_address.lower()
+        threshold = float(settings.get('reserve_change_threshold', 0.05))
+        interval = float(settings.get('full_rescan_interval', 3600))
+        now = datetime.now()
+
+        full_tokens, light_samples = [], []
+        for row in tokens:
+            token_address, pair_address, total_scans, scan_timestamp, hp_liquidity = row
+            pair_reserves = reserves.get((pair_address or '').lower())
+            if pair_reserves is None:
+                full_tokens.append(row)
+                continue
+
+            # Pair tokens are sorted by address, so WETH is token0 when its address is lower
+            weth_reserve = pair_reserves[0] if weth < token_address.lower() else pair_reserves[1]
+            baseline = self.reserve_baseline.get(token_address.lower())
+            try:
+                age = (now - datetime.strptime(scan_timestamp, '%Y-%m-%d %H:%M:%S')).total_seconds()
+            except (TypeError, ValueError):
+                age = float('inf')
 
-    async def delay_with_spinner(self, seconds: int, message: str):
-        """Show a countdown spinner while delaying"""
-        start_time = time.time()
-        while time.time() - start_time < seconds:
-            remaining = int(seconds - (time.time() - start_time))
-            spinner = self.get_next_spinner()
-            print(f"\r{spinner} {message} ({remaining}s remaining)... ", end="", flush=True)
-            await asyncio.sleep(0.1)
-        print("\r" + " " * 100 + "\r", end="", flush=True)  # Clear the line
+            if not baseline or abs(weth_reserve - baseline) / baseline >= threshold or age >= interval:
+                self.reserve_baseline[token_address.lower()] = weth_reserve
+                full_tokens.append(row)
+            else:
+                liquidity = float(hp_liquidity or 0) * weth_reserve / baseline
+                light_samples.append((
+                    token_address,
+                    int(now.timestamp()),
+                    total_scans,
+                    liquidity,
+                    str(pair_reserves[0]),
+                    str(pair_reserves[1])
+                ))
+
+        return full_tokens, light_samples
+
+    def record_light_samples(self, db, samples: List[tuple]):
+        """Store liquidity samples from on-chain refreshes (runs on the writer connection)"""
+        db.executemany('''
+            INSERT INTO liquidity_samples (token_address, ts, scan_no, liquidity, reserves0, reserves1)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', samples)
 
     async def check_and_move_honeypot(self, token_address: str, token_age_hours: float, is_honeypot: bool):
         """Check if token meets honeypot criteria and move it if necessary"""
         if token_age_hours > 1.0 and is_honeypot:
-            db_path = os.path.join(self.folder_name, 'scan_records.db')
             try:
-                with sqlite3.connect(db_path) as db:
+                def move_to_honeypots(db):
                     cursor = db.cursor()
                     
                     # Get token data
@@ -2061,166 +1630,20 @@ class TokenChecker:
                         
                         # Delete from scan_records
                         cursor.execute('DELETE FROM scan_records WHERE token_address = ?', (token_address,))
-                        db.commit()
-                        
-                        print(f"\nMoved token {token_address} to HONEYPOTS table (Age: {token_age_hours:.2f} hours)")
                         return True
+                    return False
+
+                # Queued behind this token's scan upsert so the row is there to move
+                moved = await self.write_behind.put(move_to_honeypots)
+                if await moved:
+                    print(f"\nMoved token {token_address} to HONEYPOTS table (Age: {token_age_hours:.2f} hours)")
+                    return True
             except sqlite3.Error as e:
                 print(f"Database error moving honeypot: {str(e)}")
             except Exception as e:
                 print(f"Error moving honeypot: {str(e)}")
         return False
 
-    async def refresh_event_filter(self):
-        """Refresh the event filter to prevent staleness"""
-        try:
-            current_block = await self.tracker.web3.eth.block_number
-            blocks_passed = current_block - (self.last_processed_block or current_block)
-            time_since_refresh = (datetime.now() - self.last_filter_refresh).total_seconds()
-            
-            # Only refresh if enough time has passed or enough blocks have accumulated
-            if (blocks_passed >= self.min_blocks_before_refresh or 
-                time_since_refresh >= self.filter_refresh_interval):
-                
-                # Create new filter starting from last processed block
-                new_start_block = self.last_processed_block if self.last_processed_block else (current_block - 1000)
-                
-                # Only print refresh status once
-                print(f"\r🔄 Refreshing Filter | Block {new_start_block} -> latest", end="", flush=True)
-                
-                try:
-                    self.event_filter = await self.tracker.factory_contract.events.PairCreated.create_filter(
-                        fromBlock=new_start_block,
-                        toBlock='latest'
-                    )
-                    
-                    self.filter_start_block = new_start_block
-                    self.last_filter_refresh = datetime.now()
-                    
-                    # Verify new filter with a single get_all_entries call
-                    test_events = await self.event_filter.get_all_entries()
-                    print(f"\r✅ Filter Refreshed | Found {len(test_events)} events | Block {new_start_block} -> latest", end="\n")
-                    
-                    # Process any events found during verification
-                    if test_events:
-                        for event in test_events:
-                            if event['blockNumber'] > (self.last_processed_block or 0):
-                                if await self.validate_event(event):
-                                    token0 = event['args']['token0']
-                                    token1 = event['args']['token1']
-                                    pair = event['args']['pair']
-                                    
-                                    token_to_process = None
-                                    if token0.lower() == self.tracker.weth_address.lower():
-                                        token_to_process = token1
-                                    elif token1.lower() == self.tracker.weth_address.lower():
-                                        token_to_process = token0
-                                    
-                                    if token_to_process:
-                                        await self.process_token_safe(token_to_process, pair)
-                                        self.last_processed_block = max(
-                                            self.last_processed_block or 0,
-                                            event['blockNumber']
-                                        )
-                    
-                    return True
-                    
-                except Exception as e:
-                    print(f"\n⚠️ Error during filter refresh: {str(e)}")
-                    return False
-            
-            return True
-            
-        except Exception as e:
-            print(f"\n❌ Error in refresh_event_filter: {str(e)}")
-            return False
-
-    async def validate_event(self, event):
-        """Validate event against chain reorganizations"""
-        try:
-            receipt = await self.tracker.web3.eth.get_transaction_receipt(event['transactionHash'])
-            current_block = await self.tracker.web3.eth.block_number
-            
-            # Check if event has enough confirmations
-            confirmations = current_block - receipt['blockNumber']
-            is_valid = confirmations >= self.reorg_protection_blocks
-            
-            if not is_valid:
-                print(f"\n⚠️ Event at block {receipt['blockNumber']} needs more confirmations")
-                print(f"Current block: {current_block}, Confirmations: {confirmations}")
-                print(f"Required confirmations: {self.reorg_protection_blocks}")
-            
-            return is_valid
-            
-        except Exception as e:
-            print(f"❌ Error validating event: {str(e)}")
-            return False
-
-    def get_next_spinner(self):
-        """Get next spinner character and rotate index"""
-        char = self.spinner_chars[self.spinner_idx]
-        self.spinner_idx = (self.spinner_idx + 1) % len(self.spinner_chars)
-        return char
-
-    def get_rescan_status_table(self, current_time, last_rescan_time, rescan_interval):
-        """Create a table showing rescan status and countdown"""
-        status_table = Table(title="[bold cyan]Rescan Status", border_style="cyan", box=None)
-        status_table.add_column("Active Tokens", style="green")
-        status_table.add_column("Next Rescan In", style="yellow")
-        status_table.add_column("Last Rescan", style="blue")
-        
-        # Calculate time until next rescan
-        time_since_last = (current_time - last_rescan_time).total_seconds()
-        time_until_next = max(0, rescan_interval - time_since_last)
-        minutes = int(time_until_next // 60)
-        seconds = int(time_until_next % 60)
-        
-        # Get active token count
-        try:
-            db_path = os.path.join(self.folder_name, 'scan_records.db')
-            with sqlite3.connect(db_path) as db:
-                cursor = db.cursor()
-                cursor.execute('SELECT COUNT(*) FROM scan_records WHERE status = "active"')
-                active_count = cursor.fetchone()[0]
-                
-                # Get last scan info
-                cursor.execute('''
-                    SELECT token_address, scan_timestamp, total_scans 
-                    FROM scan_records 
-                    WHERE status = "active"
-                    ORDER BY scan_timestamp DESC
-                    LIMIT 1
-                ''')
-                last_scan = cursor.fetchone()
-                if last_scan:
-                    last_token = f"{last_scan[0][:8]}... (Scan #{last_scan[2]})"
-                    last_time = last_scan[1]
-                else:
-                    last_token = "None"
-                    last_time = "Never"
-                
-        except Exception:
-            active_count = "?"
-            last_token = "Error"
-            last_time = "Error"
-        
-        status_table.add_row(
-            f"{active_count} tokens",
-            f"{minutes:02d}:{seconds:02d}",
-            f"{last_token} at {last_time}"
-        )
-        
-        return status_table
-
-    async def process_token_safe(self, token_address: str, pair_address: str):
-        """Process a token with semaphore to prevent parallel execution"""
-        async with self.process_semaphore:
-            await self.checker.process_token(token_address, pair_address)
-
-    def stop(self):
-        """Gracefully stop the main loop"""
-        self.running = False
-
 
 def load_config(config_path):
     """Load and validate configuration from file"""
@@ -2242,7 +1665,22 @@ def load_config(config_path):
             "max_rescan_count": 1000,
             "remove_after_max_scans": True,
             "honeypot_failure_limit": 5,
-            "liquidity_multiplier": 1
+            "liquidity_multiplier": 1,
+            "workers": 4,  # Tokens processed concurrently
+            "write_batch_size": 100,  # Scan upserts per transaction
+            "write_flush_interval": 1.0,  # Max seconds before buffered upserts are committed
+            "write_max_pending": 1000,  # Buffered upserts before workers wait for a flush
+            "light_rescan": False,  # Opt-in: estimate liquidity of unchanged pairs from on-chain reserves instead of rescanning via the APIs
+            "full_rescan_interval": 3600,  # Max seconds between full API rescans of a token
+            "reserve_change_threshold": 0.05,  # WETH reserve change that forces a full rescan
+            "sync_tracking": True,  # Sample liquidity from Sync events of active pairs
+            "sync_poll_interval": 12,  # Seconds between Sync log polls (~1 block)
+            "sync_address_chunk": 500,  # Pair addresses per eth_getLogs call
+            "backfill_concurrency": 4,  # Parallel eth_getLogs chunks during backfill
+            "backfill_chunk_blocks": 2000,  # Starting backfill chunk size (adapts to provider limits)
+            "confirmation_blocks": 12,  # Blocks a PairCreated log must be buried under before it is processed
+            "finality_blocks": 64,  # Depth until which processed pairs are watched for reorgs
+            "pair_poll_max_blocks": 500  # Largest block range per live eth_getLogs poll
         }
         
         for key, default_value in scanning_defaults.items():
@@ -2288,8 +1726,15 @@ class TokenTrackerMain:
         print(f"Selected folder name: {folder_name}")
         self.folder_name = folder_name
         self.config = load_config(config_file)
+        rate_scheduler.configure(self.config.get('rate_limits', {}))
+        api_wrapper.configure(
+            self.config.get('http', {}),
+            self.config.get('goplus_batch', {}),
+            self.config.get('response_cache', {})
+        )
         self.tracker = TokenTracker(config_file)  # Pass config file path instead of config dict
-        self.checker = TokenChecker(self.tracker, self.folder_name)
+        self.checker = TokenChecker(self.tracker, self.folder_name, self.config['scanning'])
+        self.db = self.checker.db  # Shared session database
         
         # Initialize state variables
         self.running = True
@@ -2300,26 +1745,46 @@ class TokenTrackerMain:
         self.spinner_chars = ['⠋', '⠙', '⠹', '⠸', '⠼', '⠴', '⠦', '⠧', '⠇', '⠏']
         self.spinner_idx = 0
         
-        # Add semaphore to prevent parallel processing
-        self.process_semaphore = asyncio.Semaphore(1)
+        # Bounded worker pool so one slow token doesn't hold up other new pairs
+        self.worker_pool = TokenWorkerPool(
+            self.checker.process_token,
+            workers=self.config['scanning']['workers']
+        )
+        self.checker.worker_pool = self.worker_pool
+        self.rescan_task = None
+        self.write_behind = self.checker.write_behind  # Batched write-behind for scan upserts
+        
+        # Per-block liquidity from Sync events of active pairs
+        self.sync_tracker = None
+        if self.config['scanning']['sync_tracking']:
+            self.sync_tracker = SyncTracker(
+                self.tracker,
+                self.checker,
+                poll_interval=self.config['scanning']['sync_poll_interval'],
+                address_chunk=self.config['scanning']['sync_address_chunk']
+            )
+        self.sync_task = None
+        self.backfill_pairs = 0
+        self.block_resolver = BlockTimeResolver(lambda: self.tracker.web3, self.db)
+        self.pair_log = PairEventLog(self.db)  # Durable PairCreated cursor
         
         # Add last stats print time tracking
         self.last_stats_print = datetime.now()
 
-        # Filter management properties
+        # Live PairCreated polling
         self.last_processed_block = None
-        self.filter_start_block = None
-        self.last_filter_refresh = datetime.now()
-        self.filter_refresh_interval = 300  # 5 minutes in seconds
-        self.min_blocks_before_refresh = 100  # Minimum blocks before refresh
-        self.reorg_protection_blocks = 12  # Number of block confirmations required
+        self.reorg_protection_blocks = self.config['scanning']['confirmation_blocks']  # Number of block confirmations required
+        self.pair_poller = PairCreatedPoller(
+            lambda: self.tracker.web3,
+            self.tracker.uniswap_factory_address,
+            confirmations=self.reorg_protection_blocks,
+            finality_blocks=self.config['scanning']['finality_blocks'],
+            max_blocks=self.config['scanning']['pair_poll_max_blocks']
+        )
         
         # Initialize latest pair
         self.initialize_latest_pair()
         
-        # Initialize event filter as None, will be set up in async init
-        self.event_filter = None
-        
         # Initialize key manager first
         self.key_manager = InfuraKeyManager()
         self.key_manager.initialize(
@@ -2331,26 +1796,22 @@ class TokenTrackerMain:
     def initialize_latest_pair(self):
         """Initialize latest pair from database"""
         try:
-            db_path = os.path.join(self.folder_name, 'scan_records.db')
-            with sqlite3.connect(db_path) as db:
-                cursor = db.cursor()
-                # Get the most recent pair
-                cursor.execute('''
-                    SELECT token_address, pair_address 
-                    FROM scan_records 
-                    ORDER BY scan_timestamp DESC 
-                    LIMIT 1
-                ''')
-                result = cursor.fetchone()
-                
-                if result:
-                    self.latest_token = result[0]
-                    self.latest_pair = result[1]
-                    print(f"Initialized with latest pair: {self.latest_pair}")
-                else:
-                    print("No previous pairs found in database")
-                    self.latest_token = None
-                    self.latest_pair = None
+            # Get the most recent pair
+            result = self.db.fetchone_sync('''
+                SELECT token_address, pair_address 
+                FROM scan_records 
+                ORDER BY scan_timestamp DESC 
+                LIMIT 1
+            ''')
+            
+            if result:
+                self.latest_token = result[0]
+                self.latest_pair = result[1]
+                print(f"Initialized with latest pair: {self.latest_pair}")
+            else:
+                print("No previous pairs found in database")
+                self.latest_token = None
+                self.latest_pair = None
                     
         except Exception as e:
             print(f"Error initializing latest pair: {str(e)}")
@@ -2370,126 +1831,23 @@ class TokenTrackerMain:
 
     async def async_init(self):
         """Async initialization tasks"""
-        await self.setup_event_filter()
-
-    async def setup_event_filter(self):
-        """Setup event filter for new pairs"""
-        try:
-            print("Setting up Uniswap event filter...")
-            # Create filter looking back more blocks to ensure we find pairs
-            current_block = await self.tracker.web3.eth.block_number
-            # Look back 1000 blocks to ensure we find some pairs
-            start_block = max(current_block - 1000, 0)
-            self.event_filter = await self.tracker.factory_contract.events.PairCreated.create_filter(fromBlock=start_block)
-            self.last_processed_block = current_block
-            self.filter_start_block = start_block
-            self.last_filter_refresh = datetime.now()
-            print("Event filter setup successfully")
-            
-            # Verify filter is working by getting entries
-            try:
-                entries = await self.event_filter.get_all_entries()
-                print(f"Event filter verified working - found {len(entries)} historical entries")
-                
-                if len(entries) > 0:
-                    # Show some info about the entries found
-                    print(f"Found pairs from blocks {entries[0]['blockNumber']} to {entries[-1]['blockNumber']}")
-                    print(f"Block range searched: {start_block} to {current_block}")
-                
-            except Exception as e:
-                print(f"Warning: Could not verify filter: {str(e)}")
-                
-        except Exception as e:
-            print(f"Error setting up event filter: {str(e)}")
-            print("Full traceback:")
-            import traceback
-            traceback.print_exc()
-            raise
-
-    async def refresh_event_filter(self):
-        """Refresh the event filter to prevent staleness"""
-        try:
-            current_block = await self.tracker.web3.eth.block_number
-            blocks_passed = current_block - (self.last_processed_block or current_block)
-            time_since_refresh = (datetime.now() - self.last_filter_refresh).total_seconds()
-            
-            # Only refresh if enough time has passed or enough blocks have accumulated
-            if (blocks_passed >= self.min_blocks_before_refresh or 
-                time_since_refresh >= self.filter_refresh_interval):
-                
-                # Create new filter starting from last processed block
-                new_start_block = self.last_processed_block if self.last_processed_block else (current_block - 1000)
-                
-                # Only print refresh status once
-                print(f"\r🔄 Refreshing Filter | Block {new_start_block} -> latest", end="", flush=True)
-                
-                try:
-                    self.event_filter = await self.tracker.factory_contract.events.PairCreated.create_filter(
-                        fromBlock=new_start_block,
-                        toBlock='latest'
-                    )
-                    
-                    self.filter_start_block = new_start_block
-                    self.last_filter_refresh = datetime.now()
-                    
-                    # Verify new filter with a single get_all_entries call
-                    test_events = await self.event_filter.get_all_entries()
-                    print(f"\r✅ Filter Refreshed | Found {len(test_events)} events | Block {new_start_block} -> latest", end="\n")
-                    
-                    # Process any events found during verification
-                    if test_events:
-                        for event in test_events:
-                            if event['blockNumber'] > (self.last_processed_block or 0):
-                                if await self.validate_event(event):
-                                    token0 = event['args']['token0']
-                                    token1 = event['args']['token1']
-                                    pair = event['args']['pair']
-                                    
-                                    token_to_process = None
-                                    if token0.lower() == self.tracker.weth_address.lower():
-                                        token_to_process = token1
-                                    elif token1.lower() == self.tracker.weth_address.lower():
-                                        token_to_process = token0
-                                    
-                                    if token_to_process:
-                                        await self.process_token_safe(token_to_process, pair)
-                                        self.last_processed_block = max(
-                                            self.last_processed_block or 0,
-                                            event['blockNumber']
-                                        )
-                    
-                    return True
-                    
-                except Exception as e:
-                    print(f"\n⚠️ Error during filter refresh: {str(e)}")
-                    return False
-            
-            return True
-            
-        except Exception as e:
-            print(f"\n❌ Error in refresh_event_filter: {str(e)}")
-            return False
-
-    async def validate_event(self, event):
-        """Validate event against chain reorganizations"""
-        try:
-            receipt = await self.tracker.web3.eth.get_transaction_receipt(event['transactionHash'])
-            current_block = await self.tracker.web3.eth.block_number
-            
-            # Check if event has enough confirmations
-            confirmations = current_block - receipt['blockNumber']
-            is_valid = confirmations >= self.reorg_protection_blocks
-            
-            if not is_valid:
-                print(f"\n⚠️ Event at block {receipt['blockNumber']} needs more confirmations")
-                print(f"Current block: {current_block}, Confirmations: {confirmations}")
-                print(f"Required confirmations: {self.reorg_protection_blocks}")
-            
-            return is_valid
-            
-        except Exception as e:
-            print(f"❌ Error validating event: {str(e)}")
-            return False
+        self.worker_pool.start()
+        await self.resume_pair_stream()
+
+    async def resume_pair_stream(self):
+        """Re-queue pairs left unfinished by the previous run of this session"""
+        cursor = self.pair_log.load_cursor()
+        if cursor is None:
+            print("No PairCreated cursor yet, starting a new stream")
+            return
+        print(f"Resuming PairCreated stream after block {cursor[0]} (log {cursor[1]})")
+        
+        unfinished = await self.pair_log.unfinished_events()
+        for block_number, log_index, token_address, pair_address in unfinished:
+            future = await self.process_token_safe(token_address, pair_address)
+            self.pair_log.track(future, block_number, log_index)
+        if unfinished:
+            print(f"Re-queued {len(unfinished)} pairs that were still processing at shutdown")
 
     async def delay_with_spinner(self, seconds: int, message: str):
         """Show a countdown spinner while delaying"""
@@ -2522,27 +1880,22 @@ class TokenTrackerMain:
         
         # Get active token count
         try:
-            db_path = os.path.join(self.folder_name, 'scan_records.db')
-            with sqlite3.connect(db_path) as db:
-                cursor = db.cursor()
-                cursor.execute('SELECT COUNT(*) FROM scan_records WHERE status = "active"')
-                active_count = cursor.fetchone()[0]
-                
-                # Get last scan info
-                cursor.execute('''
-                    SELECT token_address, scan_timestamp, total_scans 
-                    FROM scan_records 
-                    WHERE status = "active"
-                    ORDER BY scan_timestamp DESC
-                    LIMIT 1
-                ''')
-                last_scan = cursor.fetchone()
-                if last_scan:
-                    last_token = f"{last_scan[0][:8]}... (Scan #{last_scan[2]})"
-                    last_time = last_scan[1]
-                else:
-                    last_token = "None"
-                    last_time = "Never"
+            active_count = self.db.fetchone_sync('SELECT COUNT(*) FROM scan_records WHERE status = "active"')[0]
+            
+            # Get last scan info
+            last_scan = self.db.fetchone_sync('''
+                SELECT token_address, scan_timestamp, total_scans 
+                FROM scan_records 
+                WHERE status = "active"
+                ORDER BY scan_timestamp DESC
+                LIMIT 1
+            ''')
+            if last_scan:
+                last_token = f"{last_scan[0][:8]}... (Scan #{last_scan[2]})"
+                last_time = last_scan[1]
+            else:
+                last_token = "None"
+                last_time = "Never"
                 
         except Exception:
             active_count = "?"
@@ -2557,15 +1910,101 @@ class TokenTrackerMain:
         
         return status_table
 
+    async def handle_pair_event(self, event: Dict, label: str = "New") -> bool:
+        """
+        Record a decoded PairCreated event and queue its non-WETH token
+
+        The event and the stream cursor are committed before the token is queued;
+        events already in the pair log are ignored, so nothing is queued twice.
+
+        Returns:
+            True if the token was queued
+        """
+        weth = self.tracker.weth_address.lower()
+        if event['token0'].lower() == weth:
+            token_address = event['token1']
+        elif event['token1'].lower() == weth:
+            token_address = event['token0']
+        else:
+            return False
+        
+        if not await self.pair_log.record(event, token_address):
+            return False
+        
+        print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Queueing {label} Pair | Block: {event['block_number']} | Token: {token_address} | Pair: {event['pair']}")
+        future = await self.process_token_safe(token_address, event['pair'])
+        self.pair_log.track(future, event['block_number'], event['log_index'])
+        self.last_processed_block = max(self.last_processed_block or 0, event['block_number'])
+        return True
+
+    async def queue_pair_events(self, events: List[Dict]):
+        """Queue the WETH pairs of a batch of decoded PairCreated events found by the backfill"""
+        for event in events:
+            try:
+                if await self.handle_pair_event(event, "Historical"):
+                    self.backfill_pairs += 1
+            except Exception as e:
+                print(f"Error queueing historical pair {event['pair']}: {str(e)}")
+
     async def process_token_safe(self, token_address: str, pair_address: str):
-        """Process a token with semaphore to prevent parallel execution"""
-        async with self.process_semaphore:
-            await self.checker.process_token(token_address, pair_address)
+        """Queue a token on the worker pool (duplicates of in-flight tokens are merged)"""
+        return await self.worker_pool.submit(token_address, pair_address)
+
+    async def run_rescan(self):
+        """Run a rescan pass in the background so live pairs keep flowing"""
+        try:
+            await self.checker.process_rescan_tokens()
+        except Exception as e:
+            print(f"Error during rescan: {str(e)}")
+        print("\nResuming monitoring...")
 
     def stop(self):
         """Gracefully stop the main loop"""
         self.running = False
 
+    def print_worker_stats(self):
+        """Print worker pool statistics"""
+        stats = self.worker_pool.get_stats()
+        stats_table = Table(title="Worker Pool Statistics", border_style="blue")
+        stats_table.add_column("Metric", style="cyan")
+        stats_table.add_column("Value", style="green")
+        stats_table.add_row("Workers", str(stats["workers"]))
+        stats_table.add_row("Processed", str(stats["processed"]))
+        stats_table.add_row("Failed", str(stats["failed"]))
+        stats_table.add_row("Deduplicated", str(stats["deduplicated"]))
+        stats_table.add_row("Queue Depth", str(stats["queue_depth"]))
+        stats_table.add_row("Max Queue Depth", str(stats["max_queue_depth"]))
+        stats_table.add_row("Avg Queue Wait", f"{stats['avg_wait_seconds']:.1f}s")
+
+        write_stats = self.write_behind.get_stats()
+        stats_table.add_row("DB Writes", str(write_stats["jobs"]))
+        stats_table.add_row("DB Batches", f"{write_stats['batches']} (avg {write_stats['avg_batch']:.1f}, max {write_stats['largest_batch']})")
+        stats_table.add_row("DB Write Failures", str(write_stats["failed"]))
+        stats_table.add_row("DB Back-pressure Waits", str(write_stats["backpressure_waits"]))
+        stats_table.add_row("DB Flush Time", f"{write_stats['flush_time']:.2f}s")
+
+        if self.sync_tracker:
+            sync_stats = self.sync_tracker.get_stats()
+            stats_table.add_row("Sync Pairs Tracked", str(sync_stats["pairs"]))
+            stats_table.add_row("Sync Logs / Samples", f"{sync_stats['logs']} / {sync_stats['samples']}")
+
+        cache_stats = api_wrapper.get_cache_stats()
+        stats_table.add_row("API Cache Hits / Stale / Misses", f"{cache_stats['hits']} / {cache_stats['stale_hits']} / {cache_stats['misses']}")
+        batch_stats = api_wrapper.goplus_batcher.get_stats()
+        stats_table.add_row("GoPlus Lookups / Calls", f"{batch_stats['lookups']} / {batch_stats['batches']} (avg batch {batch_stats['avg_batch']:.1f})")
+
+        router_stats = self.tracker.rpc_router.get_stats()
+        stats_table.add_row("RPC Endpoints", str(router_stats["endpoints"]))
+        stats_table.add_row("RPC Requests", f"{router_stats['requests']} ({router_stats['failovers']} failovers)")
+        stats_table.add_row("RPC Hedged / Won", f"{router_stats['hedged']} / {router_stats['hedge_wins']}")
+        for key_stats in self.key_manager.get_stats():
+            cooldown = f" | cooling {key_stats['cooldown']:.0f}s" if key_stats["cooldown"] else ""
+            stats_table.add_row(
+                f"Infura Key {key_stats['index']}",
+                f"{key_stats['requests']} req | {key_stats['rate_limits']} 429 | {key_stats['errors']} err | {key_stats['latency_ms']:.0f}ms{cooldown}"
+            )
+        console.print(stats_table)
+
     async def main_loop(self):
         """Main event loop with API tracking"""
         print("\n=== Initializing Main Loop ===")
@@ -2574,10 +2013,6 @@ class TokenTrackerMain:
         check_interval = 1  # seconds between new pair checks
         rescan_interval = self.config['scanning']['rescan_interval']  # Get from config
         
-        if not self.event_filter:
-            print("Error: Event filter not initialized")
-            return
-        
         # Create combined table container
         combined_table = Table(show_header=False, border_style="bold white")
         
@@ -2587,11 +2022,12 @@ class TokenTrackerMain:
         config_table.add_column("Value", style="green")
         config_table.add_row("Check Interval", f"{check_interval} seconds")
         config_table.add_row("Rescan Interval", f"{rescan_interval} seconds")
+        config_table.add_row("Workers", str(self.worker_pool.workers))
+        config_table.add_row("Sync Tracking", f"every {self.sync_tracker.poll_interval:.0f}s" if self.sync_tracker else "off")
         config_table.add_row("Max Rescans", str(self.config['scanning']['max_rescan_count']))
         config_table.add_row("Honeypot Failure Limit", str(self.config['scanning']['honeypot_failure_limit']))
-        config_table.add_row("Filter Refresh Interval", f"{self.filter_refresh_interval} seconds")
-        config_table.add_row("Min Blocks Before Refresh", str(self.min_blocks_before_refresh))
         config_table.add_row("Reorg Protection Blocks", str(self.reorg_protection_blocks))
+        config_table.add_row("Reorg Watch Depth", f"{self.pair_poller.finality_blocks} blocks")
         
         # Create and add block table
         block_table = Table(show_header=False, border_style="bold white", width=40)
@@ -2613,125 +2049,71 @@ class TokenTrackerMain:
             hours = float(input("\nEnter number of hours to scan back (e.g. 1): "))
             print(f"\nScanning back {hours} hours...")
             
-            # Calculate blocks to look back based on average block time (13 seconds for Ethereum)
-            blocks_per_hour = int(3600 / 13)  # ~277 blocks per hour
-            blocks_to_scan = int(blocks_per_hour * hours)
-            
+            # Resolve the first block inside the window from block timestamps
             current_block = await self.tracker.web3.eth.block_number
-            start_block = max(current_block - blocks_to_scan, 0)
+            start_block = await self.block_resolver.block_hours_ago(hours, current_block)
+            blocks_to_scan = current_block - start_block + 1
             
             print(f"Current block: {current_block}")
             print(f"Start block: {start_block}")
             print(f"Scanning {blocks_to_scan} blocks...")
             
-            # Setup event filter for historical range
-            self.event_filter = await self.tracker.factory_contract.events.PairCreated.create_filter(
-                fromBlock=start_block,
-                toBlock=current_block
+            # Fetch PairCreated logs in parallel chunks; discovered pairs go straight to the worker pool
+            backfill = LogBackfill(
+                lambda: self.tracker.web3,
+                self.db,
+                self.tracker.uniswap_factory_address,
+                concurrency=self.config['scanning']['backfill_concurrency'],
+                initial_chunk=self.config['scanning']['backfill_chunk_blocks']
             )
+            # Only confirmed blocks are backfilled; the newest ones go through the poller's pending set
+            backfill_end = max(start_block - 1, current_block - self.reorg_protection_blocks)
             self.last_processed_block = start_block
-            self.filter_start_block = start_block
+            self.backfill_pairs = 0
+            found = await backfill.run(start_block, backfill_end, self.queue_pair_events)
             
-            # Get historical events
-            entries = await self.event_filter.get_all_entries()
-            
-            # Filter entries to only include WETH pairs
-            weth_pairs = []
-            for entry in entries:
-                token0 = entry['args']['token0']
-                token1 = entry['args']['token1']
-                pair = entry['args']['pair']
-                
-                # Check if either token is WETH
-                if token0.lower() == self.tracker.weth_address.lower():
-                    weth_pairs.append((token1, pair))  # Store non-WETH token and pair
-                elif token1.lower() == self.tracker.weth_address.lower():
-                    weth_pairs.append((token0, pair))  # Store non-WETH token and pair
-            
-            # Process all WETH pairs found
-            print(f"\nFound {len(weth_pairs)} WETH pairs in the last {hours} hours")
-            
-            for i, (token_address, pair_address) in enumerate(weth_pairs, 1):
-                print(f"\n{'='*80}")
-                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Processing Historical Pair {i}/{len(weth_pairs)}")
-                print(f"Token: {token_address}")
-                print(f"Pair: {pair_address}")
-                print(f"{'='*80}\n")
-                
-                try:
-                    await self.process_token_safe(token_address, pair_address)
-                except Exception as e:
-                    print(f"Error processing historical token {token_address}: {str(e)}")
-                    continue
-                
-                # Add delay spinner between historical pairs
-                await self.delay_with_spinner(10, "Waiting before next historical pair")
+            print(f"\nFound {found} pairs ({self.backfill_pairs} WETH pairs queued) in the last {hours} hours")
             
+            # Historical pairs keep processing on the pool while live monitoring starts
             print("\nStarting live monitoring...")
+            if self.sync_tracker:
+                self.sync_task = asyncio.create_task(self.sync_tracker.run())
             
-            # Reset event filter for live monitoring
-            self.event_filter = await self.tracker.factory_contract.events.PairCreated.create_filter(fromBlock='latest')
-            self.last_processed_block = current_block
-            self.filter_start_block = current_block
+            # Poll live from after the durable cursor (or the end of the backfill for a new stream)
+            cursor = self.pair_log.load_cursor()
+            live_start = cursor[0] + 1 if cursor and cursor[0] < backfill_end else backfill_end + 1
+            self.pair_poller.start_at(live_start)
+            self.last_processed_block = live_start - 1
             
             while self.running:
                 current_time = datetime.now()
                 
-                # Process rescans on interval
+                # Process rescans on interval (skipped if the previous pass is still running)
                 if (current_time - last_rescan_time).total_seconds() >= rescan_interval:
-                    print("\n") # Clear line before rescan output
-                    try:
-                        await self.checker.process_rescan_tokens()
-                    except Exception as e:
-                        print(f"Error during rescan: {str(e)}")
+                    if self.rescan_task is None or self.rescan_task.done():
+                        print("\n") # Clear line before rescan output
+                        self.rescan_task = asyncio.create_task(self.run_rescan())
                     last_rescan_time = current_time
-                    print("\nResuming monitoring...")
                 
                 # Check for new pairs on interval
                 if (current_time - last_check_time).total_seconds() >= check_interval:
                     try:
-                        # First refresh the filter if needed
-                        await self.refresh_event_filter()
+                        # Events that reached reorg_protection_blocks confirmations (fresher ones stay pending)
+                        events, reorged = await self.pair_poller.poll()
+                        current_block = self.pair_poller.head or current_block
                         
-                        events = await self.event_filter.get_new_entries()
+                        for event in reorged:
+                            if await self.pair_log.rollback(event):
+                                print(f"\n↩️ Pair {event['pair']} was reorged out of block {event['block_number']} - tombstoned")
                         
                         if events:
                             print(f"\nFound {len(events)} new pair(s)")
                             for event in events:
-                                # Skip if we've already processed this block
-                                if event['blockNumber'] <= (self.last_processed_block or 0):
+                                try:
+                                    await self.handle_pair_event(event)
+                                except Exception as e:
+                                    print(f"Error processing new pair {event['pair']}: {str(e)}")
                                     continue
-                                
-                                # Validate event first
-                                if not await self.validate_event(event):
-                                    print("⏳ Skipping event - needs more confirmations")
-                                    continue
-                                    
-                                token0 = event['args']['token0']
-                                token1 = event['args']['token1']
-                                pair = event['args']['pair']
-                                
-                                # Only process the non-WETH token
-                                token_to_process = None
-                                if token0.lower() == self.tracker.weth_address.lower():
-                                    token_to_process = token1
-                                elif token1.lower() == self.tracker.weth_address.lower():
-                                    token_to_process = token0
-                                
-                                if token_to_process:
-                                    try:
-                                        await self.process_token_safe(token_to_process, pair)
-                                        # Update last processed block ONLY after successful processing
-                                        self.last_processed_block = max(
-                                            self.last_processed_block or 0,
-                                            event['blockNumber']
-                                        )
-                                    except Exception as e:
-                                        print(f"Error processing new token {token_to_process}: {str(e)}")
-                                        continue
-                                    
-                                    # Add delay spinner between new pairs
-                                    await self.delay_with_spinner(30, "Waiting before next pair")
                                     
                         else:
                             # Calculate time until next rescan
@@ -2741,16 +2123,13 @@ class TokenTrackerMain:
                             seconds = int(time_until_next_rescan % 60)
                             
                             # Update spinner with unified status line
-                            filter_age = (datetime.now() - self.last_filter_refresh).total_seconds()
-                            status = f"\r{self.get_next_spinner()} Status | Block: {current_block} | Filter Age: {filter_age:.0f}s | Next Rescan: {minutes:02d}:{seconds:02d} | Last: {self.last_processed_block}"
+                            status = f"\r{self.get_next_spinner()} Status | Block: {current_block} | Pending: {len(self.pair_poller.pending)} | Next Rescan: {minutes:02d}:{seconds:02d} | {self.worker_pool.status_line()} | Last: {self.last_processed_block}"
                             print(status, end="", flush=True)
                             
                         last_check_time = current_time
                         
                     except Exception as e:
                         print(f"\nError checking for new pairs: {str(e)}")
-                        # Try to refresh the filter on error
-                        await self.refresh_event_filter()
                         await self.delay_with_spinner(5, "Waiting before retry")
                     
                 # Small sleep to prevent CPU overuse
@@ -2766,11 +2145,21 @@ class TokenTrackerMain:
             traceback.print_exc()
         finally:
             self.running = False
+            if self.rescan_task and not self.rescan_task.done():
+                self.rescan_task.cancel()
+            if self.sync_task and not self.sync_task.done():
+                self.sync_task.cancel()
+            await self.worker_pool.stop()
+            await self.pair_log.close()
+            await self.write_behind.close()
+            await asyncio.to_thread(self.db.close)  # Drain queued writes before exit
             await api_wrapper.close()
+            await api_tracker.close()
             print("\n=== Main Loop Stopped ===")
             print(f"Final time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             # Print final stats
             api_tracker.print_stats()
+            self.print_worker_stats()
 
 
 if __name__ == "__main__":
@@ -1,7 +1,7 @@
 import json
-from web3 import AsyncWeb3, AsyncHTTPProvider
-from dataclasses import dataclass
-from typing import List, Optional
+from web3 import AsyncWeb3
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
 import logging
 import time
 import threading
@@ -9,6 +9,9 @@ from datetime import datetime, timedelta
 import os
 import sqlite3
 from key_manager import InfuraKeyManager
+from rpc_router import RpcRouter
+from multicall import Multicall, encode_call, decode_string, decode_uint
+from eth_abi import decode
 
 @dataclass
 class TokenTrackerConfig:
@@ -27,6 +30,8 @@ class TokenTrackerConfig:
     maximum_sell_tax: int
     max_honeypot_failures: int
     buy_amount: float
+    rpc_endpoints: List[str] = field(default_factory=list)  # RPC URLs besides the Infura keys
+    rpc_hedging: bool = True
 
 class TokenTracker:
     def __init__(self, config_path: str):
@@ -37,10 +42,15 @@ class TokenTracker:
             key_rotation_interval=self.config.key_rotation_interval,
             key_swap_sleep_time=self.config.key_swap_sleep_time
         )
-        self.web3 = AsyncWeb3(AsyncHTTPProvider(self.key_manager.get_current_rpc_url()))
+        self.rpc_router = RpcRouter(
+            self.key_manager,
+            [self.config.node_rpc] + self.config.rpc_endpoints,
+            hedge=self.config.rpc_hedging
+        )
         self.setup_logging()
         self.load_abis()
         self.setup_contracts()
+        self.multicall = Multicall(lambda: self.web3)
         
     def load_config(self, config_path: str) -> TokenTrackerConfig:
         """Load configuration from JSON file"""
@@ -65,7 +75,9 @@ class TokenTracker:
                 maximum_buy_tax=int(config_data['maximum_buy_tax']),
                 maximum_sell_tax=int(config_data['maximum_sell_tax']),
                 max_honeypot_failures=int(config_data['max_honeypot_failures']),
-                buy_amount=float(config_data['buy_amount'])
+                buy_amount=float(config_data['buy_amount']),
+                rpc_endpoints=list(config_data.get('rpc_endpoints', [])),
+                rpc_hedging=bool(config_data.get('rpc_hedging', True))
             )
 
     def setup_logging(self):
@@ -101,38 +113,91 @@ class TokenTracker:
             abi=self.uniswap_router_abi
         )
 
+    @property
+    def web3(self) -> AsyncWeb3:
+        """Web3 instance whose requests are routed over every RPC endpoint"""
+        return self.rpc_router.web3
+
     def _get_current_rpc_url(self) -> str:
         """Get the current Infura RPC URL with the current key"""
         return self.key_manager.get_current_rpc_url()
 
     def rotate_key(self) -> None:
-        """Rotate to the next Infura API key"""
+        """Cool down the current Infura key and switch to the healthiest other one"""
         self.key_manager.rotate_key()
-        self.web3 = AsyncWeb3(AsyncHTTPProvider(self._get_current_rpc_url()))
 
     def check_and_rotate_key(self) -> None:
-        """Check if it's time to rotate the key and do so if needed"""
+        """Re-select the healthiest Infura key"""
         self.key_manager.check_and_rotate_key()
-        self.web3 = AsyncWeb3(AsyncHTTPProvider(self._get_current_rpc_url()))
+
+    async def get_token_metadata_many(self, token_addresses: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """
+        Read name, symbol, decimals and totalSupply for many tokens in batched multicalls
+
+        Returns:
+            {token_address: {'name', 'symbol', 'decimals', 'total_supply'}} with None for
+            tokens where neither decimals nor totalSupply could be read
+        """
+        addresses = [AsyncWeb3.to_checksum_address(address) for address in token_addresses]
+        fields = ('name', 'symbol', 'decimals', 'totalSupply')
+        calls = [(address, encode_call(field)) for address in addresses for field in fields]
+        results = await self.multicall.aggregate3(calls)
+
+        metadata = {}
+        for index, address in enumerate(addresses):
+            (name_ok, name), (symbol_ok, symbol), (decimals_ok, decimals), (supply_ok, supply) = \
+                results[index * 4:index * 4 + 4]
+            if not decimals_ok and not supply_ok:
+                metadata[address] = None
+                continue
+            metadata[address] = {
+                'name': decode_string(name) if name_ok else None,
+                'symbol': decode_string(symbol) if symbol_ok else None,
+                'decimals': decode_uint(decimals) if decimals_ok else None,
+                'total_supply': decode_uint(supply) if supply_ok else None
+            }
+        return metadata
+
+    async def get_pairs_many(self, token_addresses: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Look up the token/WETH pair for many tokens in batched multicalls"""
+        addresses = [AsyncWeb3.to_checksum_address(address) for address in token_addresses]
+        calls = [
+            (self.uniswap_factory_address,
+             encode_call('getPair', ('address', 'address'), (address, self.weth_address)))
+            for address in addresses
+        ]
+        results = await self.multicall.aggregate3(calls)
+
+        pairs = {}
+        for address, (success, data) in zip(addresses, results):
+            pair = AsyncWeb3.to_checksum_address(decode(['address'], data)[0]) if success and data else None
+            pairs[address] = None if pair in (None, '0x0000000000000000000000000000000000000000') else pair
+        return pairs
+
+    async def get_reserves_many(self, pair_addresses: Iterable[str]) -> Dict[str, Optional[tuple]]:
+        """
+        Read getReserves for many pairs in batched multicalls
+
+        Returns:
+            {pair_address: (reserve0, reserve1, block_timestamp_last)} with None for failed reads
+        """
+        addresses = [AsyncWeb3.to_checksum_address(address) for address in pair_addresses]
+        results = await self.multicall.aggregate3([(address, encode_call('getReserves')) for address in addresses])
+
+        reserves = {}
+        for address, (success, data) in zip(addresses, results):
+            reserves[address] = tuple(decode(['uint112', 'uint112', 'uint32'], data)) if success and len(data) >= 96 else None
+        return reserves
 
     async def get_pair_info(self, token_address: str) -> Optional[dict]:
         """Get pair information for a token"""
         try:
-            self.check_and_rotate_key()  # Check if we need to rotate keys
-            pair_address = await self.factory_contract.functions.getPair(
-                token_address,
-                self.weth_address
-            ).call()
+            pair_address = (await self.get_pairs_many([token_address]))[AsyncWeb3.to_checksum_address(token_address)]
             
-            if pair_address == '0x0000000000000000000000000000000000000000':
+            if pair_address is None:
                 return None
-                
-            pair_contract = self.web3.eth.contract(
-                address=pair_address,
-                abi=self.liquidity_pool_abi
-            )
             
-            reserves = await pair_contract.functions.getReserves().call()
+            reserves = (await self.get_reserves_many([pair_address]))[pair_address]
             
             return {
                 'pair_address': pair_address,
@@ -140,31 +205,16 @@ class TokenTracker:
             }
             
         except Exception as e:
-            if "429" in str(e):  # If we hit rate limit, force rotate key
-                self.rotate_key()
-                return await self.get_pair_info(token_address)  # Retry with new key
             self.logger.error(f"Error getting pair info: {str(e)}")
             return None
 
     async def check_token_contract(self, token_address: str) -> Optional[dict]:
         """Check token contract information"""
         try:
-            self.check_and_rotate_key()  # Check if we need to rotate keys
-            token_contract = self.web3.eth.contract(
-                address=token_address,
-                abi=self.token_contract_abi
-            )
-            
-            return {
-                'name': await token_contract.functions.name().call(),
-                'symbol': await token_contract.functions.symbol().call(),
-                'decimals': await token_contract.functions.decimals().call(),
-                'total_supply': await token_contract.functions.totalSupply().call()
-            }
+            # All four reads in a single multicall round trip
+            metadata = await self.get_token_metadata_many([token_address])
+            return metadata[AsyncWeb3.to_checksum_address(token_address)]
             
         except Exception as e:
-            if "429" in str(e):  # If we hit rate limit, force rotate key
-                self.rotate_key()
-                return await self.check_token_contract(token_address)  # Retry with new key
             self.logger.error(f"Error checking token contract: {str(e)}")
             return None
\ No newline at end of file
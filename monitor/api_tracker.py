@@ -1,37 +1,92 @@
-import json
 import time
+import atexit
+import threading
 from datetime import datetime
 import os
 import asyncio
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from rich.console import Console
 from rich.table import Table
+from fast_json import dumps, loads, DecodeError
 
 console = Console()
 
+def read_api_log(path: str) -> List[Dict]:
+    """
+    Read the calls of one API log file
+
+    Handles both the JSON Lines files written by APITracker and the JSON array
+    files of older sessions. Truncated trailing lines (e.g. after a crash) are skipped.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if not path.endswith('.jsonl'):
+            return loads(f.read())
+        calls = []
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                calls.append(loads(line))
+            except DecodeError:
+                continue
+        return calls
+
 class APITracker:
-    def __init__(self, log_dir: str = "api_logs"):
-        """Initialize API tracker with log directory"""
+    def __init__(self,
+                 log_dir: str = "api_logs",
+                 flush_interval: float = 2.0,
+                 flush_bytes: int = 256 * 1024,
+                 max_file_bytes: int = 50 * 1024 * 1024):
+        """
+        Initialize API tracker with log directory
+
+        Calls are appended to a JSON Lines file (one call per line). Lines are
+        buffered in memory and written by a background task every flush_interval
+        seconds, or sooner once flush_bytes are pending. When the active file
+        grows past max_file_bytes it is closed and a new numbered segment started.
+        read_api_log() reads these files (and the JSON array logs of older sessions) back.
+        """
         self.log_dir = log_dir
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.max_file_bytes = max_file_bytes
         self.call_counter = 0
         self.calls_by_endpoint = {}
-        self.lock = asyncio.Lock()
         self.ensure_log_dir()
-        
+
         # Create new log file for this session
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.log_file = os.path.join(self.log_dir, f"api_calls_{self.session_id}.json")
-        
-        # Initialize log file with empty array
-        with open(self.log_file, 'w') as f:
-            json.dump([], f)
-            
+        self.segment = 0
+        self.log_file = self.get_segment_path(self.segment)
+
+        # Write buffer state
+        self.buffer: List[str] = []
+        self.buffer_bytes = 0
+        self.write_lock = threading.Lock()  # Serializes file writes between the flusher thread and atexit
+        self.flush_event = None
+        self.flush_task = None
+
+        # Make sure buffered lines reach disk even if close() is never awaited
+        atexit.register(self.flush_sync)
+
     def ensure_log_dir(self):
         """Ensure log directory exists"""
         if not os.path.exists(self.log_dir):
             os.makedirs(self.log_dir)
-            
-    async def log_api_call(self, 
+
+    def get_segment_path(self, segment: int) -> str:
+        """Get log file path for a rotation segment"""
+        suffix = f".{segment}" if segment else ""
+        return os.path.join(self.log_dir, f"api_calls_{self.session_id}{suffix}.jsonl")
+
+    def ensure_flusher(self):
+        """Start the background flush task on first use inside the event loop"""
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_event = asyncio.Event()
+            self.flush_task = asyncio.create_task(self.flush_loop())
+
+    async def log_api_call(self,
                           endpoint: str,
                           method: str,
                           params: Dict,
@@ -40,7 +95,9 @@ class APITracker:
                           error: Optional[str] = None) -> int:
         """
         Log an API call with details and return the call ID
-        
+
+        Only in-memory work happens here; the line is written by the flusher.
+
         Args:
             endpoint: API endpoint called
             method: HTTP method used
@@ -48,72 +105,121 @@ class APITracker:
             response_code: HTTP response code
             response_body: Response body received
             error: Error message if any
-            
+
         Returns:
             call_id: Unique ID for this API call
         """
-        async with self.lock:
-            self.call_counter += 1
-            call_id = self.call_counter
-            
-            # Record call details
-            call_details = {
-                "id": call_id,
-                "timestamp": datetime.now().isoformat(),
-                "endpoint": endpoint,
-                "method": method,
-                "params": params,
-                "response_code": response_code,
-                "response_body": response_body,
-                "error": error,
-                "time_since_last_call": self.get_time_since_last_call(endpoint)
+        self.call_counter += 1
+        call_id = self.call_counter
+        timestamp = datetime.now().isoformat()
+
+        # Record call details
+        call_details = {
+            "id": call_id,
+            "timestamp": timestamp,
+            "endpoint": endpoint,
+            "method": method,
+            "params": params,
+            "response_code": response_code,
+            "response_body": response_body,
+            "error": error,
+            "time_since_last_call": self.get_time_since_last_call(endpoint)
+        }
+
+        # Update endpoint stats
+        if endpoint not in self.calls_by_endpoint:
+            self.calls_by_endpoint[endpoint] = {
+                "total_calls": 0,
+                "last_call_time": None,
+                "success_count": 0,
+                "error_count": 0,
+                "rate_limit_count": 0,
+                "empty_response_count": 0,
+                "last_empty_time": None
             }
-            
-            # Update endpoint stats
-            if endpoint not in self.calls_by_endpoint:
-                self.calls_by_endpoint[endpoint] = {
-                    "total_calls": 0,
-                    "last_call_time": None,
-                    "success_count": 0,
-                    "error_count": 0,
-                    "rate_limit_count": 0,
-                    "empty_response_count": 0
-                }
-            
-            stats = self.calls_by_endpoint[endpoint]
-            stats["total_calls"] += 1
-            stats["last_call_time"] = time.time()
-            
-            # Initialize empty response tracking
-            stats["empty_response_count"] = stats.get("empty_response_count", 0)
-            
-            if response_code == 200 and not error:
-                # Check for empty or invalid response
-                if (not response_body or 
-                    response_body == '{}' or 
-                    response_body == '[]' or
-                    (isinstance(response_body, dict) and not response_body) or
-                    (isinstance(response_body, dict) and 'result' not in response_body)):
-                    stats["empty_response_count"] += 1
-                else:
-                    stats["success_count"] += 1
-            elif response_code == 429 or "rate limit" in str(response_body).lower():
-                stats["rate_limit_count"] += 1
+
+        stats = self.calls_by_endpoint[endpoint]
+        stats["total_calls"] += 1
+        stats["last_call_time"] = time.time()
+
+        if response_code == 200 and not error:
+            # Check for empty or invalid response
+            if (not response_body or
+                response_body == '{}' or
+                response_body == '[]' or
+                (isinstance(response_body, dict) and not response_body) or
+                (isinstance(response_body, dict) and 'result' not in response_body)):
+                stats["empty_response_count"] += 1
+                stats["last_empty_time"] = timestamp
             else:
-                stats["error_count"] += 1
-            
-            # Append to log file
+                stats["success_count"] += 1
+        elif response_code == 429 or "rate limit" in str(response_body).lower():
+            stats["rate_limit_count"] += 1
+        else:
+            stats["error_count"] += 1
+
+        # Buffer the line for the background writer
+        line = dumps(call_details) + "\n"
+        self.buffer.append(line)
+        self.buffer_bytes += len(line)
+        self.ensure_flusher()
+        if self.buffer_bytes >= self.flush_bytes:
+            self.flush_event.set()
+
+        return call_id
+
+    def take_buffer(self) -> List[str]:
+        """Swap out the pending lines"""
+        lines = self.buffer
+        self.buffer = []
+        self.buffer_bytes = 0
+        return lines
+
+    def write_lines(self, lines: List[str]) -> None:
+        """Append lines to the active segment, rotating when it gets too large"""
+        if not lines:
+            return
+        with self.write_lock:
             try:
-                with open(self.log_file, 'r') as f:
-                    logs = json.load(f)
-                logs.append(call_details)
-                with open(self.log_file, 'w') as f:
-                    json.dump(logs, f, indent=2)
+                with open(self.log_file, 'a', encoding='utf-8') as f:
+                    f.writelines(lines)
+                if os.path.getsize(self.log_file) >= self.max_file_bytes:
+                    self.segment += 1
+                    self.log_file = self.get_segment_path(self.segment)
             except Exception as e:
                 console.print(f"[red]Error writing to log file: {str(e)}")
-            
-            return call_id
-            
+
+    async def flush_loop(self):
+        """Write buffered lines on an interval or when the buffer fills up"""
+        while True:
+            try:
+                await asyncio.wait_for(self.flush_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.flush_event.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write all buffered lines off the event loop"""
+        lines = self.take_buffer()
+        if lines:
+            await asyncio.to_thread(self.write_lines, lines)
+
+    def flush_sync(self):
+        """Write all buffered lines from the calling thread"""
+        self.write_lines(self.take_buffer())
+
+    async def close(self):
+        """Stop the background flusher and write anything still buffered"""
+        if self.flush_task and not self.flush_task.done():
+            self.flush_task.cancel()
+            try:
+                await self.flush_task
+            except asyncio.CancelledError:
+                pass
+        self.flush_task = None
+        await self.flush()
+
     def get_time_since_last_call(self, endpoint: str) -> Optional[float]:
         """Get time in seconds since last call to this endpoint"""
         if endpoint in self.calls_by_endpoint:
@@ -121,7 +227,7 @@ class APITracker:
             if last_call:
                 return time.time() - last_call
         return None
-        
+
     def print_stats(self):
         """Print current API call statistics"""
         # Create main statistics table
@@ -132,28 +238,17 @@ class APITracker:
         main_table.add_column("Empty Responses", style="yellow")
         main_table.add_column("Errors", style="red")
         main_table.add_column("Rate Limits", style="magenta")
-        
+
         # Create detailed tables
         empty_table = Table(title="[bold yellow]Empty Responses", border_style="yellow")
         empty_table.add_column("Endpoint", style="cyan")
         empty_table.add_column("Count", style="yellow")
         empty_table.add_column("Last Call", style="white")
-        
-        # Track empty responses
+
+        # Stats come from in-memory counters kept by log_api_call
         for endpoint, stats in self.calls_by_endpoint.items():
-            # Get empty response count from logs
-            empty_count = 0
-            last_empty_time = None
-            try:
-                with open(self.log_file, 'r') as f:
-                    logs = json.load(f)
-                    for log in logs:
-                        if log['endpoint'] == endpoint and log['response_code'] == 200 and not log['error'] and not log['response_body']:
-                            empty_count += 1
-                            last_empty_time = log['timestamp']
-            except Exception as e:
-                console.print(f"[red]Error reading logs: {str(e)}")
-            
+            empty_count = stats["empty_response_count"]
+
             # Add to main table
             main_table.add_row(
                 endpoint,
@@ -163,19 +258,19 @@ class APITracker:
                 str(stats["error_count"]),
                 str(stats["rate_limit_count"])
             )
-            
+
             # Add to empty responses table if applicable
             if empty_count > 0:
                 empty_table.add_row(
                     endpoint,
                     str(empty_count),
-                    last_empty_time or "Unknown"
+                    stats["last_empty_time"] or "Unknown"
                 )
-        
+
         # Print tables
         console.print(main_table)
         if empty_table.row_count > 0:
             console.print(empty_table)
-        
+
 # Global instance
 api_tracker = APITracker()
@@ -1,50 +1,278 @@
 import aiohttp
-import json
-from typing import Dict, Optional
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Set
 import asyncio
 from api_tracker import api_tracker
+from rate_limiter import rate_scheduler
+from response_cache import ResponseCache
+from fast_json import ResponseDecoder
+from normalizer import GOPLUS_KEYS, HONEYPOT_KEYS
 from rich.console import Console
 
 console = Console()
 
+RATE_LIMIT_BACKOFF = 60  # Seconds an upstream bucket stays closed after a 429
+
+# Connection pool settings, overridable through the "http" config section
+DEFAULT_HTTP_SETTINGS = {
+    "limit": 100,  # Open connections in total
+    "limit_per_host": 10,  # Open connections per API host
+    "keepalive_timeout": 60,  # Seconds an idle connection stays open for reuse
+    "ttl_dns_cache": 300,  # Seconds DNS lookups are cached
+    "connect_timeout": 5,  # Seconds to establish a connection (incl. TLS)
+    "read_timeout": 20,  # Seconds to wait for data on an open connection
+    "total_timeout": 30,  # Seconds for a whole request
+    "compression": True,  # Ask for gzip/deflate responses
+    "typed_decoding": False  # Skip unused response fields while decoding (needs msgspec)
+}
+
+# GoPlus micro-batching, overridable through the "goplus_batch" config section
+DEFAULT_GOPLUS_BATCH = {
+    "window": 0.25,  # Seconds to collect addresses before sending a batch
+    "max_size": 20  # Addresses per token_security request
+}
+
+def goplus_cacheable(address: str) -> Callable[[Dict], bool]:
+    """
+    Cache check for GoPlus responses of one token
+
+    Tokens GoPlus hasn't indexed yet come back as code 1 with an empty entry, and
+    API-level errors (e.g. 4029) can still carry a result; neither is worth
+    serving from the cache, so only a successful response with data for the
+    token is cached.
+    """
+    key = address.lower()
+    def cacheable(data: Dict) -> bool:
+        result = data.get('result')
+        return data.get('code') == 1 and isinstance(result, dict) and bool(result.get(key))
+    return cacheable
+
+def make_decoders(typed: bool) -> Dict[str, ResponseDecoder]:
+    """GoPlus and Honeypot response decoders, optionally skipping the fields process_token never uses"""
+    return {
+        "goplus": ResponseDecoder("GoPlusResponse", ("code", "message", "result"), map_key="result", map_keys=GOPLUS_KEYS, typed=typed),
+        "honeypot": ResponseDecoder("HoneypotResponse", HONEYPOT_KEYS, typed=typed)
+    }
+
+class GoPlusBatcher:
+    def __init__(self, fetch_batch, window: float = 0.25, max_size: int = 20):
+        """
+        Collect GoPlus lookups for a short window and send them as one request
+
+        token_security accepts a comma-separated contract_addresses list, so
+        concurrent lookups (new pairs, rescans) share one call and one unit of
+        rate-limit quota. The batch's result map is fanned back out: every caller
+        gets a response shaped like a single-address call.
+
+        Args:
+            fetch_batch: Coroutine function taking a list of addresses and returning the API response
+            window: Seconds to wait for more addresses after the first one
+            max_size: Addresses per request (a full batch is sent immediately)
+        """
+        self.fetch_batch = fetch_batch
+        self.window = float(window)
+        self.max_size = max(1, int(max_size))
+        self.pending: Dict[str, List[asyncio.Future]] = {}  # address (lowercase) -> waiting callers
+        self.in_flight: Dict[str, List[asyncio.Future]] = {}  # Same, for batches already sent
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.tasks: Set[asyncio.Task] = set()
+        
+        # Stats
+        self.total_lookups = 0
+        self.total_batches = 0
+        
+    async def fetch(self, address: str) -> Dict:
+        """Get the GoPlus response for one address through the next batch"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.total_lookups += 1
+        
+        # Join a request that is already on its way
+        if address.lower() in self.in_flight:
+            self.in_flight[address.lower()].append(future)
+            return await future
+        
+        self.pending.setdefault(address.lower(), []).append(future)
+        if len(self.pending) >= self.max_size:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self.flush)
+        return await future
+        
+    def flush(self):
+        """Send everything collected so far"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, {}
+        self.in_flight.update(batch)
+        task = asyncio.create_task(self.run_batch(batch))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        
+    async def run_batch(self, batch: Dict[str, List[asyncio.Future]]):
+        """Fetch one batch and resolve its callers"""
+        self.total_batches += 1
+        try:
+            data = await self.fetch_batch(list(batch))
+        except Exception as e:
+            console.print(f"[red]GoPlus batch failed: {str(e)}")
+            data = {}
+        for address in batch:
+            self.in_flight.pop(address, None)
+        
+        result = data.get('result')
+        envelope = {key: value for key, value in data.items() if key != 'result'}
+        for address, futures in batch.items():
+            if result is None:
+                response = {}
+            else:
+                response = {**envelope, 'result': {address: result[address]} if address in result else {}}
+            for future in futures:
+                if not future.done():
+                    future.set_result(response)
+        
+    def get_stats(self) -> Dict[str, float]:
+        """Get a snapshot of batching metrics"""
+        return {
+            "lookups": self.total_lookups,
+            "batches": self.total_batches,
+            "avg_batch": self.total_lookups / self.total_batches if self.total_batches else 0.0
+        }
+
 class APIWrapper:
     def __init__(self):
         """Initialize API wrapper with default settings"""
         self.session = None
+        self.transport = None  # Coroutine function (url, params) -> response used instead of HTTP (offline replay)
+        self.settings = dict(DEFAULT_HTTP_SETTINGS)
+        self.decoders = make_decoders(self.settings["typed_decoding"])
+        self.goplus_batcher = GoPlusBatcher(self.call_goplus_batch, **DEFAULT_GOPLUS_BATCH)
+        self.cache_settings: Dict[str, Any] = {}
+        self._cache: Optional[ResponseCache] = None
+        self.closed_cache_stats: Dict[str, int] = {}
+        
+    def configure(self,
+                  settings: Optional[Dict[str, Any]] = None,
+                  goplus_batch: Optional[Dict[str, Any]] = None,
+                  cache: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Set connection pool, GoPlus batching and response cache settings
+        
+        Args:
+            settings: Connection pool overrides merged over DEFAULT_HTTP_SETTINGS
+                      (applied to the next session)
+            goplus_batch: Batching overrides merged over DEFAULT_GOPLUS_BATCH
+            cache: Response cache overrides (applied when the cache is first used)
+        """
+        self.settings = {**DEFAULT_HTTP_SETTINGS, **(settings or {})}
+        self.decoders = make_decoders(bool(self.settings["typed_decoding"]))
+        self.cache_settings = dict(cache or {})
+        batching = {**DEFAULT_GOPLUS_BATCH, **(goplus_batch or {})}
+        self.goplus_batcher.window = float(batching["window"])
+        self.goplus_batcher.max_size = max(1, int(batching["max_size"]))
         
     async def ensure_session(self):
-        """Ensure aiohttp session exists"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
+        """Ensure the shared keep-alive session exists"""
+        if self.session is None or self.session.closed:
+            settings = self.settings
+            connector = aiohttp.TCPConnector(
+                limit=int(settings["limit"]),
+                limit_per_host=int(settings["limit_per_host"]),
+                keepalive_timeout=float(settings["keepalive_timeout"]),
+                ttl_dns_cache=int(settings["ttl_dns_cache"]),
+                use_dns_cache=True
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=float(settings["total_timeout"]),
+                sock_connect=float(settings["connect_timeout"]),
+                sock_read=float(settings["read_timeout"])
+            )
+            headers = {"Accept-Encoding": "gzip, deflate"} if settings["compression"] else {"Accept-Encoding": "identity"}
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers)
             
+    @property
+    def cache(self) -> ResponseCache:
+        """Shared response cache (opened on first use)"""
+        if self._cache is None:
+            self._cache = ResponseCache(self.cache_settings)
+        return self._cache
+        
     async def close(self):
-        """Close the session if it exists"""
+        """Close the session and the response cache if they exist"""
         if self.session:
             await self.session.close()
             self.session = None
+        if self._cache is not None:
+            self.closed_cache_stats = self._cache.get_stats()
+            await self._cache.close()
+            self._cache = None
+            
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Response cache metrics (kept after close for the final report)"""
+        if self._cache is not None:
+            return self._cache.get_stats()
+        return self.closed_cache_stats or {"entries": 0, "hits": 0, "stale_hits": 0, "misses": 0}
+            
+    @asynccontextmanager
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        GET a URL over the shared session (or the injected transport, if set)
+        
+        Usage:
+            async with api_wrapper.get(url, params=params) as response:
+                data = await response.json()
+        """
+        if self.transport is not None:
+            yield await self.transport(url, params)
+            return
+        await self.ensure_session()
+        async with self.session.get(url, params=params, **kwargs) as response:
+            yield response
             
-    async def call_goplus_api(self, address: str, delay: float = 30.0) -> Dict:
+    async def call_goplus_api(self, address: str) -> Dict:
         """
-        Call GoPlus API with tracking and proper error handling
+        Call GoPlus API for one token, served from the response cache when
+        possible and otherwise batched with concurrent lookups
         
         Args:
             address: Token address to check
-            delay: Delay before making the call
             
         Returns:
-            API response data
+            API response data with only this token in 'result' ({} on failure)
+        """
+        return await self.cache.get_or_fetch(
+            "goplus",
+            address.lower(),
+            lambda: self.goplus_batcher.fetch(address),
+            cacheable=goplus_cacheable(address)
+        )
+        
+    async def call_goplus_batch(self, addresses: Iterable[str]) -> Dict:
+        """
+        Call GoPlus API for several tokens in one request with tracking and proper error handling
+        
+        Args:
+            addresses: Token addresses to check
+            
+        Returns:
+            API response data, 'result' keyed by lowercase address
         """
         await self.ensure_session()
         
-        # Add initial delay
-        await asyncio.sleep(delay)
+        # Wait for GoPlus quota (only blocks when the bucket is empty)
+        await rate_scheduler.acquire("goplus")
         
         endpoint = "https://api.gopluslabs.io/api/v1/token_security/1"
-        params = {"contract_addresses": address}
+        addresses = list(addresses)
+        params = {"contract_addresses": ",".join(addresses)}
         
         try:
-            async with self.session.get(endpoint, params=params) as response:
-                response_text = await response.text()
+            async with self.get(endpoint, params=params) as response:
+                body = await response.read()
+                response_text = body.decode('utf-8', errors='replace')
                 
                 # Log the API call
                 call_id = await api_tracker.log_api_call(
@@ -55,10 +283,15 @@ class APIWrapper:
                     response_body=response_text
                 )
                 
-                console.print(f"[cyan]GoPlus API Call ID: {call_id}")
+                console.print(f"[cyan]GoPlus API Call ID: {call_id} ({len(addresses)} tokens)")
+                
+                if response.status == 429:
+                    rate_scheduler.penalize("goplus", RATE_LIMIT_BACKOFF)
                 
                 if response.status == 200:
-                    data = json.loads(response_text)
+                    data = self.decoders["goplus"].decode(body)
+                    if data.get('code') == 4029:  # API-level rate limit
+                        rate_scheduler.penalize("goplus", RATE_LIMIT_BACKOFF)
                     if 'result' in data:
                         return data
                     else:
@@ -81,28 +314,40 @@ class APIWrapper:
             console.print(f"[red]Error during GoPlus API call: {str(e)} (Call ID: {call_id})")
             return {}
             
-    async def call_honeypot_api(self, address: str, delay: float = 10.0) -> Dict:
+    async def call_honeypot_api(self, address: str) -> Dict:
+        """
+        Call Honeypot API, served from the response cache when possible
+        
+        Args:
+            address: Token address to check
+            
+        Returns:
+            API response data
+        """
+        return await self.cache.get_or_fetch("honeypot", address.lower(), lambda: self.request_honeypot(address))
+        
+    async def request_honeypot(self, address: str) -> Dict:
         """
         Call Honeypot API with tracking and proper error handling
         
         Args:
             address: Token address to check
-            delay: Delay before making the call
             
         Returns:
             API response data
         """
         await self.ensure_session()
         
-        # Add initial delay
-        await asyncio.sleep(delay)
+        # Wait for Honeypot.is quota (only blocks when the bucket is empty)
+        await rate_scheduler.acquire("honeypot")
         
         endpoint = "https://api.honeypot.is/v2/IsHoneypot"
         params = {"address": address}
         
         try:
-            async with self.session.get(endpoint, params=params) as response:
-                response_text = await response.text()
+            async with self.get(endpoint, params=params) as response:
+                body = await response.read()
+                response_text = body.decode('utf-8', errors='replace')
                 
                 # Log the API call
                 call_id = await api_tracker.log_api_call(
@@ -115,9 +360,11 @@ class APIWrapper:
                 
                 console.print(f"[cyan]Honeypot API Call ID: {call_id}")
                 
+                if response.status == 429:
+                    rate_scheduler.penalize("honeypot", RATE_LIMIT_BACKOFF)
+                
                 if response.status == 200:
-                    data = json.loads(response_text)
-                    return data
+                    return self.decoders["honeypot"].decode(body)
                 else:
                     console.print(f"[red]Honeypot API HTTP error {response.status} (Call ID: {call_id})")
                     return {}
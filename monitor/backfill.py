@@ -0,0 +1,214 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+from web3 import AsyncWeb3
+from event_logs import PAIR_CREATED_TOPIC, decode_pair_created, get_logs
+from terminal_display import log_message
+
+# Provider errors that mean "ask for a smaller range"
+RANGE_TOO_LARGE_MARKERS = ('more than', 'too many', 'limit exceeded', 'response size', 'too large', 'timeout', 'timed out')
+
+class LogBackfill:
+    def __init__(self,
+                 get_web3: Callable[[], AsyncWeb3],
+                 db,
+                 factory_address: str,
+                 concurrency: int = 4,
+                 initial_chunk: int = 2000,
+                 min_chunk: int = 10,
+                 max_chunk: int = 20000,
+                 max_attempts: int = 5):
+        """
+        Chunked, parallel PairCreated backfill over eth_getLogs
+
+        The block range is split into chunks fetched by concurrency workers. Requests
+        go through the tracker's routed web3, so they are spread over the Infura keys
+        and RPC endpoints with the same rate limits, cooldowns and failover as every
+        other RPC call. The chunk size adapts: it halves when a provider rejects a
+        range as too large or times out and grows again after successful fetches.
+        Completed chunks are checkpointed in the session database so an interrupted
+        backfill resumes where it stopped. Ranges that run out of attempts get one
+        more pass at the end of the run; ranges that still fail are left out of the
+        checkpoint table, so the next backfill fetches them again.
+
+        Args:
+            get_web3: Returns the web3 instance to use (the tracker's routed web3)
+            db: SessionDatabase holding the backfill_chunks checkpoint table
+            factory_address: Uniswap factory emitting PairCreated
+            concurrency: Chunks fetched in parallel
+            initial_chunk: Starting chunk size in blocks
+            min_chunk: Smallest chunk size to shrink to
+            max_chunk: Largest chunk size to grow to
+            max_attempts: Failed fetches of one range before giving up on it (a range
+                          still rejected as too large at min_chunk is given up at once)
+        """
+        self.get_web3 = get_web3
+        self.db = db
+        self.factory_address = factory_address
+        self.concurrency = max(1, int(concurrency))
+        self.chunk = int(initial_chunk)
+        self.min_chunk = max(1, int(min_chunk))
+        self.max_chunk = max(self.min_chunk, int(max_chunk))
+        self.max_attempts = max(1, int(max_attempts))
+
+        # Progress
+        self.total_blocks = 0
+        self.done_blocks = 0
+        self.total_events = 0
+        self.total_requests = 0
+        self.failed_ranges: List[Tuple[int, int]] = []
+
+        self.db.write_sync(self.create_schema)
+
+    @staticmethod
+    def create_schema(db):
+        """Checkpoint table of fully processed block ranges (runs on the writer connection)"""
+        db.execute('''
+            CREATE TABLE IF NOT EXISTS backfill_chunks (
+                from_block INTEGER NOT NULL,
+                to_block INTEGER NOT NULL,
+                events INTEGER NOT NULL,
+                completed_at INTEGER NOT NULL,
+                PRIMARY KEY (from_block, to_block)
+            )
+        ''')
+
+    @staticmethod
+    def record_chunk(db, from_block: int, to_block: int, events: int):
+        """Mark a block range as processed (runs on the writer connection)"""
+        db.execute(
+            'INSERT OR REPLACE INTO backfill_chunks (from_block, to_block, events, completed_at) VALUES (?, ?, ?, ?)',
+            (from_block, to_block, events, int(time.time()))
+        )
+
+    def missing_ranges(self, start_block: int, end_block: int) -> List[Tuple[int, int]]:
+        """Sub-ranges of [start_block, end_block] not covered by completed chunks"""
+        done = self.db.fetchall_sync('''
+            SELECT from_block, to_block FROM backfill_chunks
+            WHERE to_block >= ? AND from_block <= ?
+            ORDER BY from_block
+        ''', (start_block, end_block))
+
+        missing = []
+        cursor = start_block
+        for from_block, to_block in done:
+            if from_block > cursor:
+                missing.append((cursor, min(from_block - 1, end_block)))
+            cursor = max(cursor, to_block + 1)
+            if cursor > end_block:
+                break
+        if cursor <= end_block:
+            missing.append((cursor, end_block))
+        return missing
+
+    @staticmethod
+    def is_range_error(error: Exception) -> bool:
+        """Whether an error means the requested range was too large"""
+        if isinstance(error, asyncio.TimeoutError):
+            return True
+        message = str(error).lower()
+        return any(marker in message for marker in RANGE_TOO_LARGE_MARKERS)
+
+    async def worker(self, ranges: asyncio.Queue, attempts: Dict[Tuple[int, int], int],
+                     on_events: Callable[[List[Dict]], Awaitable]):
+        """Fetch ranges from the queue until it is drained"""
+        while True:
+            try:
+                from_block, to_block = ranges.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            # Take one chunk off the front and put the remainder back
+            if to_block - from_block + 1 > self.chunk:
+                ranges.put_nowait((from_block + self.chunk, to_block))
+                to_block = from_block + self.chunk - 1
+
+            try:
+                self.total_requests += 1
+                logs = await asyncio.wait_for(
+                    get_logs(self.get_web3(), from_block, to_block, self.factory_address, [PAIR_CREATED_TOPIC]),
+                    timeout=30
+                )
+            except Exception as e:
+                key = (from_block, to_block)
+                attempts[key] = attempts.get(key, 0) + 1
+                range_error = self.is_range_error(e)
+                size = to_block - from_block + 1
+                if attempts[key] >= self.max_attempts or (range_error and size <= self.min_chunk):
+                    # Out of attempts, or still too large at the smallest chunk size
+                    log_message(f"Giving up on backfill range {from_block}-{to_block}: {str(e)}", "ERROR")
+                    self.failed_ranges.append(key)
+                    continue
+                if range_error:
+                    self.chunk = max(self.min_chunk, size // 2)
+                    log_message(f"Backfill range {from_block}-{to_block} too large, chunk now {self.chunk} blocks", "DEBUG")
+                await asyncio.sleep(min(2 ** attempts[key], 30))
+                ranges.put_nowait((from_block, to_block))
+                continue
+
+            events = [decode_pair_created(log) for log in logs]
+            if events:
+                await on_events(events)
+            await self.db.write(self.record_chunk, from_block, to_block, len(events))
+
+            self.chunk = min(self.max_chunk, int(self.chunk * 1.25) + 1)
+            self.total_events += len(events)
+            self.done_blocks += to_block - from_block + 1
+            print(f"\r⏪ Backfill | {self.done_blocks}/{self.total_blocks} blocks | "
+                  f"{self.total_events} pairs | chunk {self.chunk}", end="", flush=True)
+
+    async def run(self, start_block: int, end_block: int, on_events: Callable[[List[Dict]], Awaitable]) -> int:
+        """
+        Backfill PairCreated events in [start_block, end_block]
+
+        Args:
+            start_block: First block (inclusive)
+            end_block: Last block (inclusive)
+            on_events: Coroutine called with each chunk's decoded events before
+                       the chunk is checkpointed
+
+        Returns:
+            Number of PairCreated events found in ranges fetched by this run
+        """
+        missing = self.missing_ranges(start_block, end_block)
+        self.total_blocks = sum(to_block - from_block + 1 for from_block, to_block in missing)
+        skipped = (end_block - start_block + 1) - self.total_blocks
+        if skipped > 0:
+            log_message(f"Resuming backfill, {skipped} blocks already done", "INFO")
+        if not missing:
+            return 0
+
+        ranges: asyncio.Queue = asyncio.Queue()
+        for block_range in missing:
+            ranges.put_nowait(block_range)
+
+        started = time.monotonic()
+        await self.drain(ranges, on_events)
+
+        # Ranges that ran out of attempts get one more pass with fresh attempts
+        if self.failed_ranges:
+            log_message(f"Retrying {len(self.failed_ranges)} failed backfill ranges", "INFO")
+            for block_range in self.failed_ranges:
+                ranges.put_nowait(block_range)
+            self.failed_ranges = []
+            await self.drain(ranges, on_events)
+
+        print()
+        log_message(
+            f"Backfill done: {self.done_blocks} blocks, {self.total_events} pairs, "
+            f"{self.total_requests} requests in {time.monotonic() - started:.1f}s", "INFO"
+        )
+        if self.failed_ranges:
+            log_message(f"{len(self.failed_ranges)} ranges failed twice; they are not checkpointed, "
+                        f"so the next backfill fetches them again", "WARNING")
+        return self.total_events
+
+    async def drain(self, ranges: asyncio.Queue, on_events: Callable[[List[Dict]], Awaitable]):
+        """Run the workers until the queue is empty"""
+        # Workers exit when the queue is empty, so keep going while split-off ranges remain
+        attempts: Dict[Tuple[int, int], int] = {}
+        while not ranges.empty():
+            await asyncio.gather(*(
+                self.worker(ranges, attempts, on_events)
+                for _ in range(self.concurrency)
+            ))
@@ -0,0 +1,83 @@
+"""
+Benchmark of the JSON backends on the API responses captured in api_logs
+
+Times, per response body:
+  - stdlib: bytes -> str -> json.loads (the previous response.text() path)
+  - each installed fast backend decoding straight from bytes
+  - the typed GoPlus/Honeypot decoders of api_wrapper (msgspec only, the
+    "typed_decoding" http setting)
+and the encode side (response cache bodies) for stdlib and the active backend.
+
+Usage:
+    python bench_json.py [log files...]   (default: api_logs/api_calls_*)
+"""
+import glob
+import json
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+import fast_json
+from api_tracker import read_api_log
+from api_wrapper import make_decoders
+
+def load_bodies(paths: List[str]) -> List[Tuple[str, bytes]]:
+    """(endpoint, raw body) of every successful GoPlus/Honeypot call"""
+    bodies = []
+    for path in paths:
+        for call in read_api_log(path):
+            if call.get('response_code') == 200 and call.get('response_body') and call.get('endpoint') in ('goplus', 'honeypot'):
+                bodies.append((call['endpoint'], call['response_body'].encode('utf-8')))
+    return bodies
+
+def best_time(fn: Callable, items: List, rounds: int) -> float:
+    """Best-of-rounds microseconds per item"""
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - started)
+    return best / len(items) * 1e6
+
+def main():
+    paths = sys.argv[1:] or sorted(glob.glob('api_logs/api_calls_*.json*'))
+    bodies = load_bodies(paths)
+    if not bodies:
+        print("No captured GoPlus/Honeypot responses found")
+        return
+    decoders = make_decoders(typed=True)
+    decoded = [json.loads(body) for _, body in bodies]
+    total_bytes = sum(len(body) for _, body in bodies)
+
+    decode: Dict[str, Callable] = {"stdlib (text + json.loads)": lambda item: json.loads(item[1].decode('utf-8'))}
+    if fast_json.orjson is not None:
+        decode["orjson (bytes)"] = lambda item: fast_json.orjson.loads(item[1])
+    if fast_json.msgspec is not None:
+        msgspec_decoder = fast_json.msgspec.json.Decoder()
+        decode["msgspec (bytes)"] = lambda item: msgspec_decoder.decode(item[1])
+        decode["typed decoders (msgspec)"] = lambda item: decoders[item[0]].decode(item[1])
+
+    encode: Dict[str, Callable] = {
+        "stdlib json.dumps": fast_json.stdlib_dumps,
+        f"fast_json.dumps ({fast_json.BACKEND})": fast_json.dumps
+    }
+
+    print(f"Responses: {len(bodies)} ({total_bytes / len(bodies) / 1024:.1f} KiB average) from {len(paths)} log files")
+    print(f"Active backend: {fast_json.BACKEND}\n")
+    baseline = None
+    for name, fn in decode.items():
+        elapsed = best_time(fn, bodies, 30)
+        baseline = baseline or elapsed
+        print(f"decode  {name:<34} {elapsed:8.1f} us/response  {baseline / elapsed:5.2f}x")
+    baseline = None
+    for name, fn in encode.items():
+        elapsed = best_time(fn, decoded, 30)
+        baseline = baseline or elapsed
+        print(f"encode  {name:<34} {elapsed:8.1f} us/response  {baseline / elapsed:5.2f}x")
+
+    if fast_json.msgspec is not None:
+        kept = sum(len(fast_json.stdlib_dumps(decoders[endpoint].decode(body))) for endpoint, body in bodies)
+        print(f"\nTyped decoding keeps {kept / total_bytes:.0%} of the response bytes")
+
+if __name__ == "__main__":
+    main()
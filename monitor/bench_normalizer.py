@@ -0,0 +1,210 @@
+"""
+Micro-benchmark of the GoPlus/Honeypot normalizer on captured API responses
+
+Compares the per-token CPU time of the compiled field tables in normalizer.py
+with the previous code path (prepare_goplus_values with its per-call helper
+closures plus the inline honeypot values list), and checks both produce the
+same column values.
+
+Usage:
+    python bench_normalizer.py [log files...]   (default: api_logs/api_calls_*)
+"""
+import glob
+import json
+import sys
+import time
+from typing import Dict, List, Tuple
+from api_tracker import read_api_log
+from normalizer import normalize_honeypot, normalize_goplus, HONEYPOT_FIELDS, GOPLUS_FIELDS
+
+def legacy_goplus_values(goplus_data: dict, token_address: str) -> tuple:
+    """prepare_goplus_values as it was before the field tables"""
+    token_data = {}
+    if isinstance(goplus_data, dict) and 'result' in goplus_data:
+        token_data = (goplus_data['result'].get(token_address.lower()) or
+                     goplus_data['result'].get(token_address) or {})
+
+    def safe_int_bool(value):
+        if isinstance(value, bool):
+            return 1 if value else 0
+        try:
+            return 1 if str(value).strip() == '1' else 0
+        except:
+            return 0
+
+    def safe_float(value, default=0.0):
+        if value is None:
+            return default
+        try:
+            if isinstance(value, (int, float)):
+                return float(value)
+            cleaned = str(value).replace('%', '').strip()
+            return float(cleaned) if cleaned else default
+        except:
+            return default
+
+    def safe_str(value, default=''):
+        return str(value) if value is not None else default
+
+    def safe_int(value, default=0):
+        if value is None:
+            return default
+        try:
+            if isinstance(value, str):
+                cleaned = ''.join(c for c in value if c.isdigit() or c == '.')
+                return int(float(cleaned)) if cleaned else default
+            return int(float(str(value)))
+        except:
+            return default
+
+    return (
+        safe_int_bool(token_data.get('is_open_source')),
+        safe_int_bool(token_data.get('is_proxy')),
+        safe_int_bool(token_data.get('is_mintable')),
+        safe_str(token_data.get('owner_address')),
+        safe_str(token_data.get('creator_address')),
+        safe_int_bool(token_data.get('can_take_back_ownership')),
+        safe_int_bool(token_data.get('owner_change_balance')),
+        safe_int_bool(token_data.get('hidden_owner')),
+        safe_int_bool(token_data.get('selfdestruct')),
+        safe_int_bool(token_data.get('external_call')),
+        safe_float(token_data.get('buy_tax')),
+        safe_float(token_data.get('sell_tax')),
+        safe_int_bool(token_data.get('is_anti_whale')),
+        safe_int_bool(token_data.get('anti_whale_modifiable')),
+        safe_int_bool(token_data.get('cannot_buy')),
+        safe_int_bool(token_data.get('cannot_sell_all')),
+        safe_int_bool(token_data.get('slippage_modifiable')),
+        safe_int_bool(token_data.get('personal_slippage_modifiable')),
+        safe_int_bool(token_data.get('trading_cooldown')),
+        safe_int_bool(token_data.get('is_blacklisted')),
+        safe_int_bool(token_data.get('is_whitelisted')),
+        safe_int_bool(token_data.get('is_in_dex')),
+        safe_int_bool(token_data.get('transfer_pausable')),
+        safe_int_bool(token_data.get('can_be_minted')),
+        safe_str(token_data.get('total_supply', '0')),
+        safe_int(token_data.get('holder_count')),
+        safe_float(token_data.get('owner_percent')),
+        safe_str(token_data.get('owner_balance', '0')),
+        safe_float(token_data.get('creator_percent')),
+        safe_str(token_data.get('creator_balance', '0')),
+        safe_int(token_data.get('lp_holder_count')),
+        safe_str(token_data.get('lp_total_supply', '0')),
+        safe_int_bool(token_data.get('is_true_token')),
+        safe_int_bool(token_data.get('is_airdrop_scam')),
+        json.dumps(token_data.get('trust_list', {})),
+        json.dumps(token_data.get('other_potential_risks', [])),
+        safe_str(token_data.get('note')),
+        safe_int_bool(token_data.get('honeypot_with_same_creator')),
+        safe_int_bool(token_data.get('fake_token')),
+        json.dumps(token_data.get('holders', [])),
+        json.dumps(token_data.get('lp_holders', [])),
+        json.dumps(token_data.get('dex', []))
+    )
+
+def legacy_honeypot_values(honeypot_data: dict) -> list:
+    """The inline honeypot values list of process_token as it was before the field tables"""
+    token_info = honeypot_data.get('token', {})
+    simulation = honeypot_data.get('simulationResult', {})
+    contract = honeypot_data.get('contractCode', {})
+    pair_info = honeypot_data.get('pair', {})
+    pair_details = pair_info.get('pair', {})
+    honeypot_result = honeypot_data.get('honeypotResult', {})
+    return [
+        token_info.get('name', 'Unknown'),
+        token_info.get('symbol', 'Unknown'),
+        token_info.get('decimals', 18),
+        token_info.get('totalSupply', '0'),
+        bool(honeypot_data.get('simulationSuccess', False)),
+        float(simulation.get('buyTax', 0)),
+        float(simulation.get('sellTax', 0)),
+        float(simulation.get('transferTax', 0)),
+        float(pair_info.get('liquidity', 0)),
+        str(pair_info.get('reserves0', '')),
+        str(pair_info.get('reserves1', '')),
+        int(simulation.get('buyGas', 0)),
+        int(simulation.get('sellGas', 0)),
+        pair_info.get('createdAtTimestamp', ''),
+        int(token_info.get('totalHolders', 0)),
+        bool(honeypot_result.get('isHoneypot', True)),
+        honeypot_result.get('honeypotReason', ''),
+        bool(contract.get('openSource', False)),
+        bool(contract.get('isProxy', False)),
+        bool(contract.get('isMintable', False)),
+        bool(contract.get('canBeMinted', False)),
+        token_info.get('owner', ''),
+        token_info.get('creator', ''),
+        token_info.get('deployer', ''),
+        bool(contract.get('hasProxyCalls', False)),
+        float(pair_info.get('liquidity', 0)),
+        float(pair_info.get('liquidityToken0', 0)),
+        float(pair_info.get('liquidityToken1', 0)),
+        pair_details.get('token0Symbol', ''),
+        pair_details.get('token1Symbol', ''),
+        json.dumps(honeypot_data.get('flags', []))
+    ]
+
+def load_samples(paths: List[str]) -> List[Tuple[Dict, Dict, str]]:
+    """Pair each captured honeypot response with a GoPlus response of the same token"""
+    goplus: Dict[str, Dict] = {}
+    honeypot: Dict[str, Dict] = {}
+    for path in paths:
+        for call in read_api_log(path):
+            if call.get('response_code') != 200 or not call.get('response_body'):
+                continue
+            try:
+                body = json.loads(call['response_body'])
+            except (TypeError, json.JSONDecodeError):
+                continue
+            params = call.get('params') or {}
+            if call.get('endpoint') == 'goplus':
+                for address in str(params.get('contract_addresses', '')).split(','):
+                    if address:
+                        goplus[address.lower()] = body
+            elif call.get('endpoint') == 'honeypot' and params.get('address'):
+                honeypot[params['address'].lower()] = body
+    return [(honeypot[address], goplus[address], address) for address in honeypot if address in goplus]
+
+def time_per_token(fns: List, samples, rounds: int) -> List[float]:
+    """Best-of-rounds microseconds per token of each function (rounds interleaved to even out machine noise)"""
+    best = [float('inf')] * len(fns)
+    for _ in range(rounds):
+        for index, fn in enumerate(fns):
+            started = time.perf_counter()
+            for honeypot_data, goplus_data, address in samples:
+                fn(honeypot_data, goplus_data, address)
+            best[index] = min(best[index], time.perf_counter() - started)
+    return [elapsed / len(samples) * 1e6 for elapsed in best]
+
+def main():
+    paths = sys.argv[1:] or sorted(glob.glob('api_logs/api_calls_*.json*'))
+    samples = load_samples(paths)
+    if not samples:
+        print("No token with both a GoPlus and a honeypot response found")
+        return
+
+    # Both paths must produce identical column values
+    gp_columns = [column for column, _, _, _ in GOPLUS_FIELDS if column not in ('gp_token_name', 'gp_token_symbol', 'gp_is_honeypot')]
+    hp_columns = [column for column, _, _, _ in HONEYPOT_FIELDS]
+    mismatches = 0
+    for honeypot_data, goplus_data, address in samples:
+        gp = normalize_goplus(goplus_data, address)
+        hp = normalize_honeypot(honeypot_data)
+        if [gp[column] for column in gp_columns] != list(legacy_goplus_values(goplus_data, address)):
+            mismatches += 1
+        if [hp[column] for column in hp_columns] != legacy_honeypot_values(honeypot_data):
+            mismatches += 1
+
+    legacy, compiled = time_per_token([
+        lambda hp, gp, address: (legacy_honeypot_values(hp), legacy_goplus_values(gp, address)),
+        lambda hp, gp, address: (normalize_honeypot(hp), normalize_goplus(gp, address))
+    ], samples, 200)
+
+    print(f"Tokens:            {len(samples)} (from {len(paths)} log files)")
+    print(f"Mismatched values: {mismatches}")
+    print(f"Previous code:     {legacy:8.1f} us/token")
+    print(f"Field tables:      {compiled:8.1f} us/token")
+    print(f"Speedup:           {legacy / compiled:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import bisect
+import time
+from typing import Callable, Dict, List, Optional
+from web3 import AsyncWeb3
+
+SECONDS_PER_BLOCK = 12  # Post-merge slot time, only used to seed the search
+
+class BlockTimeResolver:
+    def __init__(self, get_web3: Callable[[], AsyncWeb3], db):
+        """
+        Resolve timestamps to block numbers by binary search over block headers
+
+        Every block header fetched is kept in a block -> timestamp index that is
+        persisted in the session database, so later lookups (and restarts of the
+        same session) start from tight bounds and need only a few RPC calls.
+
+        Args:
+            get_web3: Returns the web3 instance to use (so key rotation is picked up)
+            db: SessionDatabase holding the block_timestamps table
+        """
+        self.get_web3 = get_web3
+        self.db = db
+        self.db.write_sync(self.create_schema)
+
+        rows = self.db.fetchall_sync('SELECT block_number, timestamp FROM block_timestamps')
+        self.timestamps: Dict[int, int] = {block: timestamp for block, timestamp in rows}
+        self.blocks: List[int] = sorted(self.timestamps)
+
+        # Stats
+        self.total_lookups = 0
+
+    @staticmethod
+    def create_schema(db):
+        """Block -> timestamp index (runs on the writer connection)"""
+        db.execute('''
+            CREATE TABLE IF NOT EXISTS block_timestamps (
+                block_number INTEGER PRIMARY KEY,
+                timestamp INTEGER NOT NULL
+            )
+        ''')
+
+    @staticmethod
+    def store_timestamp(db, block_number: int, timestamp: int):
+        """Persist one index entry (runs on the writer connection)"""
+        db.execute('INSERT OR IGNORE INTO block_timestamps (block_number, timestamp) VALUES (?, ?)', (block_number, timestamp))
+
+    async def get_timestamp(self, block_number: int) -> int:
+        """Get a block's timestamp, fetching its header only if it isn't indexed yet"""
+        timestamp = self.timestamps.get(block_number)
+        if timestamp is not None:
+            return timestamp
+
+        block = await self.get_web3().eth.get_block(block_number)
+        timestamp = int(block['timestamp'])
+        self.total_lookups += 1
+
+        self.timestamps[block_number] = timestamp
+        bisect.insort(self.blocks, block_number)
+        await self.db.write(self.store_timestamp, block_number, timestamp)
+        return timestamp
+
+    def cached_bounds(self, timestamp: int, head: int) -> tuple:
+        """Tightest indexed blocks around a timestamp: (below or None, at/above or None)"""
+        below = above = None
+        for block in self.blocks:
+            if block > head:
+                break
+            if self.timestamps[block] < timestamp:
+                below = block
+            else:
+                above = block
+                break
+        return below, above
+
+    async def block_at_or_after(self, timestamp: int, head: Optional[int] = None) -> int:
+        """
+        Find the first block whose timestamp is >= timestamp
+
+        Args:
+            timestamp: Unix timestamp (seconds)
+            head: Latest block to consider (fetched if not given)
+
+        Returns:
+            Block number (head if the timestamp is in the future)
+        """
+        if head is None:
+            head = await self.get_web3().eth.block_number
+        if await self.get_timestamp(head) < timestamp:
+            return head
+        if timestamp <= await self.get_timestamp(0):
+            return 0
+
+        # Bracket the answer: t(lo) < timestamp <= t(hi)
+        lo, hi = self.cached_bounds(timestamp, head)
+        if hi is None:
+            hi = head
+        if lo is None:
+            distance = int((await self.get_timestamp(hi) - timestamp) / SECONDS_PER_BLOCK) + 1
+            lo = max(hi - distance, 0)
+            while lo > 0 and await self.get_timestamp(lo) >= timestamp:
+                hi = lo
+                distance *= 2
+                lo = max(hi - distance, 0)
+
+        # Interpolate between the bracket ends, falling back to bisection so each step shrinks the range
+        use_interpolation = True
+        while hi - lo > 1:
+            t_lo = await self.get_timestamp(lo)
+            t_hi = await self.get_timestamp(hi)
+            if use_interpolation and t_hi > t_lo:
+                mid = lo + int((timestamp - t_lo) * (hi - lo) / (t_hi - t_lo))
+                mid = min(max(mid, lo + 1), hi - 1)
+            else:
+                mid = (lo + hi) // 2
+            use_interpolation = not use_interpolation
+
+            if await self.get_timestamp(mid) < timestamp:
+                lo = mid
+            else:
+                hi = mid
+        return hi
+
+    async def block_hours_ago(self, hours: float, head: Optional[int] = None) -> int:
+        """First block mined within the last `hours` hours"""
+        return await self.block_at_or_after(int(time.time() - hours * 3600), head)
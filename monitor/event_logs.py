@@ -0,0 +1,69 @@
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from eth_abi import decode
+from web3 import AsyncWeb3
+
+# keccak256 of the Uniswap V2 event signatures
+PAIR_CREATED_TOPIC = '0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9'  # PairCreated(address,address,address,uint256)
+SYNC_TOPIC = '0x1c411e9a96e071241c2f21f7726b17ae89e3cab4c78be50e062b03a9fffbbad1'          # Sync(uint112,uint112)
+
+def to_bytes(value: Union[bytes, str]) -> bytes:
+    """Normalize HexBytes / 0x-hex strings to bytes"""
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+    return bytes(value)
+
+def to_hex(value: Union[bytes, str]) -> str:
+    """Normalize HexBytes / hex strings to a lowercase 0x-hex string"""
+    return '0x' + to_bytes(value).hex()
+
+def topic_to_address(topic: Union[bytes, str]) -> str:
+    """Extract the checksummed address from an indexed address topic"""
+    return AsyncWeb3.to_checksum_address('0x' + to_bytes(topic)[-20:].hex())
+
+def decode_sync(log) -> Tuple[int, int]:
+    """Decode (reserve0, reserve1) from a Sync log"""
+    reserve0, reserve1 = decode(['uint112', 'uint112'], to_bytes(log['data']))
+    return reserve0, reserve1
+
+def decode_pair_created(log) -> Dict:
+    """Decode a PairCreated log into token0/token1/pair plus its chain position"""
+    pair, pair_index = decode(['address', 'uint256'], to_bytes(log['data']))
+    return {
+        'token0': topic_to_address(log['topics'][1]),
+        'token1': topic_to_address(log['topics'][2]),
+        'pair': AsyncWeb3.to_checksum_address(pair),
+        'pair_index': pair_index,
+        'block_number': log['blockNumber'],
+        'block_hash': to_hex(log['blockHash']),
+        'log_index': log['logIndex'],
+        'transaction_hash': to_hex(log['transactionHash']),
+        'removed': bool(log.get('removed', False))
+    }
+
+async def get_logs(web3: AsyncWeb3,
+                   from_block: int,
+                   to_block: int,
+                   address: Union[str, Sequence[str]],
+                   topics: Optional[List] = None) -> List:
+    """
+    Fetch logs for a block range with one eth_getLogs call
+
+    Args:
+        web3: Web3 instance to query
+        from_block: First block (inclusive)
+        to_block: Last block (inclusive)
+        address: Contract address or list of addresses
+        topics: Topic filter, e.g. [SYNC_TOPIC]
+
+    Returns:
+        Logs sorted by (blockNumber, logIndex)
+    """
+    params = {
+        'fromBlock': from_block,
+        'toBlock': to_block,
+        'address': address if isinstance(address, str) else list(address)
+    }
+    if topics:
+        params['topics'] = topics
+    logs = await web3.eth.get_logs(params)
+    return sorted(logs, key=lambda log: (log['blockNumber'], log['logIndex']))
@@ -0,0 +1,121 @@
+import json
+from typing import Any, Dict, Iterable, Optional, Union
+
+# Optional faster JSON backends, used when installed (pip install msgspec / orjson)
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# msgspec is preferred: it also does the typed decoding in ResponseDecoder.
+# orjson decodes integers beyond 64 bits as floats; the APIs send supplies,
+# balances and reserves as strings, so that doesn't affect stored values.
+BACKEND = "msgspec" if msgspec is not None else "orjson" if orjson is not None else "json"
+
+def stdlib_loads(data: Union[bytes, str]) -> Any:
+    return json.loads(data)
+
+def stdlib_dumps(value: Any) -> str:
+    return json.dumps(value)
+
+if msgspec is not None:
+    _decoder = msgspec.json.Decoder()
+    _encoder = msgspec.json.Encoder()
+
+    def loads(data: Union[bytes, str]) -> Any:
+        """Decode JSON straight from bytes (or str)"""
+        return _decoder.decode(data)
+
+    def dumps(value: Any) -> str:
+        """Encode JSON to str"""
+        return _encoder.encode(value).decode()
+
+    DecodeError = (msgspec.DecodeError, ValueError)
+elif orjson is not None:
+    def loads(data: Union[bytes, str]) -> Any:
+        """Decode JSON straight from bytes (or str)"""
+        return orjson.loads(data)
+
+    def dumps(value: Any) -> str:
+        """Encode JSON to str"""
+        try:
+            return orjson.dumps(value).decode()
+        except TypeError:  # e.g. integers beyond 64 bits
+            return json.dumps(value)
+
+    DecodeError = (orjson.JSONDecodeError, ValueError)
+else:
+    loads = stdlib_loads
+    dumps = stdlib_dumps
+    DecodeError = (ValueError,)
+
+class ResponseDecoder:
+    def __init__(self,
+                 name: str,
+                 keys: Iterable[str],
+                 map_key: Optional[str] = None,
+                 map_keys: Iterable[str] = (),
+                 typed: bool = True):
+        """
+        Decoder for one API response shape that can skip the fields we never use
+
+        With msgspec and typed=True the shape is compiled into Struct types, so
+        unused fields are skipped by the parser without ever being built as
+        Python objects. Otherwise (or for a body that doesn't match the shape)
+        the whole body is decoded with the active backend. Skipping only pays
+        off when responses carry large unused fields; see bench_json.py.
+
+        Args:
+            name: Type name (for msgspec)
+            keys: Top-level fields to keep
+            map_key: Top-level field holding an object of objects (e.g. GoPlus 'result' keyed by address)
+            map_keys: Fields to keep in each of those inner objects
+            typed: Whether to skip unused fields (msgspec only)
+        """
+        self.keys = tuple(dict.fromkeys(keys))
+        self.map_key = map_key
+        self.map_keys = tuple(dict.fromkeys(map_keys))
+        self.typed = None
+        self.item_type = None
+
+        if typed and msgspec is not None:
+            fields = [(key, Any, msgspec.UNSET) for key in self.keys if key != map_key]
+            if map_key:
+                self.item_type = msgspec.defstruct(f"{name}Item", [(key, Any, msgspec.UNSET) for key in self.map_keys])
+                fields.append((map_key, Dict[str, self.item_type], msgspec.UNSET))
+            self.typed = msgspec.json.Decoder(msgspec.defstruct(name, fields))
+
+    @staticmethod
+    def struct_to_dict(value) -> Dict[str, Any]:
+        """Struct -> dict without the fields that were absent from the body"""
+        result = {}
+        for field in value.__struct_fields__:
+            item = getattr(value, field)
+            if item is not msgspec.UNSET:
+                result[field] = item
+        return result
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        """
+        Decode a response body
+
+        Args:
+            data: Body as bytes (preferred, no intermediate str) or str
+
+        Returns:
+            The decoded response (without unused fields when typed)
+        """
+        if self.typed is not None:
+            try:
+                response = self.struct_to_dict(self.typed.decode(data))
+            except msgspec.ValidationError:
+                return loads(data)
+            if self.map_key in response:
+                response[self.map_key] = {key: self.struct_to_dict(item) for key, item in response[self.map_key].items()}
+            return response
+        return loads(data)
@@ -1,17 +1,126 @@
 import time
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import List
+from typing import Dict, List, Optional
 import logging
+from aiohttp import ClientResponseError
+from web3 import AsyncWeb3, AsyncHTTPProvider
+from rate_limiter import rate_scheduler
+
+INFURA_BASE_URL = "https://mainnet.infura.io/v3/"
+LATENCY_ALPHA = 0.2  # EWMA weight of the newest latency sample
+MAX_COOLDOWN = 3600  # Longest cooldown (seconds) after repeated rate limits
+RATE_LIMIT_CODES = (429, -32005)  # HTTP status / Infura JSON-RPC "limit exceeded" code
+LATENCY_SAMPLES = 200  # Recent latencies kept per key for percentiles
+
+@dataclass
+class KeyHealth:
+    """Request counters and health score of one Infura key"""
+    key: str
+    requests: int = 0
+    errors: int = 0
+    rate_limits: int = 0
+    consecutive_rate_limits: int = 0
+    window_requests: int = 0  # Requests since the last quota window reset
+    latency: Optional[float] = None  # EWMA of successful request latency (seconds)
+    failure_rate: float = 0.0  # EWMA of failed requests (0..1)
+    in_flight: int = 0
+    cooldown_until: float = 0.0  # time.monotonic() until which the key is skipped
+    samples: deque = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES), repr=False)
+
+    def cooling_down(self, now: float) -> bool:
+        return now < self.cooldown_until
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Latency percentile of recent successful requests (None until there are enough samples)"""
+        if len(self.samples) < 20:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def score(self, mean_window_requests: float) -> float:
+        """Lower is healthier: latency, scaled up by concurrent load, failures and quota share"""
+        if self.latency is None:
+            return 0.0 if self.in_flight == 0 else float(self.in_flight)  # Measure every key at least once
+        quota_share = self.window_requests / (mean_window_requests + 1)
+        return self.latency * (1 + self.in_flight) * (1 + 10 * self.failure_rate) * (1 + quota_share)
+
+    def record_success(self, elapsed: float):
+        self.samples.append(elapsed)
+        self.latency = elapsed if self.latency is None else (1 - LATENCY_ALPHA) * self.latency + LATENCY_ALPHA * elapsed
+        self.failure_rate *= 1 - LATENCY_ALPHA
+        self.consecutive_rate_limits = 0
+
+    def record_failure(self):
+        self.errors += 1
+        self.failure_rate = (1 - LATENCY_ALPHA) * self.failure_rate + LATENCY_ALPHA
+
+    def record_rate_limit(self, base_cooldown: float) -> float:
+        """Start a cooldown that doubles on consecutive rate limits; returns its length"""
+        self.rate_limits += 1
+        self.consecutive_rate_limits += 1
+        self.failure_rate = (1 - LATENCY_ALPHA) * self.failure_rate + LATENCY_ALPHA
+        cooldown = min(max(base_cooldown, 1) * 2 ** (self.consecutive_rate_limits - 1), MAX_COOLDOWN)
+        self.cooldown_until = max(self.cooldown_until, time.monotonic() + cooldown)
+        return cooldown
+
+class TrackedHTTPProvider(AsyncHTTPProvider):
+    """
+    AsyncHTTPProvider that takes each request from its own rate limit bucket and
+    reports the request's latency and outcome to its key's health
+    """
+
+    def __init__(self, endpoint_uri: str, manager, health: KeyHealth, bucket: str, **kwargs):
+        """
+        Args:
+            endpoint_uri: RPC URL
+            manager: Owner whose mark_rate_limited(health) is called on rate limits
+            health: Health record to update
+            bucket: rate_scheduler bucket of this endpoint, e.g. "infura:<key>"
+        """
+        super().__init__(endpoint_uri, **kwargs)
+        self.manager = manager
+        self.health = health
+        self.bucket = bucket
+
+    async def make_request(self, method, params):
+        await rate_scheduler.acquire(self.bucket)
+        health = self.health
+        health.requests += 1
+        health.window_requests += 1
+        health.in_flight += 1
+        started = time.monotonic()
+        try:
+            response = await super().make_request(method, params)
+        except ClientResponseError as e:
+            if e.status in RATE_LIMIT_CODES:
+                self.manager.mark_rate_limited(health)
+            else:
+                health.record_failure()
+            raise
+        except Exception:
+            health.record_failure()
+            raise
+        finally:
+            health.in_flight -= 1
+
+        error = response.get('error') if isinstance(response, dict) else None
+        if isinstance(error, dict) and error.get('code') in RATE_LIMIT_CODES:
+            self.manager.mark_rate_limited(health)
+        else:
+            health.record_success(time.monotonic() - started)
+        return response
 
 class InfuraKeyManager:
     _instance = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(InfuraKeyManager, cls).__new__(cls)
             cls._instance.initialized = False
         return cls._instance
-    
+
     def __init__(self):
         if not self.initialized:
             self.current_key_index = 0
@@ -19,45 +128,118 @@ class InfuraKeyManager:
             self.infura_keys = []
             self.key_rotation_interval = 0
             self.key_swap_sleep_time = 0
+            self.health: Dict[str, KeyHealth] = {}
+            self.providers: Dict[str, AsyncWeb3] = {}
             self.logger = logging.getLogger('InfuraKeyManager')
             self.initialized = True
-    
+
     def initialize(self, *, infura_keys: List[str], key_rotation_interval: int, key_swap_sleep_time: int):
-        """Initialize the key manager with configuration"""
+        """
+        Initialize the key manager with configuration
+
+        Keys are not used in a fixed rotation: every request goes to the
+        healthiest key (see select_key), and each key has its own rate limit
+        bucket, so every added key adds quota. A key that is rate limited cools down for
+        key_swap_sleep_time seconds (doubling on repeated limits) without blocking
+        the event loop, and per-key quota counters reset every
+        key_rotation_interval seconds. Calling this again keeps the health and
+        providers of keys that are still configured.
+        """
         if isinstance(infura_keys, (list, tuple)):
             self.infura_keys = list(infura_keys)
         else:
             raise ValueError("infura_keys must be a list or tuple")
-            
+
         self.key_rotation_interval = int(key_rotation_interval)
         self.key_swap_sleep_time = int(key_swap_sleep_time)
+        self.health = {key: self.health.get(key) or KeyHealth(key) for key in self.infura_keys}
+        self.providers = {key: web3 for key, web3 in self.providers.items() if key in self.health}
+        self.current_key_index = min(self.current_key_index, max(len(self.infura_keys) - 1, 0))
         self.logger.info("InfuraKeyManager initialized with %d keys", len(self.infura_keys))
-    
+
+    def reset_quota_window(self) -> None:
+        """Start a new quota window once key_rotation_interval has passed"""
+        if datetime.now() - self.last_key_rotation > timedelta(seconds=self.key_rotation_interval):
+            for health in self.health.values():
+                health.window_requests = 0
+            self.last_key_rotation = datetime.now()
+
+    def select_key(self) -> str:
+        """
+        Pick the healthiest key that isn't cooling down
+
+        If every key is cooling down, the one whose cooldown ends first is returned.
+        """
+        if not self.infura_keys:
+            raise RuntimeError("No Infura keys available. Did you call initialize()?")
+        self.reset_quota_window()
+
+        now = time.monotonic()
+        mean_window_requests = sum(health.window_requests for health in self.health.values()) / len(self.health)
+        available = [health for health in self.health.values() if not health.cooling_down(now)]
+        if available:
+            best = min(available, key=lambda health: health.score(mean_window_requests))
+        else:
+            best = min(self.health.values(), key=lambda health: health.cooldown_until)
+        self.current_key_index = self.infura_keys.index(best.key)
+        return best.key
+
+    def get_web3(self, key: Optional[str] = None) -> AsyncWeb3:
+        """Get the cached web3 instance of a key (the healthiest key by default)"""
+        key = key or self.select_key()
+        web3 = self.providers.get(key)
+        if web3 is None:
+            web3 = AsyncWeb3(TrackedHTTPProvider(INFURA_BASE_URL + key, self, self.health[key], f"infura:{key[:8]}"))
+            self.providers[key] = web3
+        return web3
+
+    def mark_rate_limited(self, health: KeyHealth) -> None:
+        """Put a key on cooldown after a rate limit response"""
+        cooldown = health.record_rate_limit(self.key_swap_sleep_time)
+        self.logger.info("Infura key index %d rate limited, cooling down for %ds",
+                         self.infura_keys.index(health.key), cooldown)
+
     def get_current_key(self) -> str:
-        """Get the current Infura key"""
+        """Get the Infura key requests currently go to"""
         if not self.infura_keys:
             raise RuntimeError("No Infura keys available. Did you call initialize()?")
         return self.infura_keys[self.current_key_index]
-    
+
     def get_current_rpc_url(self) -> str:
         """Get the current Infura RPC URL with the current key"""
-        base_url = "https://mainnet.infura.io/v3/"
-        return base_url + self.get_current_key()
-    
+        return INFURA_BASE_URL + self.get_current_key()
+
+    def get_all_rpc_urls(self) -> List[str]:
+        """Get an Infura RPC URL for every configured key"""
+        return [INFURA_BASE_URL + key for key in self.infura_keys]
+
     def rotate_key(self) -> None:
-        """Rotate to the next Infura API key"""
+        """Put the current key on cooldown and move to the healthiest other key"""
         if not self.infura_keys:
             raise RuntimeError("No Infura keys available. Did you call initialize()?")
-        self.current_key_index = (self.current_key_index + 1) % len(self.infura_keys)
-        self.last_key_rotation = datetime.now()
+        self.mark_rate_limited(self.health[self.get_current_key()])
+        self.select_key()
         self.logger.info("Rotated to new Infura key index: %d", self.current_key_index)
-        time.sleep(self.key_swap_sleep_time)
-    
+
     def check_and_rotate_key(self) -> None:
-        """Check if it's time to rotate the key and do so if needed"""
-        if datetime.now() - self.last_key_rotation > timedelta(seconds=self.key_rotation_interval):
-            self.rotate_key()
-    
+        """Re-select the healthiest key"""
+        self.select_key()
+
     def force_rotate_key(self) -> None:
         """Force key rotation, typically used after hitting rate limits"""
         self.rotate_key()
+
+    def get_stats(self) -> List[dict]:
+        """Get a snapshot of per-key health"""
+        now = time.monotonic()
+        return [
+            {
+                "index": index,
+                "requests": health.requests,
+                "errors": health.errors,
+                "rate_limits": health.rate_limits,
+                "latency_ms": (health.latency or 0) * 1000,
+                "cooldown": max(0.0, health.cooldown_until - now)
+            }
+            for index, health in enumerate(self.health[key] for key in self.infura_keys)
+        ]
@@ -0,0 +1,111 @@
+import asyncio
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from eth_abi import decode, encode
+from web3 import AsyncWeb3
+
+# Multicall3 is deployed at the same address on mainnet and most EVM chains
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Call3[]",
+                "name": "calls",
+                "type": "tuple[]"
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"}
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]"
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function"
+    }
+]
+
+# 4-byte function selectors for the reads we batch
+SELECTORS = {
+    'name': bytes.fromhex('06fdde03'),
+    'symbol': bytes.fromhex('95d89b41'),
+    'decimals': bytes.fromhex('313ce567'),
+    'totalSupply': bytes.fromhex('18160ddd'),
+    'getReserves': bytes.fromhex('0902f1ac'),
+    'getPair': bytes.fromhex('e6a43905')
+}
+
+def encode_call(function_name: str, arg_types: Sequence[str] = (), args: Sequence = ()) -> bytes:
+    """Build calldata for a function call"""
+    return SELECTORS[function_name] + (encode(list(arg_types), list(args)) if arg_types else b'')
+
+def decode_string(data: bytes) -> Optional[str]:
+    """Decode a string return value, accepting the bytes32 variant some old tokens use"""
+    if not data:
+        return None
+    try:
+        return decode(['string'], data)[0]
+    except Exception:
+        if len(data) == 32:
+            return data.rstrip(b'\x00').decode('utf-8', errors='replace')
+        return None
+
+def decode_uint(data: bytes) -> Optional[int]:
+    """Decode a single unsigned integer return value"""
+    if len(data) < 32:
+        return None
+    return decode(['uint256'], data[:32])[0]
+
+class Multicall:
+    def __init__(self, get_web3: Callable[[], AsyncWeb3], batch_size: int = 150):
+        """
+        Batch contract reads into Multicall3 aggregate3 calls
+
+        Args:
+            get_web3: Returns the web3 instance to use (so key rotation is picked up)
+            batch_size: Maximum sub-calls per aggregate3 request
+        """
+        self.get_web3 = get_web3
+        self.batch_size = max(1, int(batch_size))
+
+        # Stats
+        self.total_requests = 0
+        self.total_calls = 0
+
+    async def call_chunk(self, chunk: Sequence[Tuple[str, bytes]]) -> List[Tuple[bool, bytes]]:
+        """Run one aggregate3 request (one RPC round trip)"""
+        contract = self.get_web3().eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+        response = await contract.functions.aggregate3(
+            [(target, True, data) for target, data in chunk]
+        ).call()
+        self.total_requests += 1
+        self.total_calls += len(chunk)
+        return [(bool(success), bytes(data)) for success, data in response]
+
+    async def aggregate3(self, calls: Sequence[Tuple[str, bytes]]) -> List[Tuple[bool, bytes]]:
+        """
+        Run (target, calldata) reads, batch_size per request, chunks in parallel
+
+        Individual failures don't revert the batch; they come back as (False, b'').
+
+        Returns:
+            (success, return data) per call, in input order
+        """
+        chunks = [calls[i:i + self.batch_size] for i in range(0, len(calls), self.batch_size)]
+        responses = await asyncio.gather(*(self.call_chunk(chunk) for chunk in chunks))
+        return [result for response in responses for result in response]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get request/call counts (calls - requests = round trips saved)"""
+        return {"requests": self.total_requests, "calls": self.total_calls}
@@ -0,0 +1,209 @@
+import json
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+# A field spec: (column, path in the response, converter, default).
+# The default is used as-is when the key is missing; a present value, None
+# included, goes through the converter (converter None stores the raw value).
+# These are the semantics of the per-field code the tables replaced.
+FieldSpec = Tuple[str, Tuple[str, ...], Optional[Callable[[Any], Any]], Any]
+
+MISSING = object()
+
+def flag(value) -> int:
+    """GoPlus "0"/"1" strings (or bools) to 0/1"""
+    if value == '0' or value is False:
+        return 0
+    if value == '1' or value is True:
+        return 1
+    return 1 if str(value).strip() == '1' else 0
+
+def real(value) -> float:
+    """Number or numeric string (optionally with %) to float"""
+    try:
+        return float(value)
+    except ValueError:
+        return float(str(value).replace('%', '').strip())
+
+def integer(value) -> int:
+    """Number or numeric string (ignoring non-digit characters) to int"""
+    try:
+        return int(value)
+    except ValueError:
+        return int(float(''.join(c for c in str(value) if c.isdigit() or c == '.')))
+
+def text(value) -> str:
+    """str(), with None as ''"""
+    return '' if value is None else str(value)
+
+# Same output as json.dumps; parsed responses can't be circular, so skip that check
+encode_json = json.JSONEncoder(check_circular=False).encode
+
+def to_json(value) -> str:
+    return encode_json(value)
+
+# Honeypot.is /v2/IsHoneypot response -> scan_records columns. Plain builtin
+# converters, compiled strict: malformed values raise instead of storing a default
+HONEYPOT_FIELDS: Sequence[FieldSpec] = (
+    ("token_name", ("token", "name"), None, 'Unknown'),
+    ("token_symbol", ("token", "symbol"), None, 'Unknown'),
+    ("token_decimals", ("token", "decimals"), None, 18),
+    ("token_total_supply", ("token", "totalSupply"), None, '0'),
+    ("hp_simulation_success", ("simulationSuccess",), bool, False),
+    ("hp_buy_tax", ("simulationResult", "buyTax"), float, 0.0),
+    ("hp_sell_tax", ("simulationResult", "sellTax"), float, 0.0),
+    ("hp_transfer_tax", ("simulationResult", "transferTax"), float, 0.0),
+    ("hp_liquidity_amount", ("pair", "liquidity"), float, 0.0),
+    ("hp_pair_reserves0", ("pair", "reserves0"), str, ''),
+    ("hp_pair_reserves1", ("pair", "reserves1"), str, ''),
+    ("hp_buy_gas_used", ("simulationResult", "buyGas"), int, 0),
+    ("hp_sell_gas_used", ("simulationResult", "sellGas"), int, 0),
+    ("hp_creation_time", ("pair", "createdAtTimestamp"), None, ''),
+    ("hp_holder_count", ("token", "totalHolders"), int, 0),
+    ("hp_is_honeypot", ("honeypotResult", "isHoneypot"), bool, True),
+    ("hp_honeypot_reason", ("honeypotResult", "honeypotReason"), None, ''),
+    ("hp_is_open_source", ("contractCode", "openSource"), bool, False),
+    ("hp_is_proxy", ("contractCode", "isProxy"), bool, False),
+    ("hp_is_mintable", ("contractCode", "isMintable"), bool, False),
+    ("hp_can_be_minted", ("contractCode", "canBeMinted"), bool, False),
+    ("hp_owner_address", ("token", "owner"), None, ''),
+    ("hp_creator_address", ("token", "creator"), None, ''),
+    ("hp_deployer_address", ("token", "deployer"), None, ''),
+    ("hp_has_proxy_calls", ("contractCode", "hasProxyCalls"), bool, False),
+    ("hp_pair_liquidity", ("pair", "liquidity"), float, 0.0),
+    ("hp_pair_liquidity_token0", ("pair", "liquidityToken0"), float, 0.0),
+    ("hp_pair_liquidity_token1", ("pair", "liquidityToken1"), float, 0.0),
+    ("hp_pair_token0_symbol", ("pair", "pair", "token0Symbol"), None, ''),
+    ("hp_pair_token1_symbol", ("pair", "pair", "token1Symbol"), None, ''),
+    ("hp_flags", ("flags",), to_json, '[]'),
+)
+
+# GoPlus token_security entry -> scan_records columns (gp_token_name, gp_token_symbol
+# and gp_is_honeypot are only displayed). Compiled lenient: a value the converter
+# rejects stores the default
+GOPLUS_FIELDS: Sequence[FieldSpec] = (
+    ("gp_token_name", ("token_name",), text, 'Unknown'),
+    ("gp_token_symbol", ("token_symbol",), text, 'Unknown'),
+    ("gp_is_honeypot", ("is_honeypot",), flag, 0),
+    ("gp_is_open_source", ("is_open_source",), flag, 0),
+    ("gp_is_proxy", ("is_proxy",), flag, 0),
+    ("gp_is_mintable", ("is_mintable",), flag, 0),
+    ("gp_owner_address", ("owner_address",), text, ''),
+    ("gp_creator_address", ("creator_address",), text, ''),
+    ("gp_can_take_back_ownership", ("can_take_back_ownership",), flag, 0),
+    ("gp_owner_change_balance", ("owner_change_balance",), flag, 0),
+    ("gp_hidden_owner", ("hidden_owner",), flag, 0),
+    ("gp_selfdestruct", ("selfdestruct",), flag, 0),
+    ("gp_external_call", ("external_call",), flag, 0),
+    ("gp_buy_tax", ("buy_tax",), real, 0.0),
+    ("gp_sell_tax", ("sell_tax",), real, 0.0),
+    ("gp_is_anti_whale", ("is_anti_whale",), flag, 0),
+    ("gp_anti_whale_modifiable", ("anti_whale_modifiable",), flag, 0),
+    ("gp_cannot_buy", ("cannot_buy",), flag, 0),
+    ("gp_cannot_sell_all", ("cannot_sell_all",), flag, 0),
+    ("gp_slippage_modifiable", ("slippage_modifiable",), flag, 0),
+    ("gp_personal_slippage_modifiable", ("personal_slippage_modifiable",), flag, 0),
+    ("gp_trading_cooldown", ("trading_cooldown",), flag, 0),
+    ("gp_is_blacklisted", ("is_blacklisted",), flag, 0),
+    ("gp_is_whitelisted", ("is_whitelisted",), flag, 0),
+    ("gp_is_in_dex", ("is_in_dex",), flag, 0),
+    ("gp_transfer_pausable", ("transfer_pausable",), flag, 0),
+    ("gp_can_be_minted", ("can_be_minted",), flag, 0),
+    ("gp_total_supply", ("total_supply",), text, '0'),
+    ("gp_holder_count", ("holder_count",), integer, 0),
+    ("gp_owner_percent", ("owner_percent",), real, 0.0),
+    ("gp_owner_balance", ("owner_balance",), text, '0'),
+    ("gp_creator_percent", ("creator_percent",), real, 0.0),
+    ("gp_creator_balance", ("creator_balance",), text, '0'),
+    ("gp_lp_holder_count", ("lp_holder_count",), integer, 0),
+    ("gp_lp_total_supply", ("lp_total_supply",), text, '0'),
+    ("gp_is_true_token", ("is_true_token",), flag, 0),
+    ("gp_is_airdrop_scam", ("is_airdrop_scam",), flag, 0),
+    ("gp_trust_list", ("trust_list",), to_json, '{}'),
+    ("gp_other_potential_risks", ("other_potential_risks",), to_json, '[]'),
+    ("gp_note", ("note",), text, ''),
+    ("gp_honeypot_with_same_creator", ("honeypot_with_same_creator",), flag, 0),
+    ("gp_fake_token", ("fake_token",), flag, 0),
+    ("gp_holders", ("holders",), to_json, '[]'),
+    ("gp_lp_holders", ("lp_holders",), to_json, '[]'),
+    ("gp_dex_info", ("dex",), to_json, '[]'),
+)
+
+def top_level_keys(fields: Sequence[FieldSpec]) -> Tuple[str, ...]:
+    """First path element of every field, in table order"""
+    return tuple(dict.fromkeys(path[0] for _, path, _, _ in fields))
+
+# Response fields worth decoding: the tables above plus what process_token
+# displays without storing
+HONEYPOT_KEYS = top_level_keys(HONEYPOT_FIELDS) + ('holderAnalysis', 'summary')
+GOPLUS_KEYS = top_level_keys(GOPLUS_FIELDS)
+
+def compile_fields(fields: Sequence[FieldSpec], name: str = 'extract', strict: bool = False) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Compile a field spec table into an extractor function
+
+    The table is turned into the source of one straight-line function (the way
+    collections.namedtuple builds its classes): every nested object on the spec
+    paths is looked up once per call, each field is a local .get() plus its
+    converter, and the result is built as a single dict literal.
+
+    Args:
+        fields: Field specs, see FieldSpec
+        name: Name of the generated function (shows up in tracebacks and profiles)
+        strict: Let converter errors, and nested objects that aren't dicts, raise
+                (otherwise the default is stored / the object treated as empty)
+
+    Returns:
+        Function mapping a response dict to {column: value}
+    """
+    namespace: Dict[str, Any] = {'EMPTY': {}, 'MISSING': MISSING}
+    lines = [f"def {name}(source):", "    n0 = source if source.__class__ is dict else EMPTY"]
+
+    nodes: Dict[Tuple[str, ...], str] = {(): 'n0'}
+    for _, path, _, _ in fields:
+        for depth in range(1, len(path)):
+            prefix = path[:depth]
+            if prefix not in nodes:
+                node = nodes[prefix] = f"n{len(nodes)}"
+                if strict:
+                    lines.append(f"    {node} = {nodes[prefix[:-1]]}.get({prefix[-1]!r}, EMPTY)")
+                else:
+                    lines.append(f"    {node} = {nodes[prefix[:-1]]}.get({prefix[-1]!r})")
+                    lines.append(f"    if {node}.__class__ is not dict: {node} = EMPTY")
+
+    for index, (column, path, converter, default) in enumerate(fields):
+        value, fallback = f"v{index}", f"d{index}"
+        namespace[fallback] = default
+        lines.append(f"    {value} = {nodes[path[:-1]]}.get({path[-1]!r}, MISSING)")
+        lines.append(f"    if {value} is MISSING: {value} = {fallback}")
+        if converter is None:
+            continue
+        namespace[f"c{index}"] = converter
+        if strict:
+            lines.append(f"    else: {value} = c{index}({value})")
+            continue
+        lines.append("    else:")
+        lines.append(f"        try: {value} = c{index}({value})")
+        lines.append(f"        except (TypeError, ValueError): {value} = {fallback}")
+
+    items = ", ".join(f"{column!r}: v{index}" for index, (column, _, _, _) in enumerate(fields))
+    lines.append(f"    return {{{items}}}")
+    exec("\n".join(lines), namespace)
+    return namespace[name]
+
+extract_honeypot = compile_fields(HONEYPOT_FIELDS, 'extract_honeypot', strict=True)
+extract_goplus = compile_fields(GOPLUS_FIELDS, 'extract_goplus')
+
+def goplus_token_data(goplus_data, token_address: str) -> Dict:
+    """The token_security entry of one token (matched by lowercase or original address)"""
+    if not isinstance(goplus_data, dict) or not isinstance(goplus_data.get('result'), dict):
+        return {}
+    result = goplus_data['result']
+    return result.get(token_address.lower()) or result.get(token_address) or {}
+
+def normalize_honeypot(honeypot_data) -> Dict[str, Any]:
+    """Honeypot.is response -> {column: value}"""
+    return extract_honeypot(honeypot_data)
+
+def normalize_goplus(goplus_data, token_address: str) -> Dict[str, Any]:
+    """GoPlus token_security response -> {column: value} for one token"""
+    return extract_goplus(goplus_token_data(goplus_data, token_address))
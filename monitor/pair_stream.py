@@ -0,0 +1,324 @@
+import asyncio
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from web3 import AsyncWeb3
+from event_logs import PAIR_CREATED_TOPIC, decode_pair_created, get_logs, to_hex
+from terminal_display import log_message
+
+class PairEventLog:
+    def __init__(self, db, name: str = 'pair_created'):
+        """
+        Durable record of PairCreated events and the stream cursor
+
+        Every accepted event is inserted into pair_events keyed by its chain
+        position (block_number, log_index) in the same transaction that advances
+        the cursor, so after a restart the stream resumes right after the last
+        recorded event and an event is never queued twice. Events whose token was
+        queued but not finished are re-queued on startup.
+
+        Args:
+            db: SessionDatabase holding the stream tables
+            name: Cursor name (one row per stream)
+        """
+        self.db = db
+        self.name = name
+        self.tasks: Set[asyncio.Task] = set()
+        self.db.write_sync(self.create_schema)
+
+    @staticmethod
+    def create_schema(db):
+        """Cursor and event tables (runs on the writer connection)"""
+        db.execute('''
+            CREATE TABLE IF NOT EXISTS stream_cursor (
+                name TEXT PRIMARY KEY,
+                block_number INTEGER NOT NULL,
+                log_index INTEGER NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        ''')
+        db.execute('''
+            CREATE TABLE IF NOT EXISTS pair_events (
+                block_number INTEGER NOT NULL,
+                log_index INTEGER NOT NULL,
+                block_hash TEXT,
+                transaction_hash TEXT,
+                token_address TEXT NOT NULL,
+                pair_address TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (block_number, log_index)
+            )
+        ''')
+        db.execute('CREATE INDEX IF NOT EXISTS idx_pair_events_status ON pair_events(status)')
+
+    def load_cursor(self) -> Optional[Tuple[int, int]]:
+        """Get the last recorded (block_number, log_index), or None for a new session"""
+        row = self.db.fetchone_sync('SELECT block_number, log_index FROM stream_cursor WHERE name = ?', (self.name,))
+        return (row[0], row[1]) if row else None
+
+    def record_job(self, db, event: Dict, token_address: str) -> bool:
+        """Insert an event and advance the cursor in one transaction (runs on the writer connection)"""
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        # A position freed by a reorg can be taken by the event that replaced it
+        cursor = db.execute('''
+            INSERT INTO pair_events
+                (block_number, log_index, block_hash, transaction_hash, token_address, pair_address, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, 'queued', ?)
+            ON CONFLICT(block_number, log_index) DO UPDATE SET
+                block_hash = excluded.block_hash,
+                transaction_hash = excluded.transaction_hash,
+                token_address = excluded.token_address,
+                pair_address = excluded.pair_address,
+                status = 'queued',
+                created_at = excluded.created_at
+            WHERE pair_events.status = 'reorged'
+        ''', (
+            event['block_number'],
+            event['log_index'],
+            event.get('block_hash'),
+            event.get('transaction_hash'),
+            token_address,
+            event['pair'],
+            now
+        ))
+        if cursor.rowcount == 0:
+            return False
+
+        # The pair was mined again on the new chain, so its tombstone no longer applies
+        db.execute("DELETE FROM scan_records WHERE token_address = ? AND status = 'reorged'", (token_address,))
+        db.execute('''
+            INSERT INTO stream_cursor (name, block_number, log_index, updated_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                block_number = excluded.block_number,
+                log_index = excluded.log_index,
+                updated_at = excluded.updated_at
+            WHERE (excluded.block_number, excluded.log_index) > (stream_cursor.block_number, stream_cursor.log_index)
+        ''', (self.name, event['block_number'], event['log_index'], now))
+        return True
+
+    async def record(self, event: Dict, token_address: str) -> bool:
+        """
+        Durably record an event before its token is queued
+
+        Returns:
+            False if the event was already recorded (and must not be queued again)
+        """
+        return await self.db.write(self.record_job, event, token_address)
+
+    @staticmethod
+    def set_status_job(db, block_number: int, log_index: int, status: str):
+        """Update a queued event's processing status (runs on the writer connection)"""
+        db.execute("UPDATE pair_events SET status = ? WHERE block_number = ? AND log_index = ? AND status = 'queued'",
+                   (status, block_number, log_index))
+
+    def rollback_job(self, db, event: Dict) -> bool:
+        """Tombstone a reorged-out event and its scan record, and rewind the cursor (runs on the writer connection)"""
+        row = db.execute('''
+            SELECT token_address, pair_address FROM pair_events
+            WHERE block_number = ? AND log_index = ? AND block_hash = ? AND status != 'reorged'
+        ''', (event['block_number'], event['log_index'], event['block_hash'])).fetchone()
+        if row is None:
+            return False  # Not a WETH pair, or already rolled back
+
+        token_address, pair_address = row
+        db.execute("UPDATE pair_events SET status = 'reorged' WHERE block_number = ? AND log_index = ?",
+                   (event['block_number'], event['log_index']))
+        # The token may still be queued or its scan buffered, so a missing row gets a bare
+        # tombstone that the later persist finds instead of inserting the pair as active
+        db.execute('''
+            INSERT INTO scan_records (token_address, pair_address, scan_timestamp, total_scans, status, last_error)
+            VALUES (?, ?, ?, 0, 'reorged', ?)
+            ON CONFLICT(token_address) DO UPDATE SET
+                status = excluded.status,
+                last_error = excluded.last_error
+            WHERE scan_records.pair_address = excluded.pair_address
+        ''', (
+            token_address,
+            pair_address,
+            datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            f"PairCreated reorged out of block {event['block_number']}"
+        ))
+
+        # The cursor points at the newest event still on the canonical chain
+        latest = db.execute('''
+            SELECT block_number, log_index FROM pair_events
+            WHERE status != 'reorged'
+            ORDER BY block_number DESC, log_index DESC
+            LIMIT 1
+        ''').fetchone()
+        if latest is None:
+            db.execute('DELETE FROM stream_cursor WHERE name = ?', (self.name,))
+        else:
+            db.execute('UPDATE stream_cursor SET block_number = ?, log_index = ?, updated_at = ? WHERE name = ?',
+                       (latest[0], latest[1], datetime.now().strftime('%Y-%m-%d %H:%M:%S'), self.name))
+        return True
+
+    async def rollback(self, event: Dict) -> bool:
+        """
+        Roll back an event whose block left the canonical chain
+
+        Returns:
+            True if a recorded pair was tombstoned
+        """
+        return await self.db.write(self.rollback_job, event)
+
+    async def wait_and_mark(self, future: asyncio.Future, block_number: int, log_index: int):
+        """Mark an event processed (or failed) once its token has been processed"""
+        try:
+            status = 'processed' if await future else 'failed'
+        except asyncio.CancelledError:
+            return  # Shutting down; the event stays queued and is re-queued on restart
+        except Exception:
+            status = 'failed'
+        await self.db.write(self.set_status_job, block_number, log_index, status)
+
+    def track(self, future: asyncio.Future, block_number: int, log_index: int):
+        """Record the outcome of a queued event in the background"""
+        task = asyncio.create_task(self.wait_and_mark(future, block_number, log_index))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def unfinished_events(self) -> List[tuple]:
+        """Events queued before a restart whose token never finished processing"""
+        return await self.db.fetchall('''
+            SELECT block_number, log_index, token_address, pair_address
+            FROM pair_events
+            WHERE status = 'queued'
+            ORDER BY block_number, log_index
+        ''')
+
+    async def close(self):
+        """Wait for pending status updates"""
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+
+class PairCreatedPoller:
+    def __init__(self,
+                 get_web3: Callable[[], AsyncWeb3],
+                 factory_address: str,
+                 confirmations: int = 12,
+                 finality_blocks: int = 64,
+                 max_blocks: int = 500):
+        """
+        Stateless, reorg-aware PairCreated polling over eth_getLogs
+
+        Each poll reads the head once and asks for the logs from the oldest
+        buffered block through the head with a plain eth_getLogs call, so nothing
+        lives on the node: there are no filters to expire or rebuild, and a key
+        rotation only changes which provider answers the next call.
+
+        Events are buffered by (block_hash, log_index). An event is released once
+        it has `confirmations` blocks on top, then stays watched until it is
+        `finality_blocks` deep. A buffered event that comes back with removed set,
+        or is missing from the re-read range while its block hash changed, has
+        been reorged out: pending events are dropped and released ones are
+        returned for rollback. This keeps a low confirmation depth safe.
+
+        Args:
+            get_web3: Returns the web3 instance to use (so key rotation is picked up)
+            factory_address: Uniswap factory emitting PairCreated
+            confirmations: Blocks a log must be buried under before it is released
+            finality_blocks: Depth after which released events are no longer watched
+            max_blocks: Largest block range of new blocks per call (when catching up)
+        """
+        self.get_web3 = get_web3
+        self.factory_address = factory_address
+        self.confirmations = max(0, int(confirmations))
+        self.finality_blocks = max(self.confirmations, int(finality_blocks))
+        self.max_blocks = max(1, int(max_blocks))
+        self.next_block: Optional[int] = None
+        self.head: Optional[int] = None
+        self.pending: Dict[Tuple[str, int], Dict] = {}   # (block_hash, log_index) -> event awaiting confirmations
+        self.released: Dict[Tuple[str, int], Dict] = {}  # (block_hash, log_index) -> released event watched until final
+
+        # Stats
+        self.total_polls = 0
+        self.total_events = 0
+        self.total_reorged = 0
+
+    @staticmethod
+    def event_key(event: Dict) -> Tuple[str, int]:
+        """Buffer key of a decoded event"""
+        return event['block_hash'], event['log_index']
+
+    def start_at(self, block_number: int):
+        """Set the first block the next poll asks for"""
+        self.next_block = max(0, int(block_number))
+
+    async def block_hash(self, web3: AsyncWeb3, block_number: int) -> Optional[str]:
+        """Canonical hash of a block (None if the node doesn't have it)"""
+        block = await web3.eth.get_block(block_number)
+        return to_hex(block['hash']) if block else None
+
+    async def poll(self) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Fetch new PairCreated events, check buffered ones against the canonical chain
+        and release the ones that are now confirmed
+
+        Returns:
+            (events that reached the confirmation depth, released events that were
+            reorged out), each in chain order
+        """
+        web3 = self.get_web3()
+        head = await web3.eth.block_number
+        if self.next_block is None:
+            self.next_block = head - self.confirmations + 1
+        if head < self.next_block:
+            return [], []
+        self.head = head
+
+        # Re-read the buffered blocks together with the new ones
+        buffered = list(self.pending.values()) + list(self.released.values())
+        from_block = min([self.next_block] + [event['block_number'] for event in buffered])
+        to_block = min(head, self.next_block + self.max_blocks - 1)
+        logs = await get_logs(web3, from_block, to_block, self.factory_address, [PAIR_CREATED_TOPIC])
+        self.next_block = to_block + 1
+        self.total_polls += 1
+
+        canonical: Dict[Tuple[str, int], Dict] = {}
+        removed = set()
+        for log in logs:
+            event = decode_pair_created(log)
+            if event['removed']:
+                removed.add(self.event_key(event))
+            else:
+                canonical[self.event_key(event)] = event
+
+        # Missing logs are confirmed against the block hash, since load-balanced nodes can briefly disagree
+        reorged = []
+        hashes: Dict[int, Optional[str]] = {}
+        for buffer in (self.pending, self.released):
+            for key, event in list(buffer.items()):
+                if key in canonical or not from_block <= event['block_number'] <= to_block:
+                    continue
+                if key not in removed:
+                    if event['block_number'] not in hashes:
+                        hashes[event['block_number']] = await self.block_hash(web3, event['block_number'])
+                    if hashes[event['block_number']] == event['block_hash']:
+                        continue
+                del buffer[key]
+                self.total_reorged += 1
+                log_message(f"PairCreated {event['pair']} reorged out of block {event['block_number']}", "WARNING")
+                if buffer is self.released:
+                    reorged.append(event)
+
+        for key, event in canonical.items():
+            if key not in self.pending and key not in self.released:
+                self.pending[key] = event
+                self.total_events += 1
+
+        # Release confirmed events, then stop watching final ones
+        confirmed = sorted(
+            (event for event in self.pending.values() if head - event['block_number'] >= self.confirmations),
+            key=lambda event: (event['block_number'], event['log_index'])
+        )
+        for event in confirmed:
+            key = self.event_key(event)
+            self.released[key] = self.pending.pop(key)
+        for key, event in list(self.released.items()):
+            if head - event['block_number'] >= self.finality_blocks:
+                del self.released[key]
+
+        reorged.sort(key=lambda event: (event['block_number'], event['log_index']))
+        return confirmed, reorged
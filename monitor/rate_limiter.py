@@ -0,0 +1,145 @@
+import asyncio
+import time
+from typing import Dict, Optional
+from terminal_display import log_message
+
+# Default quotas per upstream, overridable through "rate_limits" in config.json.
+# A bucket named "<upstream>:<id>" gets its own bucket with the upstream's quota,
+# e.g. "infura:<key>" for each Infura project
+DEFAULT_RATE_LIMITS = {
+    "goplus": {"requests_per_minute": 30, "burst": 5},      # GoPlus free tier
+    "honeypot": {"requests_per_minute": 60, "burst": 5},    # Honeypot.is public API
+    "infura": {"requests_per_minute": 600, "burst": 20},    # ~10 req/s per project (key)
+    "rpc": {"requests_per_minute": 600, "burst": 20}        # Per other RPC endpoint
+}
+
+class TokenBucket:
+    def __init__(self, name: str, rate: float, capacity: float):
+        """
+        Token bucket limiter
+
+        Args:
+            name: Upstream name (for stats and logging)
+            rate: Tokens added per second
+            capacity: Maximum tokens held (burst size)
+        """
+        self.name = name
+        self.rate = max(float(rate), 1e-6)
+        self.capacity = max(float(capacity), 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = asyncio.Lock()
+
+        # Stats
+        self.total_acquired = 0
+        self.total_waits = 0
+        self.total_wait_time = 0.0
+
+    def refill(self) -> None:
+        """Add tokens for the time elapsed since the last refill"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the bucket, waiting only if it is empty
+
+        Waiters are served in FIFO order because the wait happens under the lock.
+
+        Returns:
+            Seconds spent waiting
+        """
+        tokens = min(float(tokens), self.capacity)
+        waited = 0.0
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    delay = self.blocked_until - now
+                else:
+                    self.refill()
+                    if self.tokens >= tokens:
+                        self.tokens -= tokens
+                        break
+                    delay = (tokens - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+        self.total_acquired += 1
+        if waited > 0:
+            self.total_waits += 1
+            self.total_wait_time += waited
+        return waited
+
+    def pause(self, seconds: float) -> None:
+        """Empty the bucket and block it, typically after the upstream returned 429"""
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.blocked_until = max(self.blocked_until, self.updated + seconds)
+
+
+class RateScheduler:
+    def __init__(self):
+        """Initialize one token bucket per upstream with default quotas"""
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.limits: Dict[str, Dict] = {}
+        self.configure({})
+
+    def configure(self, limits: Optional[Dict[str, Dict]] = None) -> None:
+        """
+        (Re)build buckets from a limits mapping
+
+        Args:
+            limits: {upstream: {"requests_per_minute": int, "burst": int}}
+                    merged over DEFAULT_RATE_LIMITS. Per-key buckets
+                    ("<upstream>:<id>") are recreated on first use.
+        """
+        merged = {name: dict(values) for name, values in DEFAULT_RATE_LIMITS.items()}
+        for name, values in (limits or {}).items():
+            merged.setdefault(name, {}).update(values)
+
+        self.limits = merged
+        self.buckets = {name: self.make_bucket(name, values) for name, values in merged.items()}
+
+    @staticmethod
+    def make_bucket(name: str, values: Dict) -> TokenBucket:
+        per_minute = float(values.get("requests_per_minute", 60))
+        burst = float(values.get("burst", 1))
+        return TokenBucket(name, per_minute / 60.0, burst)
+
+    def get_bucket(self, name: str) -> TokenBucket:
+        """
+        Get the bucket for an upstream or one of its keys ("<upstream>:<id>")
+
+        A key bucket is created with its upstream's quota; an unknown upstream gets 60/min.
+        """
+        if name not in self.buckets:
+            upstream = name.split(":", 1)[0]
+            self.buckets[name] = self.make_bucket(name, self.limits.get(upstream, {"requests_per_minute": 60, "burst": 1}))
+        return self.buckets[name]
+
+    async def acquire(self, name: str, tokens: float = 1.0) -> float:
+        """Wait for quota on an upstream and return the time spent waiting"""
+        return await self.get_bucket(name).acquire(tokens)
+
+    def penalize(self, name: str, seconds: float) -> None:
+        """Back off an upstream after a rate limit response"""
+        self.get_bucket(name).pause(seconds)
+        log_message(f"Rate limited by {name}, pausing for {seconds:.0f}s", "WARNING")
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get per-upstream acquire and wait statistics"""
+        return {
+            name: {
+                "rate_per_minute": bucket.rate * 60.0,
+                "acquired": bucket.total_acquired,
+                "waits": bucket.total_waits,
+                "wait_time": bucket.total_wait_time
+            }
+            for name, bucket in self.buckets.items()
+        }
+
+# Global instance
+rate_scheduler = RateScheduler()
@@ -0,0 +1,275 @@
+"""
+Offline replay of captured GoPlus/Honeypot responses through TokenChecker
+
+Every token with a captured honeypot response in the api_logs files (old
+.json arrays and current .jsonl logs) is run through TokenChecker.process_token
+with api_wrapper's HTTP calls served from the captures by an injected
+transport, then process_rescan_tokens is run over the resulting database.
+Nothing touches the network, rate limits are lifted and the response cache
+is disabled by default, so the run measures the pipeline itself.
+
+Reports tokens/sec, p50/p99 latency per stage and database write time.
+
+Usage:
+    python replay.py [--logs FILE ...] [--rescans N] [--workers N] [--batch-window S] [--cache] [--verbose]
+"""
+import argparse
+import asyncio
+import contextlib
+import glob
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from rich.table import Table
+import GX_Scancheck
+from GX_Scancheck import TokenChecker, load_config
+from SPXfucked import TokenTracker
+from api_tracker import api_tracker, read_api_log
+from api_wrapper import api_wrapper
+from fast_json import dumps, loads, DecodeError
+from rate_limiter import rate_scheduler
+from session_db import close_all_databases
+from terminal_display import console, log_message
+from worker_pool import TokenWorkerPool
+
+class CapturedResponse:
+    """Stand-in for aiohttp.ClientResponse with a captured status and body"""
+
+    def __init__(self, status: int, body: bytes):
+        self.status = status
+        self.body = body
+
+    async def read(self) -> bytes:
+        return self.body
+
+    async def text(self) -> str:
+        return self.body.decode('utf-8', errors='replace')
+
+    async def json(self) -> Any:
+        return loads(self.body)
+
+class ReplayTransport:
+    def __init__(self, paths: List[str]):
+        """
+        Serve API requests from captured calls
+
+        Honeypot responses are replayed per address in capture order (cycling
+        when a token is scanned more often than it was captured). GoPlus
+        responses are split into per-address entries, so batched requests get
+        a combined response whatever batches were used at capture time.
+
+        Args:
+            paths: API log files (.json arrays or .jsonl)
+        """
+        self.honeypot: Dict[str, List[Tuple[int, bytes]]] = defaultdict(list)
+        self.goplus: Dict[str, Any] = {}
+        self.goplus_envelope = {"code": 1, "message": "OK"}
+        self.served: Dict[str, int] = defaultdict(int)
+        self.position: Dict[str, int] = defaultdict(int)
+
+        for path in paths:
+            for call in read_api_log(path):
+                params = call.get('params') or {}
+                body = call.get('response_body') or ''
+                if call.get('endpoint') == 'honeypot' and params.get('address'):
+                    self.honeypot[params['address'].lower()].append((int(call.get('response_code') or 500), body.encode('utf-8')))
+                elif call.get('endpoint') == 'goplus' and call.get('response_code') == 200:
+                    try:
+                        data = loads(body)
+                    except DecodeError:
+                        continue
+                    if isinstance(data, dict) and isinstance(data.get('result'), dict):
+                        self.goplus.update({address.lower(): entry for address, entry in data['result'].items()})
+
+    def tokens(self) -> List[Tuple[str, str]]:
+        """(token address, pair address) of every token with a successful honeypot capture"""
+        tokens = []
+        for address, responses in self.honeypot.items():
+            for status, body in responses:
+                if status != 200:
+                    continue
+                try:
+                    data = loads(body)
+                except DecodeError:
+                    continue
+                token = (data.get('token') or {}).get('address') or address
+                pair = ((data.get('pair') or {}).get('pair') or {}).get('address') or ''
+                tokens.append((token, pair))
+                break
+        return tokens
+
+    async def __call__(self, url: str, params: Optional[Dict[str, Any]]) -> CapturedResponse:
+        params = params or {}
+        if 'gopluslabs' in url:
+            self.served['goplus'] += 1
+            addresses = [address.lower() for address in str(params.get('contract_addresses', '')).split(',') if address]
+            result = {address: self.goplus[address] for address in addresses if address in self.goplus}
+            return CapturedResponse(200, dumps({**self.goplus_envelope, "result": result}).encode('utf-8'))
+
+        self.served['honeypot'] += 1
+        address = str(params.get('address', '')).lower()
+        responses = self.honeypot.get(address)
+        if not responses:
+            return CapturedResponse(404, b'{"error":"not captured"}')
+        index = self.position[address]
+        self.position[address] += 1
+        return CapturedResponse(*responses[index % len(responses)])
+
+class StageTimer:
+    """Latency samples per pipeline stage"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def wrap(self, stage: str, fn):
+        """Time every await of a coroutine function"""
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                self.samples[stage].append(time.perf_counter() - started)
+        return timed
+
+    def wrap_sync(self, stage: str, fn):
+        """Time every call of a function (also from other threads)"""
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.samples[stage].append(time.perf_counter() - started)
+        return timed
+
+    @staticmethod
+    def percentile(values: List[float], fraction: float) -> float:
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def table(self, title: str) -> Table:
+        table = Table(title=title, border_style="blue")
+        table.add_column("Stage", style="cyan")
+        table.add_column("Count", style="green")
+        table.add_column("p50 (ms)", style="green")
+        table.add_column("p99 (ms)", style="yellow")
+        table.add_column("Total (s)", style="magenta")
+        for stage, values in self.samples.items():
+            table.add_row(
+                stage,
+                str(len(values)),
+                f"{self.percentile(values, 0.50) * 1000:.2f}",
+                f"{self.percentile(values, 0.99) * 1000:.2f}",
+                f"{sum(values):.3f}"
+            )
+        return table
+
+def instrument(checker: TokenChecker, timer: StageTimer):
+    """Wrap the checker's stages and database jobs with timers"""
+    checker.check_honeypot = timer.wrap("honeypot api", checker.check_honeypot)
+    checker.check_goplus = timer.wrap("goplus api", checker.check_goplus)
+    checker.process_token = timer.wrap("process_token", checker.process_token)
+    GX_Scancheck.normalize_honeypot = timer.wrap_sync("normalize honeypot", GX_Scancheck.normalize_honeypot)
+    GX_Scancheck.normalize_goplus = timer.wrap_sync("normalize goplus", GX_Scancheck.normalize_goplus)
+
+    put = checker.write_behind.put
+    async def timed_put(fn, *args):
+        return await put(timer.wrap_sync("db write job", fn), *args)
+    checker.write_behind.put = timed_put
+
+async def run(args) -> None:
+    transport = ReplayTransport(args.logs)
+    tokens = transport.tokens()[:args.limit or None]
+    if not tokens:
+        print("No captured honeypot responses found")
+        return
+
+    workdir = tempfile.mkdtemp(prefix="replay_")
+    config = load_config(args.config)
+    scanning = config['scanning']
+
+    # Offline and unthrottled: captured responses, no rate limits, logs and cache in the work folder
+    rate_scheduler.configure({name: {"requests_per_minute": 1e9, "burst": 1e9} for name in ("goplus", "honeypot", "infura", "rpc")})
+    cache = {"path": os.path.join(workdir, "api_cache.db")}
+    if not args.cache:
+        cache.update({"ttl": {"goplus": 0, "honeypot": 0}, "stale": {"goplus": 0, "honeypot": 0}})
+    goplus_batch = dict(config.get('goplus_batch', {}))
+    if args.batch_window is not None:
+        goplus_batch["window"] = args.batch_window
+    api_wrapper.configure(config.get('http', {}), goplus_batch, cache)
+    api_wrapper.transport = transport
+    api_tracker.log_dir = workdir
+    api_tracker.log_file = api_tracker.get_segment_path(0)
+
+    tracker = TokenTracker(args.config)
+    checker = TokenChecker(tracker, workdir, {**scanning, "light_rescan": False})  # Reserve reads need the chain
+    timer = StageTimer()
+    instrument(checker, timer)
+    workers = args.workers or scanning['workers']
+    checker.worker_pool = TokenWorkerPool(checker.process_token, workers=workers)
+
+    output = sys.stdout if args.verbose else open(os.devnull, 'w')
+    try:
+        with contextlib.redirect_stdout(output):
+            checker.worker_pool.start()
+            started = time.perf_counter()
+            futures = [await checker.worker_pool.submit(token, pair) for token, pair in tokens]
+            await asyncio.gather(*futures, return_exceptions=True)
+            await checker.write_behind.flush()
+            scan_time = time.perf_counter() - started
+
+            rescan_times = []
+            for _ in range(args.rescans):
+                started = time.perf_counter()
+                await checker.process_rescan_tokens()
+                await checker.write_behind.flush()
+                rescan_times.append(time.perf_counter() - started)
+
+            await checker.worker_pool.stop()
+            await checker.write_behind.close()
+            await api_wrapper.close()
+            await api_tracker.close()
+            write_stats = checker.write_behind.get_stats()
+            remaining = (await checker.db.fetchone("SELECT COUNT(*) FROM scan_records WHERE status = 'active'"))[0]
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        close_all_databases()
+
+    scans = len(timer.samples["process_token"])
+    summary = Table(title="Replay Summary", border_style="green")
+    summary.add_column("Metric", style="cyan")
+    summary.add_column("Value", style="green")
+    summary.add_row("Captured tokens", str(len(tokens)))
+    summary.add_row("Workers", str(workers))
+    summary.add_row("Initial scan", f"{scan_time:.2f}s ({len(tokens) / scan_time:.1f} tokens/s)")
+    for index, elapsed in enumerate(rescan_times, 1):
+        summary.add_row(f"Rescan pass {index}", f"{elapsed:.2f}s")
+    summary.add_row("Scans total", str(scans))
+    summary.add_row("Active after replay", str(remaining))
+    summary.add_row("API responses served", ", ".join(f"{name} {count}" for name, count in transport.served.items()))
+    summary.add_row("DB batches", f"{write_stats['batches']} ({write_stats['avg_batch']:.1f} jobs avg)")
+    summary.add_row("DB flush time", f"{write_stats['flush_time']:.3f}s")
+    summary.add_row("Work folder", workdir)
+    console.print(summary)
+    console.print(timer.table("Stage Latency"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured API responses through TokenChecker")
+    parser.add_argument("--logs", nargs="*", default=None, help="API log files (default: api_logs/api_calls_*)")
+    parser.add_argument("--config", default="config.json", help="Config file (scanning, http and batching settings)")
+    parser.add_argument("--rescans", type=int, default=1, help="process_rescan_tokens passes after the initial scan")
+    parser.add_argument("--workers", type=int, default=0, help="Concurrent tokens (default: scanning.workers)")
+    parser.add_argument("--limit", type=int, default=0, help="Replay only the first N tokens")
+    parser.add_argument("--batch-window", type=float, default=None, help="GoPlus batching window in seconds (default: goplus_batch.window)")
+    parser.add_argument("--cache", action="store_true", help="Serve repeat scans from the response cache (default TTLs)")
+    parser.add_argument("--verbose", action="store_true", help="Show the scanner's normal output")
+    args = parser.parse_args()
+    args.logs = args.logs or sorted(glob.glob(os.path.join("api_logs", "api_calls_*.json*")))
+    log_message(f"Replaying {len(args.logs)} API log files", "INFO")
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
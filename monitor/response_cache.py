@@ -0,0 +1,170 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from fast_json import dumps, loads
+from session_db import SessionDatabase
+from terminal_display import log_message
+
+# Cache settings, overridable through the "response_cache" config section
+DEFAULT_CACHE_SETTINGS = {
+    "path": "api_cache.db",  # Shared by every session started from this directory
+    "max_entries": 5000,  # Entries kept in memory (LRU)
+    "ttl": {"goplus": 300, "honeypot": 60},  # Seconds a response is fresh
+    "stale": {"goplus": 600, "honeypot": 60},  # Further seconds it is served while being refreshed
+    "retention": 86400  # Seconds before stored entries are deleted
+}
+
+class ResponseCache:
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        """
+        TTL + LRU cache of API responses with a persistent SQLite backing
+
+        Lookups check a size-bounded in-memory LRU, then the api_cache table. A
+        fresh entry (younger than the endpoint's TTL) is returned without an API
+        call. A stale entry (within the following stale window) is returned
+        immediately while one background request refreshes it
+        (stale-while-revalidate). Anything older is a miss. Only responses that
+        pass the caller's cacheable check are stored (by default any non-empty
+        response), so failed calls and "not indexed yet" answers are retried on
+        the next lookup. The database file is shared, so restarts and parallel
+        sessions start warm.
+
+        Args:
+            settings: Overrides merged over DEFAULT_CACHE_SETTINGS
+        """
+        settings = settings or {}
+        self.settings = {**DEFAULT_CACHE_SETTINGS, **settings}
+        self.ttl = {**DEFAULT_CACHE_SETTINGS["ttl"], **settings.get("ttl", {})}
+        self.stale = {**DEFAULT_CACHE_SETTINGS["stale"], **settings.get("stale", {})}
+        self.max_entries = max(1, int(self.settings["max_entries"]))
+
+        self.memory: "OrderedDict[Tuple[str, str], Tuple[float, Dict]]" = OrderedDict()
+        self.refreshing: Set[Tuple[str, str]] = set()
+        self.tasks: Set[asyncio.Task] = set()
+        self.db = SessionDatabase(self.settings["path"])
+        self.db.write_sync(self.create_schema)
+        self.db.write_sync(self.delete_expired, time.time() - float(self.settings["retention"]))
+
+        # Stats
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def create_schema(db):
+        """Response table (runs on the writer connection)"""
+        db.execute('''
+            CREATE TABLE IF NOT EXISTS api_cache (
+                endpoint TEXT NOT NULL,
+                key TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                body TEXT NOT NULL,
+                PRIMARY KEY (endpoint, key)
+            )
+        ''')
+
+    @staticmethod
+    def delete_expired(db, before: float):
+        """Drop entries stored before a timestamp (runs on the writer connection)"""
+        db.execute('DELETE FROM api_cache WHERE stored_at < ?', (before,))
+
+    @staticmethod
+    def store_job(db, endpoint: str, key: str, stored_at: float, body: str):
+        """Upsert one entry (runs on the writer connection)"""
+        db.execute('''
+            INSERT INTO api_cache (endpoint, key, stored_at, body) VALUES (?, ?, ?, ?)
+            ON CONFLICT(endpoint, key) DO UPDATE SET stored_at = excluded.stored_at, body = excluded.body
+            WHERE excluded.stored_at > api_cache.stored_at
+        ''', (endpoint, key, stored_at, body))
+
+    def remember(self, cache_key: Tuple[str, str], stored_at: float, value: Dict):
+        """Put an entry in the in-memory LRU, evicting the least recently used"""
+        self.memory[cache_key] = (stored_at, value)
+        self.memory.move_to_end(cache_key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    async def lookup(self, endpoint: str, key: str) -> Optional[Tuple[float, Dict]]:
+        """Find an entry in memory, then in the database"""
+        cache_key = (endpoint, key)
+        entry = self.memory.get(cache_key)
+        if entry is not None:
+            self.memory.move_to_end(cache_key)
+            return entry
+
+        row = await self.db.fetchone('SELECT stored_at, body FROM api_cache WHERE endpoint = ? AND key = ?', (endpoint, key))
+        if row is None:
+            return None
+        entry = (row[0], loads(row[1]))
+        self.remember(cache_key, *entry)
+        return entry
+
+    def store(self, endpoint: str, key: str, value: Dict, cacheable: Optional[Callable[[Dict], bool]] = None):
+        """Cache a response in memory and persist it in the background, unless it isn't cacheable"""
+        if not (cacheable or bool)(value):
+            return
+        stored_at = time.time()
+        self.remember((endpoint, key), stored_at, value)
+        self.db.submit_write(self.store_job, endpoint, key, stored_at, dumps(value))
+
+    async def refresh(self, endpoint: str, key: str, fetch: Callable[[], Awaitable[Dict]],
+                      cacheable: Optional[Callable[[Dict], bool]] = None):
+        """Re-fetch a stale entry"""
+        try:
+            self.store(endpoint, key, await fetch(), cacheable)
+        except Exception as e:
+            log_message(f"Background refresh of {endpoint} {key} failed: {str(e)}", "WARNING")
+        finally:
+            self.refreshing.discard((endpoint, key))
+
+    async def get_or_fetch(self, endpoint: str, key: str, fetch: Callable[[], Awaitable[Dict]],
+                           cacheable: Optional[Callable[[Dict], bool]] = None) -> Dict:
+        """
+        Get a cached response or fetch (and cache) a new one
+
+        Args:
+            endpoint: Endpoint name, selects the TTL ("goplus", "honeypot")
+            key: Request key, e.g. the lowercase token address
+            fetch: Coroutine function making the API call
+            cacheable: Whether a fetched response may be cached (default: any non-empty response)
+
+        Returns:
+            The response
+        """
+        entry = await self.lookup(endpoint, key)
+        if entry is not None:
+            stored_at, value = entry
+            age = time.time() - stored_at
+            ttl = float(self.ttl.get(endpoint, 0))
+            if age < ttl:
+                self.hits += 1
+                return value
+            if age < ttl + float(self.stale.get(endpoint, 0)):
+                self.stale_hits += 1
+                if (endpoint, key) not in self.refreshing:
+                    self.refreshing.add((endpoint, key))
+                    task = asyncio.create_task(self.refresh(endpoint, key, fetch, cacheable))
+                    self.tasks.add(task)
+                    task.add_done_callback(self.tasks.discard)
+                return value
+
+        self.misses += 1
+        value = await fetch()
+        self.store(endpoint, key, value, cacheable)
+        return value
+
+    async def close(self):
+        """Wait for background refreshes and flush stored entries"""
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        await asyncio.to_thread(self.db.close)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get a snapshot of cache metrics"""
+        return {
+            "entries": len(self.memory),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses
+        }
@@ -0,0 +1,181 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+import logging
+from web3 import AsyncWeb3
+from web3.providers.async_base import AsyncJSONBaseProvider
+from key_manager import InfuraKeyManager, KeyHealth, TrackedHTTPProvider, RATE_LIMIT_CODES
+
+HEDGE_PERCENTILE = 0.95  # A request slower than this percentile of its endpoint gets a hedge
+UNSAFE_METHODS = {'eth_sendRawTransaction', 'eth_sendTransaction'}  # Never sent twice
+
+@dataclass
+class Endpoint:
+    """One RPC endpoint the router can send requests to"""
+    name: str
+    provider: TrackedHTTPProvider
+    health: KeyHealth
+
+class RpcRouter:
+    def __init__(self, key_manager: InfuraKeyManager, rpc_urls: Optional[List[str]] = None, hedge: bool = True, cooldown: float = 30):
+        """
+        Route JSON-RPC requests over several endpoints by observed latency
+
+        Endpoints are the Infura keys of the key manager (sharing its health and
+        cooldowns) plus any other RPC URLs. Each request goes to the healthiest
+        endpoint; if it has not answered within that endpoint's p95 latency, the
+        same request is sent to the next best endpoint and the first good answer
+        wins (hedging). Errors and rate limits fail over to the next endpoint, each
+        endpoint being tried at most once per request.
+
+        Args:
+            key_manager: Infura key pool
+            rpc_urls: Other endpoints (e.g. node_rpc); Infura URLs of configured keys are skipped
+            hedge: Whether to hedge slow reads
+            cooldown: Seconds a non-Infura endpoint is skipped after a rate limit
+        """
+        self.key_manager = key_manager
+        self.hedge = hedge
+        self.cooldown = cooldown
+        self.logger = logging.getLogger('RpcRouter')
+
+        infura_urls = set(key_manager.get_all_rpc_urls())
+        self.extra_endpoints: List[Endpoint] = []
+        for index, url in enumerate(dict.fromkeys(rpc_urls or [])):
+            if not url or url in infura_urls:
+                continue
+            health = KeyHealth(url)
+            self.extra_endpoints.append(Endpoint(f"rpc {index}", TrackedHTTPProvider(url, self, health, f"rpc:{index}"), health))
+        self.web3 = AsyncWeb3(RoutedProvider(self))
+
+        # Stats
+        self.total_requests = 0
+        self.total_hedged = 0
+        self.total_hedge_wins = 0
+        self.total_failovers = 0
+
+    @property
+    def endpoints(self) -> List[Endpoint]:
+        """Every endpoint, Infura keys first"""
+        infura = [
+            Endpoint(f"infura {index}", self.key_manager.get_web3(key).provider, self.key_manager.health[key])
+            for index, key in enumerate(self.key_manager.infura_keys)
+        ]
+        return infura + self.extra_endpoints
+
+    def get_all_rpc_urls(self) -> List[str]:
+        """URL of every endpoint"""
+        return self.key_manager.get_all_rpc_urls() + [endpoint.provider.endpoint_uri for endpoint in self.extra_endpoints]
+
+    def mark_rate_limited(self, health: KeyHealth) -> None:
+        """Cooldown for non-Infura endpoints (called by their providers)"""
+        cooldown = health.record_rate_limit(self.cooldown)
+        self.logger.info("RPC endpoint rate limited, cooling down for %ds", cooldown)
+
+    def rank(self, exclude: Set[str]) -> List[Endpoint]:
+        """Endpoints not yet tried for this request and not cooling down, healthiest first"""
+        self.key_manager.reset_quota_window()
+        endpoints = self.endpoints
+        now = time.monotonic()
+        mean_window_requests = sum(endpoint.health.window_requests for endpoint in endpoints) / max(len(endpoints), 1)
+        available = [
+            endpoint for endpoint in endpoints
+            if endpoint.name not in exclude and not endpoint.health.cooling_down(now)
+        ]
+        return sorted(available, key=lambda endpoint: endpoint.health.score(mean_window_requests))
+
+    async def wait_for_endpoint(self):
+        """Sleep (without blocking the loop) until the first endpoint leaves its cooldown"""
+        endpoints = self.endpoints
+        if not endpoints:
+            raise RuntimeError("No RPC endpoints configured")
+        wait = min(endpoint.health.cooldown_until for endpoint in endpoints) - time.monotonic()
+        if wait > 0:
+            self.logger.warning("All RPC endpoints are rate limited, waiting %.0fs", wait)
+            await asyncio.sleep(wait)
+
+    @staticmethod
+    def is_rate_limited(response: Any) -> bool:
+        error = response.get('error') if isinstance(response, dict) else None
+        return isinstance(error, dict) and error.get('code') in RATE_LIMIT_CODES
+
+    async def first_success(self, tasks: Set[asyncio.Task]) -> asyncio.Task:
+        """Return the first task whose response is neither an exception nor a rate limit, cancelling the rest"""
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                    elif self.is_rate_limited(task.result()):
+                        error = RuntimeError(f"429 rate limited: {task.result()['error']}")
+                    else:
+                        return task
+        finally:
+            for task in pending:
+                task.cancel()
+        raise error
+
+    async def make_request(self, method: str, params: Any) -> Any:
+        """Send one JSON-RPC request with latency routing, hedging and failover"""
+        self.total_requests += 1
+        tried: Set[str] = set()
+        error: Optional[BaseException] = None
+
+        ranked = self.rank(tried)
+        if not ranked:
+            await self.wait_for_endpoint()
+            ranked = self.rank(tried)
+
+        while ranked:
+            primary = ranked[0]
+            tried.add(primary.name)
+            primary_task = asyncio.create_task(primary.provider.make_request(method, params))
+            tasks = {primary_task}
+
+            hedge_after = primary.health.percentile(HEDGE_PERCENTILE)
+            if self.hedge and hedge_after is not None and len(ranked) > 1 and method not in UNSAFE_METHODS:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done:
+                    secondary = ranked[1]
+                    tried.add(secondary.name)
+                    tasks.add(asyncio.create_task(secondary.provider.make_request(method, params)))
+                    self.total_hedged += 1
+
+            try:
+                winner = await self.first_success(tasks)
+                if winner is not primary_task:
+                    self.total_hedge_wins += 1
+                return winner.result()
+            except Exception as e:
+                error = e
+                self.total_failovers += 1
+                ranked = self.rank(tried)
+
+        raise error if error is not None else RuntimeError("No RPC endpoint available")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get a snapshot of routing metrics"""
+        return {
+            "endpoints": len(self.endpoints),
+            "requests": self.total_requests,
+            "hedged": self.total_hedged,
+            "hedge_wins": self.total_hedge_wins,
+            "failovers": self.total_failovers
+        }
+
+class RoutedProvider(AsyncJSONBaseProvider):
+    """web3 provider that hands every request to an RpcRouter"""
+
+    def __init__(self, router: RpcRouter):
+        super().__init__()
+        self.router = router
+
+    async def make_request(self, method, params):
+        return await self.router.make_request(method, params)
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        return bool(self.router.endpoints)
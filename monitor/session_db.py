@@ -0,0 +1,352 @@
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+from terminal_display import log_message
+
+# Applied to every connection
+CONNECTION_PRAGMAS = (
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -20000",       # ~20MB page cache
+    "PRAGMA mmap_size = 268435456",     # 256MB memory-mapped reads
+)
+
+# Applied once on the writer connection
+WRITER_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",      # Durable at checkpoint, no fsync per commit in WAL mode
+)
+
+class SessionDatabase:
+    def __init__(self, db_path: str, cached_statements: int = 256):
+        """
+        Long-lived connections to a session's scan_records.db
+
+        All writes run on a single dedicated writer thread, one transaction per
+        job, so the event loop never blocks on sqlite and concurrent token
+        workers can't interleave a read-modify-write. Reads use one connection
+        per thread. Statements are cached per connection, so SQL text should be
+        constant (parameters, not string formatting) to reuse prepared statements.
+
+        Args:
+            db_path: Path to the sqlite database file
+            cached_statements: Prepared statement cache size per connection
+        """
+        self.db_path = db_path
+        self.cached_statements = cached_statements
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        self.local = threading.local()
+        self.read_connections: List[sqlite3.Connection] = []
+        self.read_lock = threading.Lock()
+
+        self.jobs: queue.Queue = queue.Queue()
+        self.closed = False
+        self.writer_ready = threading.Event()
+        self.writer = threading.Thread(target=self.writer_loop, name=f"sqlite-writer:{os.path.basename(db_path)}", daemon=True)
+        self.writer.start()
+        self.writer_ready.wait()
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a tuned connection in autocommit mode (transactions are explicit)"""
+        conn = sqlite3.connect(
+            self.db_path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    # ----------------------------------------------------------------------
+    # Writes
+    # ----------------------------------------------------------------------
+    def writer_loop(self):
+        """Run queued write jobs, each inside its own transaction"""
+        conn = self.connect()
+        for pragma in WRITER_PRAGMAS:
+            conn.execute(pragma)
+        self.writer_ready.set()
+
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            fn, args, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                result = fn(conn, *args)
+                conn.execute("COMMIT")
+                future.set_result(result)
+            except BaseException as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                future.set_exception(e)
+
+        conn.close()
+
+    def submit_write(self, fn: Callable[..., Any], *args) -> Future:
+        """
+        Queue fn(conn, *args) on the writer thread
+
+        Job functions must not call commit()/rollback(); the writer commits
+        after fn returns and rolls back if it raises.
+        """
+        if self.closed:
+            raise RuntimeError(f"Database {self.db_path} is closed")
+        future: Future = Future()
+        self.jobs.put((fn, args, future))
+        return future
+
+    async def write(self, fn: Callable[..., Any], *args) -> Any:
+        """Run a write job and await its result from the event loop"""
+        return await asyncio.wrap_future(self.submit_write(fn, *args))
+
+    def write_sync(self, fn: Callable[..., Any], *args) -> Any:
+        """Run a write job and block until it has committed"""
+        return self.submit_write(fn, *args).result()
+
+    # ----------------------------------------------------------------------
+    # Reads
+    # ----------------------------------------------------------------------
+    def reader(self) -> sqlite3.Connection:
+        """Get this thread's read connection, opening it on first use"""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.connect()
+            conn.execute("PRAGMA query_only = ON")
+            self.local.conn = conn
+            with self.read_lock:
+                self.read_connections.append(conn)
+        return conn
+
+    def read_sync(self, fn: Callable[..., Any], *args) -> Any:
+        """Run fn(conn, *args) on this thread's read connection"""
+        return fn(self.reader(), *args)
+
+    async def read(self, fn: Callable[..., Any], *args) -> Any:
+        """Run a read job on a worker thread and await the result"""
+        return await asyncio.to_thread(self.read_sync, fn, *args)
+
+    def fetchone_sync(self, sql: str, params: tuple = ()) -> Optional[tuple]:
+        """Convenience single-row read"""
+        return self.reader().execute(sql, params).fetchone()
+
+    def fetchall_sync(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """Convenience multi-row read"""
+        return self.reader().execute(sql, params).fetchall()
+
+    async def fetchone(self, sql: str, params: tuple = ()) -> Optional[tuple]:
+        """Single-row read off the event loop"""
+        return await asyncio.to_thread(self.fetchone_sync, sql, params)
+
+    async def fetchall(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """Multi-row read off the event loop"""
+        return await asyncio.to_thread(self.fetchall_sync, sql, params)
+
+    # ----------------------------------------------------------------------
+    # Lifecycle
+    # ----------------------------------------------------------------------
+    def close(self):
+        """Finish queued writes, stop the writer and close every connection"""
+        if self.closed:
+            return
+        self.closed = True
+        self.jobs.put(None)
+        self.writer.join()
+        with self.read_lock:
+            for conn in self.read_connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self.read_connections = []
+
+
+class WriteBehindBuffer:
+    def __init__(self, db: SessionDatabase, batch_size: int = 100, flush_interval: float = 1.0, max_pending: int = 1000):
+        """
+        Write-behind buffer that groups write jobs into one transaction
+
+        Jobs are queued from the event loop and run together on the writer
+        thread once batch_size jobs are pending or flush_interval seconds have
+        passed, so a rescan of many tokens pays for one commit per batch instead
+        of one per token. Each job runs inside its own SAVEPOINT: a failing job
+        is rolled back on its own and doesn't take the rest of the batch with it.
+        Jobs run in the order they were queued, so a job sees the writes of
+        every job queued before it. When max_pending jobs are waiting, put()
+        blocks until a flush makes room (back-pressure).
+
+        Args:
+            db: Database the batches are written to
+            batch_size: Pending jobs that trigger an immediate flush
+            flush_interval: Maximum seconds a job waits before being written
+            max_pending: Maximum queued jobs before callers are made to wait
+        """
+        self.db = db
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = flush_interval
+        self.max_pending = max(self.batch_size, int(max_pending))
+
+        self.pending: List[tuple] = []
+        self.space = None
+        self.flush_event = None
+        self.flush_task = None
+        self.flush_lock = None
+
+        # Stats
+        self.total_jobs = 0
+        self.total_batches = 0
+        self.failed_jobs = 0
+        self.largest_batch = 0
+        self.backpressure_waits = 0
+        self.total_flush_time = 0.0
+
+    def ensure_flusher(self):
+        """Create loop-bound primitives and start the flush task on first use"""
+        if self.space is None:
+            self.space = asyncio.Semaphore(self.max_pending)
+            self.flush_lock = asyncio.Lock()
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_event = asyncio.Event()
+            self.flush_task = asyncio.create_task(self.flush_loop())
+
+    async def put(self, fn: Callable[..., Any], *args) -> asyncio.Future:
+        """
+        Queue fn(conn, *args) for the next batch
+
+        Like SessionDatabase.write(), job functions must not commit.
+
+        Returns:
+            Future resolved with the job result once its batch has committed.
+            Awaiting it is optional; failures are logged either way.
+        """
+        self.ensure_flusher()
+        if self.space.locked():
+            self.backpressure_waits += 1
+            self.flush_event.set()
+        await self.space.acquire()
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((fn, args, future))
+        if len(self.pending) >= self.batch_size:
+            self.flush_event.set()
+        return future
+
+    @staticmethod
+    def run_batch(conn: sqlite3.Connection, batch: List[tuple]) -> List[tuple]:
+        """Run every job of a batch inside the writer's transaction"""
+        outcomes = []
+        for fn, args, _ in batch:
+            conn.execute("SAVEPOINT job")
+            try:
+                outcomes.append((fn(conn, *args), None))
+                conn.execute("RELEASE job")
+            except Exception as e:
+                conn.execute("ROLLBACK TO job")
+                conn.execute("RELEASE job")
+                outcomes.append((None, e))
+        return outcomes
+
+    async def flush_loop(self):
+        """Flush on an interval or as soon as a batch fills up"""
+        while True:
+            try:
+                await asyncio.wait_for(self.flush_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.flush_event.clear()
+            try:
+                # Shielded so close() can't strand a batch that is already on the writer
+                await asyncio.shield(self.flush())
+            except Exception as e:
+                log_message(f"Write-behind flush failed: {str(e)}", "ERROR")
+
+    async def flush(self):
+        """Write every pending job now, in batch_size transactions"""
+        if self.flush_lock is None:
+            return
+        async with self.flush_lock:
+            while self.pending:
+                batch = self.pending[:self.batch_size]
+                del self.pending[:self.batch_size]
+                started = time.monotonic()
+                try:
+                    outcomes = await self.db.write(self.run_batch, batch)
+                except Exception as e:
+                    # Commit itself failed, nothing in the batch was written
+                    outcomes = [(None, e)] * len(batch)
+                finally:
+                    for _ in batch:
+                        self.space.release()
+                self.total_flush_time += time.monotonic() - started
+                self.total_batches += 1
+                self.total_jobs += len(batch)
+                self.largest_batch = max(self.largest_batch, len(batch))
+
+                for (_, _, future), (result, error) in zip(batch, outcomes):
+                    if future.done():
+                        continue
+                    if error is None:
+                        future.set_result(result)
+                    else:
+                        self.failed_jobs += 1
+                        log_message(f"Buffered write failed: {str(error)}", "ERROR")
+                        future.set_exception(error)
+                        # Mark retrieved so un-awaited futures don't warn on garbage collection
+                        future.exception()
+
+    async def close(self):
+        """Stop the background flusher and write anything still pending"""
+        if self.flush_task and not self.flush_task.done():
+            self.flush_task.cancel()
+            try:
+                await self.flush_task
+            except asyncio.CancelledError:
+                pass
+        self.flush_task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get a snapshot of batching metrics"""
+        return {
+            "pending": len(self.pending),
+            "jobs": self.total_jobs,
+            "batches": self.total_batches,
+            "failed": self.failed_jobs,
+            "largest_batch": self.largest_batch,
+            "avg_batch": (self.total_jobs / self.total_batches) if self.total_batches else 0.0,
+            "backpressure_waits": self.backpressure_waits,
+            "flush_time": self.total_flush_time
+        }
+
+
+# Shared instances, one per database file
+_databases: Dict[str, SessionDatabase] = {}
+_databases_lock = threading.Lock()
+
+def get_session_db(folder_name: str, filename: str = 'scan_records.db') -> SessionDatabase:
+    """Get (or open) the shared SessionDatabase for a session folder"""
+    db_path = os.path.abspath(os.path.join(folder_name, filename))
+    with _databases_lock:
+        db = _databases.get(db_path)
+        if db is None or db.closed:
+            db = SessionDatabase(db_path)
+            _databases[db_path] = db
+            log_message(f"Opened session database {db_path} (WAL)", "DEBUG")
+        return db
+
+def close_all_databases():
+    """Close every shared SessionDatabase"""
+    with _databases_lock:
+        for db in _databases.values():
+            db.close()
+        _databases.clear()
@@ -0,0 +1,149 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+from web3 import AsyncWeb3
+from event_logs import SYNC_TOPIC, decode_sync, get_logs
+from terminal_display import log_message
+
+class SyncTracker:
+    def __init__(self, tracker, checker, poll_interval: float = 12.0, address_chunk: int = 500, pair_refresh_interval: float = 60.0):
+        """
+        Track liquidity of active pairs from their Sync events
+
+        Every poll fetches the Sync logs emitted since the last poll for all active
+        pairs with one eth_getLogs call (per address_chunk pairs), updates an
+        in-memory reserve table and records one liquidity sample per pair that
+        changed. No per-token API calls are made.
+
+        Args:
+            tracker: TokenTracker (web3 instance, WETH address, batched reserve reads)
+            checker: TokenChecker (session database, write-behind buffer)
+            poll_interval: Seconds between polls (~1 block)
+            address_chunk: Maximum pair addresses per eth_getLogs call
+            pair_refresh_interval: Seconds between reloads of the active pair list
+        """
+        self.tracker = tracker
+        self.checker = checker
+        self.poll_interval = poll_interval
+        self.address_chunk = max(1, int(address_chunk))
+        self.pair_refresh_interval = pair_refresh_interval
+
+        self.pairs: Dict[str, Tuple[str, int, float]] = {}  # pair (lowercase) -> (token_address, total_scans, hp_liquidity)
+        self.reserves: Dict[str, Tuple[int, int, int]] = {}  # pair (lowercase) -> (reserve0, reserve1, block)
+        self.reference: Dict[str, Tuple[int, int]] = {}  # pair (lowercase) -> (total_scans, WETH reserve hp_liquidity is scaled from)
+        self.last_block: Optional[int] = None
+        self.last_pair_refresh = 0.0
+
+        # Stats
+        self.total_polls = 0
+        self.total_logs = 0
+        self.total_samples = 0
+
+    def weth_reserve(self, token_address: str, reserve0: int, reserve1: int) -> int:
+        """Pick the WETH side of a pair's reserves (pair tokens are sorted by address)"""
+        return reserve0 if self.tracker.weth_address.lower() < token_address.lower() else reserve1
+
+    async def refresh_pairs(self):
+        """Reload active pairs and seed reserves for pairs not seen yet"""
+        rows = await self.checker.db.fetchall('''
+            SELECT token_address, pair_address, total_scans, hp_liquidity_amount
+            FROM scan_records
+            WHERE status = 'active' AND pair_address IS NOT NULL AND pair_address != ''
+        ''')
+        self.pairs = {
+            pair_address.lower(): (token_address, total_scans, float(hp_liquidity or 0))
+            for token_address, pair_address, total_scans, hp_liquidity in rows
+        }
+        self.reserves = {pair: value for pair, value in self.reserves.items() if pair in self.pairs}
+        self.reference = {pair: value for pair, value in self.reference.items() if pair in self.pairs}
+        self.last_pair_refresh = time.monotonic()
+
+        # New pairs get their current reserves from one batched read
+        new_pairs = [pair for pair in self.pairs if pair not in self.reserves]
+        if new_pairs:
+            current = await self.tracker.get_reserves_many(new_pairs)
+            for pair_address, value in current.items():
+                if value is None:
+                    continue
+                self.reserves[pair_address.lower()] = (value[0], value[1], self.last_block or 0)
+
+        # Take new reference reserves whenever a full scan replaced hp_liquidity (or the pair is new).
+        # The checker's reserve_baseline is left to full scans, which select_full_rescans relies on
+        for pair, (token_address, total_scans, _) in self.pairs.items():
+            reference = self.reference.get(pair)
+            if pair in self.reserves and (reference is None or reference[0] != total_scans):
+                reserve0, reserve1, _ = self.reserves[pair]
+                self.reference[pair] = (total_scans, self.weth_reserve(token_address, reserve0, reserve1))
+
+    async def poll(self) -> int:
+        """
+        Apply Sync logs since the last poll
+
+        Returns:
+            Number of liquidity samples recorded
+        """
+        web3 = self.tracker.web3
+        head = await web3.eth.block_number
+        if self.last_block is None:
+            self.last_block = head
+            return 0
+        if head <= self.last_block or not self.pairs:
+            self.last_block = max(self.last_block, head)
+            return 0
+
+        addresses = [AsyncWeb3.to_checksum_address(pair) for pair in self.pairs]
+        logs: List = []
+        for start in range(0, len(addresses), self.address_chunk):
+            logs.extend(await get_logs(web3, self.last_block + 1, head, addresses[start:start + self.address_chunk], [SYNC_TOPIC]))
+        self.last_block = head
+        self.total_polls += 1
+        self.total_logs += len(logs)
+
+        # Later logs overwrite earlier ones, leaving the latest reserves per pair
+        changed = set()
+        for log in sorted(logs, key=lambda log: (log['blockNumber'], log['logIndex'])):
+            pair = log['address'].lower()
+            if pair not in self.pairs:
+                continue
+            reserve0, reserve1 = decode_sync(log)
+            self.reserves[pair] = (reserve0, reserve1, log['blockNumber'])
+            changed.add(pair)
+
+        samples = []
+        now = int(time.time())
+        for pair in changed:
+            token_address, total_scans, hp_liquidity = self.pairs[pair]
+            reserve0, reserve1, _ = self.reserves[pair]
+            weth_reserve = self.weth_reserve(token_address, reserve0, reserve1)
+            baseline = self.reference.setdefault(pair, (total_scans, weth_reserve))[1]
+            liquidity = hp_liquidity * weth_reserve / baseline if baseline else hp_liquidity
+            samples.append((token_address, now, total_scans, liquidity, str(reserve0), str(reserve1)))
+
+        if samples:
+            await self.checker.write_behind.put(self.checker.record_light_samples, samples)
+            self.total_samples += len(samples)
+        return len(samples)
+
+    async def run(self):
+        """Poll until cancelled"""
+        log_message(f"Sync tracking started (poll every {self.poll_interval:.0f}s)", "INFO")
+        while True:
+            try:
+                if time.monotonic() - self.last_pair_refresh >= self.pair_refresh_interval:
+                    await self.refresh_pairs()
+                await self.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log_message(f"Sync tracking poll failed: {str(e)}", "WARNING")
+            await asyncio.sleep(self.poll_interval)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get a snapshot of tracking metrics"""
+        return {
+            "pairs": len(self.pairs),
+            "polls": self.total_polls,
+            "logs": self.total_logs,
+            "samples": self.total_samples,
+            "last_block": self.last_block or 0
+        }
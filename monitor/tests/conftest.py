@@ -0,0 +1,72 @@
+import os
+import sys
+import pytest
+
+# The monitor modules import each other by bare name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from key_manager import InfuraKeyManager
+from rate_limiter import rate_scheduler
+from session_db import SessionDatabase
+
+@pytest.fixture(autouse=True)
+def unlimited_rates():
+    """Lift the upstream rate limits so stubbed RPC/API calls never wait"""
+    rate_scheduler.configure({name: {"requests_per_minute": 1e9, "burst": 1e9} for name in ("goplus", "honeypot", "infura", "rpc")})
+    yield
+    rate_scheduler.configure()
+
+@pytest.fixture
+def session_db(tmp_path):
+    """A SessionDatabase on a temporary file"""
+    db = SessionDatabase(str(tmp_path / "scan_records.db"))
+    yield db
+    db.close()
+
+@pytest.fixture
+def key_manager(monkeypatch):
+    """A fresh InfuraKeyManager (the class is a singleton) with two keys"""
+    monkeypatch.setattr(InfuraKeyManager, "_instance", None)
+    manager = InfuraKeyManager()
+    manager.initialize(infura_keys=["a" * 32, "b" * 32], key_rotation_interval=3600, key_swap_sleep_time=10)
+    return manager
+
+class StubEth:
+    """The parts of web3.eth the monitor uses, served from plain dicts"""
+
+    def __init__(self, head: int = 0, blocks=None, logs=None):
+        self.head = head
+        self.blocks = blocks or {}  # number -> {'hash': ..., 'timestamp': ...}
+        self.logs = logs or []      # raw log dicts
+        self.get_logs_calls = []
+        self.get_logs_params = []
+        self.get_block_calls = 0
+        self.get_logs_error = None
+
+    @property
+    async def block_number(self):
+        return self.head
+
+    async def get_block(self, number):
+        self.get_block_calls += 1
+        return self.blocks.get(number)
+
+    async def get_logs(self, params):
+        self.get_logs_calls.append((params['fromBlock'], params['toBlock']))
+        self.get_logs_params.append(params)
+        if self.get_logs_error is not None:
+            raise self.get_logs_error
+        addresses = params['address'] if isinstance(params['address'], list) else [params['address']]
+        addresses = {address.lower() for address in addresses}
+        return [
+            log for log in self.logs
+            if params['fromBlock'] <= log['blockNumber'] <= params['toBlock'] and log['address'].lower() in addresses
+        ]
+
+class StubWeb3:
+    def __init__(self, **kwargs):
+        self.eth = StubEth(**kwargs)
+
+@pytest.fixture
+def stub_web3():
+    return StubWeb3
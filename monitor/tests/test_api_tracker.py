@@ -0,0 +1,18 @@
+import json
+from api_tracker import read_api_log
+
+CALLS = [
+    {"call_id": 1, "endpoint": "goplus", "response_code": 200, "response_body": "{}"},
+    {"call_id": 2, "endpoint": "honeypot", "response_code": 404, "response_body": ""}
+]
+
+def test_reads_json_array_logs(tmp_path):
+    path = tmp_path / "api_calls_20240101_000000.json"
+    path.write_text(json.dumps(CALLS), encoding="utf-8")
+    assert read_api_log(str(path)) == CALLS
+
+def test_reads_json_lines_and_skips_truncated_tail(tmp_path):
+    path = tmp_path / "api_calls_20240101_000000.jsonl"
+    lines = [json.dumps(call) for call in CALLS]
+    path.write_text(lines[0] + "\n\n" + lines[1] + "\n" + lines[1][:20], encoding="utf-8")
+    assert read_api_log(str(path)) == CALLS
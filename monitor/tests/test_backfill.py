@@ -0,0 +1,81 @@
+import asyncio
+import backfill
+from backfill import LogBackfill
+
+def make_backfill(session_db, stub_web3, **kwargs):
+    web3 = stub_web3()
+    fill = LogBackfill(lambda: web3, session_db, "0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f", **kwargs)
+    fill.web3 = web3
+    return fill
+
+async def no_events(events):
+    pass
+
+def test_missing_ranges_skip_completed_chunks(session_db, stub_web3):
+    fill = make_backfill(session_db, stub_web3)
+    session_db.write_sync(fill.record_chunk, 100, 199, 0)
+    session_db.write_sync(fill.record_chunk, 150, 249, 0)  # Overlapping chunk
+    session_db.write_sync(fill.record_chunk, 400, 499, 0)
+
+    assert fill.missing_ranges(0, 1000) == [(0, 99), (250, 399), (500, 1000)]
+    assert fill.missing_ranges(120, 240) == []
+    assert fill.missing_ranges(450, 600) == [(500, 600)]
+
+def test_completed_run_is_checkpointed(session_db, stub_web3):
+    fill = make_backfill(session_db, stub_web3, concurrency=2, initial_chunk=50)
+    asyncio.run(fill.run(0, 299, no_events))
+
+    assert fill.failed_ranges == []
+    assert fill.missing_ranges(0, 299) == []
+    assert make_backfill(session_db, stub_web3).missing_ranges(0, 399) == [(300, 399)]
+
+def test_range_too_large_at_min_chunk_gives_up(session_db, stub_web3, monkeypatch):
+    sleeps = []
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+    monkeypatch.setattr(backfill.asyncio, "sleep", fake_sleep)
+
+    fill = make_backfill(session_db, stub_web3, concurrency=1, initial_chunk=40, min_chunk=10)
+    fill.web3.eth.get_logs_error = ValueError("query returned more than 10000 results")
+    asyncio.run(asyncio.wait_for(fill.run(0, 39, no_events), timeout=5))
+
+    # 40 -> 20 -> 10 blocks, then every 10-block range is given up instead of re-queued forever,
+    # and given up again at once in the end-of-run pass
+    assert fill.chunk == 10
+    assert sorted(fill.failed_ranges) == [(0, 9), (10, 19), (20, 29), (30, 39)]
+    assert fill.total_requests == 6 + 4
+    assert sleeps  # Shrinking retries back off too
+    assert fill.missing_ranges(0, 39) == [(0, 39)]  # Nothing checkpointed, fetched again on the next backfill
+
+def test_other_errors_stop_after_max_attempts(session_db, stub_web3, monkeypatch):
+    async def fake_sleep(seconds):
+        pass
+    monkeypatch.setattr(backfill.asyncio, "sleep", fake_sleep)
+
+    fill = make_backfill(session_db, stub_web3, concurrency=1, initial_chunk=100, max_attempts=3)
+    fill.web3.eth.get_logs_error = ConnectionError("connection reset")
+    asyncio.run(asyncio.wait_for(fill.run(0, 99, no_events), timeout=5))
+
+    assert fill.failed_ranges == [(0, 99)]
+    assert fill.total_requests == 3 + 3  # Main run, then the end-of-run pass
+
+def test_failed_range_is_retried_at_end_of_run(session_db, stub_web3, monkeypatch):
+    async def fake_sleep(seconds):
+        pass
+    monkeypatch.setattr(backfill.asyncio, "sleep", fake_sleep)
+
+    fill = make_backfill(session_db, stub_web3, concurrency=1, initial_chunk=100, max_attempts=2)
+    eth = fill.web3.eth
+    eth.get_logs_error = ConnectionError("connection reset")
+    fetch = eth.get_logs
+    async def flaky_get_logs(params):
+        # The outage ends after the main run has given up on the range
+        if len(eth.get_logs_calls) == 4:
+            eth.get_logs_error = None
+        return await fetch(params)
+    eth.get_logs = flaky_get_logs
+    asyncio.run(asyncio.wait_for(fill.run(0, 199, no_events), timeout=5))
+
+    assert len(eth.get_logs_calls) == 4 + 2
+    assert fill.failed_ranges == []
+    assert fill.missing_ranges(0, 199) == []
@@ -0,0 +1,56 @@
+import asyncio
+import random
+from block_time import BlockTimeResolver
+
+def synthetic_chain(length: int, seed: int = 7):
+    """Blocks with irregular gaps (missed slots, bursts), strictly increasing timestamps"""
+    rng = random.Random(seed)
+    blocks, timestamp = {}, 1_600_000_000
+    for number in range(length):
+        blocks[number] = {'timestamp': timestamp, 'hash': bytes(32)}
+        timestamp += rng.choice([1, 2, 12, 12, 12, 24, 36, 300])
+    return blocks
+
+def expected_block(blocks, timestamp: int, head: int) -> int:
+    for number in range(head + 1):
+        if blocks[number]['timestamp'] >= timestamp:
+            return number
+    return head
+
+def test_block_at_or_after_matches_linear_scan(session_db, stub_web3):
+    blocks = synthetic_chain(5000)
+    web3 = stub_web3(head=4999, blocks=blocks)
+    resolver = BlockTimeResolver(lambda: web3, session_db)
+    rng = random.Random(11)
+    first, last = blocks[0]['timestamp'], blocks[4999]['timestamp']
+
+    async def check():
+        for _ in range(300):
+            timestamp = rng.randint(first - 100, last + 100)
+            assert await resolver.block_at_or_after(timestamp, 4999) == expected_block(blocks, timestamp, 4999)
+    asyncio.run(check())
+
+def test_exact_timestamps_and_edges(session_db, stub_web3):
+    blocks = synthetic_chain(200)
+    web3 = stub_web3(head=199, blocks=blocks)
+    resolver = BlockTimeResolver(lambda: web3, session_db)
+
+    async def check():
+        assert await resolver.block_at_or_after(blocks[0]['timestamp'] - 1) == 0
+        assert await resolver.block_at_or_after(blocks[199]['timestamp'] + 1) == 199
+        for number in (1, 57, 198):
+            assert await resolver.block_at_or_after(blocks[number]['timestamp']) == number
+            assert await resolver.block_at_or_after(blocks[number]['timestamp'] + 1) == number + 1
+    asyncio.run(check())
+
+def test_index_is_persisted_and_reused(session_db, stub_web3):
+    blocks = synthetic_chain(3000)
+    web3 = stub_web3(head=2999, blocks=blocks)
+    target = blocks[1234]['timestamp']
+    assert asyncio.run(BlockTimeResolver(lambda: web3, session_db).block_at_or_after(target, 2999)) == 1234
+    fetched = web3.eth.get_block_calls
+
+    # A restarted resolver loads the index and answers from it without new header reads
+    restarted = BlockTimeResolver(lambda: web3, session_db)
+    assert asyncio.run(restarted.block_at_or_after(target, 2999)) == 1234
+    assert web3.eth.get_block_calls == fetched
@@ -0,0 +1,94 @@
+import glob
+import importlib.util
+import json
+import os
+import sys
+import pytest
+import fast_json
+from api_tracker import read_api_log
+from api_wrapper import make_decoders
+from fast_json import ResponseDecoder
+from normalizer import normalize_goplus, normalize_honeypot
+
+API_LOGS = os.path.join(os.path.dirname(__file__), '..', 'api_logs')
+BODY = {"code": 1, "message": "OK", "text": "héllo", "list": [1.5, None, True], "nested": {"supply": "1000000000000000000000"}}
+
+def load_fast_json(monkeypatch, *blocked):
+    """A separate copy of fast_json imported as if the blocked backends weren't installed"""
+    for name in blocked:
+        monkeypatch.setitem(sys.modules, name, None)
+    spec = importlib.util.spec_from_file_location(f"fast_json_without_{'_'.join(blocked)}", fast_json.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.mark.parametrize("blocked, backend", [
+    ((), "msgspec"),
+    (("msgspec",), "orjson"),
+    (("msgspec", "orjson"), "json"),
+])
+def test_backend_fallback_chain(monkeypatch, blocked, backend):
+    if backend == "msgspec" and fast_json.msgspec is None or backend == "orjson" and fast_json.orjson is None:
+        pytest.skip(f"{backend} not installed")
+    module = load_fast_json(monkeypatch, *blocked)
+    assert module.BACKEND == backend
+
+    encoded = json.dumps(BODY)
+    assert module.loads(encoded) == BODY
+    assert module.loads(encoded.encode()) == BODY
+    assert json.loads(module.dumps(BODY)) == BODY
+    assert json.loads(module.dumps({"supply": 2 ** 70})) == {"supply": 2 ** 70}  # Beyond 64 bits
+    # orjson decodes integers beyond 64 bits as floats (the APIs send those as strings)
+    big = module.loads(b'{"supply": 1180591620717411303424}')["supply"]
+    assert big == 2 ** 70 and isinstance(big, float if backend == "orjson" else int)
+    with pytest.raises(module.DecodeError):
+        module.loads(b'{"code": ')
+
+def test_untyped_decoder_without_msgspec(monkeypatch):
+    module = load_fast_json(monkeypatch, "msgspec")
+    decoder = module.ResponseDecoder("Response", ("code",))
+    assert decoder.typed is None
+    assert decoder.decode(json.dumps(BODY)) == BODY
+
+@pytest.mark.skipif(fast_json.msgspec is None, reason="typed decoding needs msgspec")
+class TestTypedDecoder:
+    decoder = ResponseDecoder("GoPlusShape", ("code", "result"), map_key="result", map_keys=("is_proxy", "holders"))
+
+    def test_unused_fields_are_skipped(self):
+        body = {
+            "code": 1, "message": "OK",
+            "result": {"0xabc": {"is_proxy": "0", "holders": [{"address": "0x1"}], "lp_holders": [1, 2, 3]}}
+        }
+        assert self.decoder.decode(json.dumps(body).encode()) == {
+            "code": 1, "result": {"0xabc": {"is_proxy": "0", "holders": [{"address": "0x1"}]}}
+        }
+
+    def test_absent_fields_stay_absent(self):
+        assert self.decoder.decode(b'{"result": {"0xabc": {}}}') == {"result": {"0xabc": {}}}
+
+    def test_unexpected_shape_is_decoded_in_full(self):
+        for body in ({"code": 1, "result": None}, {"code": 1, "result": {"0xabc": "not an object"}}, [1, 2]):
+            assert self.decoder.decode(json.dumps(body)) == body
+
+def captured_bodies():
+    for path in sorted(glob.glob(os.path.join(API_LOGS, 'api_calls_*.json*'))):
+        for call in read_api_log(path):
+            if call.get('endpoint') in ('goplus', 'honeypot') and call.get('response_code') == 200 and call.get('response_body'):
+                yield call['endpoint'], (call.get('params') or {}), call['response_body']
+
+def test_typed_decoding_keeps_everything_the_normalizer_reads():
+    decoders = make_decoders(typed=True)
+    checked = 0
+    for endpoint, params, body in captured_bodies():
+        try:
+            full = json.loads(body)
+        except json.JSONDecodeError:
+            continue
+        decoded = decoders[endpoint].decode(body.encode())
+        if endpoint == 'honeypot':
+            assert normalize_honeypot(decoded) == normalize_honeypot(full)
+        else:
+            for address in str(params.get('contract_addresses', '')).split(','):
+                assert normalize_goplus(decoded, address) == normalize_goplus(full, address)
+        checked += 1
+    assert checked
@@ -0,0 +1,68 @@
+import asyncio
+from api_wrapper import GoPlusBatcher
+
+def goplus_response(addresses):
+    return {"code": 1, "message": "OK", "result": {address: {"token_name": address[-4:]} for address in addresses}}
+
+def test_concurrent_lookups_share_one_request():
+    requests = []
+    async def fetch_batch(addresses):
+        requests.append(addresses)
+        # The API only knows the first two tokens
+        return goplus_response(addresses[:2])
+
+    async def run():
+        batcher = GoPlusBatcher(fetch_batch, window=0.01, max_size=10)
+        return batcher, await asyncio.gather(*(batcher.fetch(address) for address in ("0xAAAA", "0xbbbb", "0xcccc", "0xaaaa")))
+    batcher, responses = asyncio.run(run())
+
+    assert requests == [["0xaaaa", "0xbbbb", "0xcccc"]]
+    assert responses[0] == {"code": 1, "message": "OK", "result": {"0xaaaa": {"token_name": "aaaa"}}}
+    assert responses[1]["result"] == {"0xbbbb": {"token_name": "bbbb"}}
+    assert responses[2] == {"code": 1, "message": "OK", "result": {}}  # Not indexed yet
+    assert responses[3] == responses[0]  # Same token, same batch
+    assert batcher.get_stats()["batches"] == 1
+
+def test_full_batch_is_sent_without_waiting_for_the_window():
+    requests = []
+    async def fetch_batch(addresses):
+        requests.append(addresses)
+        return goplus_response(addresses)
+
+    async def run():
+        batcher = GoPlusBatcher(fetch_batch, window=60, max_size=2)
+        return await asyncio.wait_for(asyncio.gather(batcher.fetch("0x01"), batcher.fetch("0x02")), timeout=1)
+    asyncio.run(run())
+    assert requests == [["0x01", "0x02"]]
+
+def test_failed_batch_resolves_every_caller_empty():
+    async def fetch_batch(addresses):
+        raise ConnectionError("reset")
+
+    async def run():
+        batcher = GoPlusBatcher(fetch_batch, window=0.01)
+        return await asyncio.gather(batcher.fetch("0x01"), batcher.fetch("0x02"))
+    assert asyncio.run(run()) == [{}, {}]
+
+def test_lookup_joins_a_batch_in_flight():
+    requests = []
+    release = None
+    async def fetch_batch(addresses):
+        requests.append(addresses)
+        await release.wait()
+        return goplus_response(addresses)
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        batcher = GoPlusBatcher(fetch_batch, window=0)
+        first = asyncio.create_task(batcher.fetch("0x01"))
+        while not requests:
+            await asyncio.sleep(0)
+        second = asyncio.create_task(batcher.fetch("0x01"))
+        await asyncio.sleep(0)
+        release.set()
+        return await first, await second
+    first, second = asyncio.run(run())
+    assert requests == [["0x01"]]
+    assert first == second
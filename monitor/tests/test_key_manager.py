@@ -0,0 +1,118 @@
+import asyncio
+import pytest
+import key_manager as key_manager_module
+from aiohttp import ClientResponseError
+from web3 import AsyncHTTPProvider
+from key_manager import MAX_COOLDOWN, KeyHealth
+
+KEY_A, KEY_B = "a" * 32, "b" * 32
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(key_manager_module.time, "monotonic", lambda: now[0])
+    return now
+
+def warm(health: KeyHealth, latency: float):
+    health.record_success(latency)
+
+def test_unmeasured_keys_are_tried_first(key_manager):
+    warm(key_manager.health[KEY_A], 0.01)
+    assert key_manager.select_key() == KEY_B
+
+def test_lowest_latency_wins_and_load_spreads(key_manager):
+    warm(key_manager.health[KEY_A], 0.05)
+    warm(key_manager.health[KEY_B], 0.20)
+    assert key_manager.select_key() == KEY_A
+
+    # Enough concurrent requests on the fast key make the slow one the better pick
+    key_manager.health[KEY_A].in_flight = 5
+    assert key_manager.select_key() == KEY_B
+
+def test_failures_and_quota_share_raise_the_score():
+    healthy, failing = KeyHealth(KEY_A), KeyHealth(KEY_B)
+    warm(healthy, 0.1)
+    warm(failing, 0.1)
+    failing.record_failure()
+    assert failing.score(0) > healthy.score(0)
+
+    busy = KeyHealth(KEY_B)
+    warm(busy, 0.1)
+    busy.window_requests = 100
+    assert busy.score(50) > healthy.score(50)
+
+def test_rate_limited_key_cools_down_and_is_skipped(key_manager, clock):
+    warm(key_manager.health[KEY_A], 0.01)
+    warm(key_manager.health[KEY_B], 0.50)
+    key_manager.mark_rate_limited(key_manager.health[KEY_A])
+
+    assert key_manager.health[KEY_A].cooldown_until == 1000.0 + 10
+    assert key_manager.select_key() == KEY_B
+    clock[0] += 10
+    assert key_manager.select_key() == KEY_A
+
+def test_cooldown_doubles_until_a_success(clock):
+    health = KeyHealth(KEY_A)
+    assert [health.record_rate_limit(10) for _ in range(3)] == [10, 20, 40]
+    health.record_success(0.1)
+    assert health.record_rate_limit(10) == 10
+    for _ in range(20):
+        cooldown = health.record_rate_limit(10)
+    assert cooldown == MAX_COOLDOWN
+
+def test_all_keys_cooling_down_returns_the_first_to_recover(key_manager, clock):
+    key_manager.health[KEY_A].cooldown_until = 1200.0
+    key_manager.health[KEY_B].cooldown_until = 1100.0
+    assert key_manager.select_key() == KEY_B
+
+def test_quota_window_resets_after_the_rotation_interval(key_manager):
+    key_manager.health[KEY_A].window_requests = 50
+    key_manager.reset_quota_window()
+    assert key_manager.health[KEY_A].window_requests == 50
+
+    key_manager.key_rotation_interval = 0
+    key_manager.last_key_rotation -= key_manager_module.timedelta(seconds=1)
+    key_manager.reset_quota_window()
+    assert key_manager.health[KEY_A].window_requests == 0
+
+def test_latency_percentile_needs_enough_samples():
+    health = KeyHealth(KEY_A)
+    for latency in range(19):
+        health.record_success(latency)
+    assert health.percentile(0.95) is None
+    health.record_success(19)
+    assert health.percentile(0.95) == 19 and health.percentile(0.5) == 10
+
+def test_reinitialize_keeps_health_of_remaining_keys(key_manager):
+    warm(key_manager.health[KEY_A], 0.05)
+    key_manager.initialize(infura_keys=[KEY_A, "c" * 32], key_rotation_interval=3600, key_swap_sleep_time=10)
+    assert key_manager.health[KEY_A].latency == 0.05
+    assert set(key_manager.health) == {KEY_A, "c" * 32}
+
+@pytest.mark.parametrize("outcome, rate_limited", [
+    (ClientResponseError(None, (), status=429), True),
+    (ClientResponseError(None, (), status=500), False),
+    ({'jsonrpc': '2.0', 'id': 1, 'error': {'code': -32005, 'message': 'limit exceeded'}}, True),
+    ({'jsonrpc': '2.0', 'id': 1, 'result': '0x1'}, False),
+])
+def test_provider_reports_outcomes_to_its_key(key_manager, monkeypatch, clock, outcome, rate_limited):
+    async def respond(self, method, params):
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    monkeypatch.setattr(AsyncHTTPProvider, "make_request", respond)
+
+    provider = key_manager.get_web3(KEY_A).provider
+    health = key_manager.health[KEY_A]
+    try:
+        asyncio.run(provider.make_request("eth_blockNumber", []))
+    except ClientResponseError:
+        pass
+
+    assert health.requests == 1 and health.in_flight == 0
+    assert health.cooling_down(clock[0]) is rate_limited
+    assert health.rate_limits == int(rate_limited)
+    if isinstance(outcome, dict) and not rate_limited:
+        assert health.latency is not None and health.errors == 0
+    elif not rate_limited:
+        assert health.errors == 1
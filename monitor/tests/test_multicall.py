@@ -0,0 +1,103 @@
+import asyncio
+from eth_abi import decode, encode
+from web3 import AsyncWeb3
+from web3.providers.async_base import AsyncJSONBaseProvider
+from multicall import MULTICALL3_ADDRESS, SELECTORS, Multicall, decode_string, decode_uint, encode_call
+from SPXfucked import TokenTracker
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+TOKEN = AsyncWeb3.to_checksum_address("0x" + "11" * 20)
+BROKEN = AsyncWeb3.to_checksum_address("0x" + "22" * 20)
+PAIR = AsyncWeb3.to_checksum_address("0x" + "33" * 20)
+
+class Multicall3Provider(AsyncJSONBaseProvider):
+    """Answers eth_call to Multicall3 from a table of (target, selector) -> return data (None reverts)"""
+
+    def __init__(self, contracts):
+        super().__init__()
+        self.contracts = {(target.lower(), selector): data for (target, selector), data in contracts.items()}
+        self.batches = []
+
+    async def make_request(self, method, params):
+        if method == 'eth_chainId':
+            return {'jsonrpc': '2.0', 'id': 1, 'result': '0x1'}
+        assert method == 'eth_call'
+        call = params[0]
+        assert call['to'].lower() == MULTICALL3_ADDRESS.lower()
+        data = bytes.fromhex(call['data'][2:])
+        calls = decode(['(address,bool,bytes)[]'], data[4:])[0]
+        self.batches.append(len(calls))
+
+        results = []
+        for target, allow_failure, calldata in calls:
+            assert allow_failure
+            returned = self.contracts.get((target.lower(), calldata[:4]))
+            results.append((False, b'') if returned is None else (True, returned))
+        return {'jsonrpc': '2.0', 'id': 1, 'result': '0x' + encode(['(bool,bytes)[]'], [results]).hex()}
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+
+def make_tracker(contracts, batch_size=150):
+    provider = Multicall3Provider(contracts)
+    web3 = AsyncWeb3(provider)
+    tracker = TokenTracker.__new__(TokenTracker)
+    tracker.multicall = Multicall(lambda: web3, batch_size=batch_size)
+    tracker.weth_address = WETH
+    tracker.uniswap_factory_address = '0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f'
+    return tracker, provider
+
+def test_encode_call_and_decoders():
+    assert encode_call('decimals') == SELECTORS['decimals']
+    calldata = encode_call('getPair', ('address', 'address'), (TOKEN, WETH))
+    assert calldata[:4] == SELECTORS['getPair']
+    assert decode(['address', 'address'], calldata[4:]) == (TOKEN.lower(), WETH.lower())
+
+    assert decode_string(encode(['string'], ['Token'])) == 'Token'
+    assert decode_string(b'MKR'.ljust(32, b'\x00')) == 'MKR'  # bytes32 symbol of old tokens
+    assert decode_string(b'') is None
+    assert decode_uint(encode(['uint256'], [18])) == 18
+    assert decode_uint(b'\x01') is None
+
+def test_aggregate3_splits_batches_and_keeps_order():
+    contracts = {(f"0x{index:040x}", SELECTORS['decimals']): encode(['uint8'], [index]) for index in range(1, 8)}
+    tracker, provider = make_tracker(contracts, batch_size=3)
+    calls = [(AsyncWeb3.to_checksum_address(f"0x{index:040x}"), encode_call('decimals')) for index in range(1, 8)]
+
+    results = asyncio.run(tracker.multicall.aggregate3(calls))
+    assert sorted(provider.batches) == [1, 3, 3]
+    assert [decode_uint(data) for _, data in results] == list(range(1, 8))
+    assert tracker.multicall.get_stats() == {"requests": 3, "calls": 7}
+
+def test_failed_sub_calls_do_not_fail_the_batch():
+    contracts = {
+        (TOKEN, SELECTORS['name']): encode(['string'], ['Token']),
+        (TOKEN, SELECTORS['decimals']): encode(['uint8'], [9]),
+        (TOKEN, SELECTORS['totalSupply']): encode(['uint256'], [10 ** 18]),
+        # symbol() reverts; BROKEN has no readable decimals or totalSupply
+        (BROKEN, SELECTORS['name']): encode(['string'], ['Broken']),
+    }
+    tracker, provider = make_tracker(contracts)
+
+    metadata = asyncio.run(tracker.get_token_metadata_many([TOKEN, BROKEN]))
+    assert provider.batches == [8]
+    assert metadata[TOKEN] == {'name': 'Token', 'symbol': None, 'decimals': 9, 'total_supply': 10 ** 18}
+    assert metadata[BROKEN] is None
+
+def test_pairs_and_reserves_decode_per_call():
+    factory = '0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f'
+    contracts = {
+        (factory, SELECTORS['getPair']): encode(['address'], [PAIR]),
+        (PAIR, SELECTORS['getReserves']): encode(['uint112', 'uint112', 'uint32'], [5, 7, 123]),
+    }
+    tracker, _ = make_tracker(contracts)
+
+    pairs = asyncio.run(tracker.get_pairs_many([TOKEN]))
+    assert pairs == {TOKEN: PAIR}
+    reserves = asyncio.run(tracker.get_reserves_many([PAIR, BROKEN]))
+    assert reserves == {PAIR: (5, 7, 123), BROKEN: None}
+
+def test_zero_address_pair_is_none():
+    factory = '0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f'
+    tracker, _ = make_tracker({(factory, SELECTORS['getPair']): encode(['address'], ['0x' + '00' * 20])})
+    assert asyncio.run(tracker.get_pairs_many([TOKEN])) == {TOKEN: None}
@@ -0,0 +1,55 @@
+import glob
+import os
+import pytest
+from bench_normalizer import legacy_goplus_values, legacy_honeypot_values, load_samples
+from normalizer import GOPLUS_FIELDS, HONEYPOT_FIELDS, normalize_goplus, normalize_honeypot
+
+TOKEN = "0x00000000000000000000000000000000000003e9"
+API_LOGS = os.path.join(os.path.dirname(__file__), '..', 'api_logs')
+
+# prepare_goplus_values never stored the display-only columns
+GOPLUS_COLUMNS = [column for column, _, _, _ in GOPLUS_FIELDS if column not in ('gp_token_name', 'gp_token_symbol', 'gp_is_honeypot')]
+HONEYPOT_COLUMNS = [column for column, _, _, _ in HONEYPOT_FIELDS]
+
+def assert_parity(honeypot_data, goplus_data, address):
+    hp = normalize_honeypot(honeypot_data)
+    gp = normalize_goplus(goplus_data, address)
+    assert [hp[column] for column in HONEYPOT_COLUMNS] == legacy_honeypot_values(honeypot_data)
+    assert [gp[column] for column in GOPLUS_COLUMNS] == list(legacy_goplus_values(goplus_data, address))
+
+def test_captured_responses_match_the_previous_code():
+    samples = load_samples(sorted(glob.glob(os.path.join(API_LOGS, 'api_calls_*.json*'))))
+    assert samples
+    for honeypot_data, goplus_data, address in samples:
+        assert_parity(honeypot_data, goplus_data, address)
+
+@pytest.mark.parametrize("honeypot_data, token_data", [
+    ({}, {}),
+    # Present but None: JSON columns store "null", GoPlus strings ''
+    ({'flags': None, 'simulationSuccess': None, 'honeypotResult': {'isHoneypot': None}},
+     {'trust_list': None, 'holders': None, 'dex': None, 'total_supply': None, 'note': None, 'holder_count': None}),
+    # GoPlus conversion errors store the default
+    ({'simulationResult': {'buyTax': '5', 'buyGas': 21000}},
+     {'holder_count': 'n/a', 'buy_tax': '', 'owner_percent': '1.5%', 'is_proxy': True, 'lp_holder_count': '12.7'}),
+])
+def test_edge_values_match_the_previous_code(honeypot_data, token_data):
+    assert_parity(honeypot_data, {'code': 1, 'result': {TOKEN: token_data}}, TOKEN)
+
+def test_none_json_columns_store_null():
+    assert normalize_honeypot({'flags': None})['hp_flags'] == 'null'
+    gp = normalize_goplus({'result': {TOKEN: {'trust_list': None, 'holders': None}}}, TOKEN)
+    assert (gp['gp_trust_list'], gp['gp_holders']) == ('null', 'null')
+    gp = normalize_goplus({'result': {TOKEN: {}}}, TOKEN)
+    assert (gp['gp_trust_list'], gp['gp_holders']) == ('{}', '[]')
+
+@pytest.mark.parametrize("honeypot_data, error", [
+    ({'simulationResult': {'buyTax': 'n/a'}}, ValueError),
+    ({'simulationResult': {'sellGas': None}}, TypeError),
+    ({'pair': {'liquidity': None}}, TypeError),
+    ({'token': None}, AttributeError),
+])
+def test_malformed_honeypot_values_raise(honeypot_data, error):
+    with pytest.raises(error):
+        legacy_honeypot_values(honeypot_data)
+    with pytest.raises(error):
+        normalize_honeypot(honeypot_data)
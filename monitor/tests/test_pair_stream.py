@@ -0,0 +1,210 @@
+import asyncio
+import os
+import re
+from eth_abi import encode
+from event_logs import PAIR_CREATED_TOPIC, decode_pair_created
+from GX_Scancheck import TokenChecker
+from pair_stream import PairCreatedPoller, PairEventLog
+
+FACTORY = "0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f"
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+
+def block_hash(number: int, fork: int = 0) -> bytes:
+    return bytes([fork]) + number.to_bytes(31, 'big')
+
+def address(n: int) -> str:
+    return '0x' + n.to_bytes(20, 'big').hex()
+
+def pair_log(number: int, log_index: int = 0, fork: int = 0, removed: bool = False) -> dict:
+    """Raw PairCreated log of token (1000 + number) / WETH"""
+    return {
+        'address': FACTORY,
+        'topics': [
+            PAIR_CREATED_TOPIC,
+            bytes(12) + bytes.fromhex(address(1000 + number)[2:]),
+            bytes(12) + bytes.fromhex(WETH[2:])
+        ],
+        'data': encode(['address', 'uint256'], [address(5000 + number), number]),
+        'blockNumber': number,
+        'blockHash': block_hash(number, fork),
+        'logIndex': log_index,
+        'transactionHash': block_hash(number, 0xEE),
+        'removed': removed
+    }
+
+def chain(web3, head: int, fork_from: int = None):
+    """Canonical blocks up to head, with blocks >= fork_from on fork 1"""
+    web3.eth.head = head
+    web3.eth.blocks = {
+        number: {'hash': block_hash(number, 1 if fork_from is not None and number >= fork_from else 0), 'timestamp': number}
+        for number in range(head + 1)
+    }
+
+def make_poller(web3, confirmations: int = 2, finality_blocks: int = 6) -> PairCreatedPoller:
+    poller = PairCreatedPoller(lambda: web3, FACTORY, confirmations=confirmations, finality_blocks=finality_blocks)
+    poller.start_at(100)
+    return poller
+
+# ----------------------------------------------------------------------
+# PairCreatedPoller
+# ----------------------------------------------------------------------
+def test_events_wait_for_confirmations(stub_web3):
+    web3 = stub_web3(logs=[pair_log(101)])
+    poller = make_poller(web3)
+
+    chain(web3, 102)
+    confirmed, reorged = asyncio.run(poller.poll())
+    assert confirmed == [] and reorged == []
+    assert len(poller.pending) == 1
+
+    chain(web3, 103)
+    confirmed, reorged = asyncio.run(poller.poll())
+    assert [event['block_number'] for event in confirmed] == [101]
+    assert reorged == [] and poller.pending == {}
+
+    # Watched until final, then forgotten; never released twice
+    chain(web3, 107)
+    assert asyncio.run(poller.poll()) == ([], [])
+    assert poller.released == {}
+
+def test_removed_pending_event_is_dropped(stub_web3):
+    web3 = stub_web3(logs=[pair_log(101)])
+    poller = make_poller(web3)
+    chain(web3, 102)
+    asyncio.run(poller.poll())
+
+    web3.eth.logs = [pair_log(101, removed=True)]
+    chain(web3, 103)
+    assert asyncio.run(poller.poll()) == ([], [])
+    assert poller.pending == {} and poller.total_reorged == 1
+
+def test_released_event_missing_after_reorg_is_rolled_back(stub_web3):
+    web3 = stub_web3(logs=[pair_log(101)])
+    poller = make_poller(web3)
+    chain(web3, 103)
+    confirmed, _ = asyncio.run(poller.poll())
+    assert len(confirmed) == 1
+
+    # Block 101 was replaced: the log is gone and the block hash changed
+    web3.eth.logs = []
+    chain(web3, 104, fork_from=101)
+    confirmed, reorged = asyncio.run(poller.poll())
+    assert confirmed == []
+    assert [event['pair'] for event in reorged] == [decode_pair_created(pair_log(101))['pair']]
+    assert poller.released == {}
+
+def test_missing_log_on_unchanged_block_is_kept(stub_web3):
+    web3 = stub_web3(logs=[pair_log(101)])
+    poller = make_poller(web3)
+    chain(web3, 103)
+    asyncio.run(poller.poll())
+
+    # A lagging node omits the log but the block hash is unchanged: not a reorg
+    web3.eth.logs = []
+    chain(web3, 104)
+    assert asyncio.run(poller.poll()) == ([], [])
+    assert len(poller.released) == 1 and poller.total_reorged == 0
+
+def test_removed_released_event_is_rolled_back(stub_web3):
+    web3 = stub_web3(logs=[pair_log(101)])
+    poller = make_poller(web3)
+    chain(web3, 103)
+    asyncio.run(poller.poll())
+
+    web3.eth.logs = [pair_log(101, removed=True)]
+    chain(web3, 104)
+    _, reorged = asyncio.run(poller.poll())
+    assert [event['block_number'] for event in reorged] == [101]
+
+# ----------------------------------------------------------------------
+# PairEventLog
+# ----------------------------------------------------------------------
+def make_log(session_db) -> PairEventLog:
+    checker = TokenChecker.__new__(TokenChecker)
+    session_db.write_sync(checker.create_schema)
+    return PairEventLog(session_db)
+
+def scan_record(session_db, token_address: str):
+    return session_db.fetchone_sync(
+        'SELECT status, pair_address, total_scans FROM scan_records WHERE token_address = ?', (token_address,)
+    )
+
+def test_record_advances_cursor_once(session_db):
+    pair_events = make_log(session_db)
+    first, second = decode_pair_created(pair_log(101)), decode_pair_created(pair_log(102, log_index=3))
+    token = address(1101)
+
+    assert asyncio.run(pair_events.record(first, token)) is True
+    assert asyncio.run(pair_events.record(second, address(1102))) is True
+    assert asyncio.run(pair_events.record(first, token)) is False  # Already recorded
+    assert pair_events.load_cursor() == (102, 3)
+
+def test_rollback_tombstones_scanned_pair_and_rewinds_cursor(session_db):
+    pair_events = make_log(session_db)
+    first, second = decode_pair_created(pair_log(101)), decode_pair_created(pair_log(102))
+    asyncio.run(pair_events.record(first, address(1101)))
+    asyncio.run(pair_events.record(second, address(1102)))
+    session_db.write_sync(lambda db: db.execute(
+        "INSERT INTO scan_records (token_address, pair_address, scan_timestamp, total_scans, status) VALUES (?, ?, '2024-01-01 00:00:00', 3, 'active')",
+        (address(1102), second['pair'])
+    ))
+
+    assert asyncio.run(pair_events.rollback(second)) is True
+    assert scan_record(session_db, address(1102)) == ('reorged', second['pair'], 3)
+    assert pair_events.load_cursor() == (101, 0)
+    assert asyncio.run(pair_events.rollback(second)) is False  # Already rolled back
+
+def test_rollback_before_scan_leaves_tombstone(session_db):
+    pair_events = make_log(session_db)
+    event = decode_pair_created(pair_log(101))
+    token = address(1101)
+    asyncio.run(pair_events.record(event, token))
+
+    # Still queued, no scan row yet: a tombstone keeps the later persist from inserting it as active
+    assert asyncio.run(pair_events.rollback(event)) is True
+    assert scan_record(session_db, token) == ('reorged', event['pair'], 0)
+    assert pair_events.load_cursor() is None
+
+    # Mined again on the new chain: the position is reused and the tombstone dropped
+    remined = decode_pair_created(pair_log(101, fork=1))
+    assert asyncio.run(pair_events.record(remined, token)) is True
+    assert scan_record(session_db, token) is None
+    assert pair_events.load_cursor() == (101, 0)
+
+# ----------------------------------------------------------------------
+# Backend reads of scan_records
+# ----------------------------------------------------------------------
+BACKEND = os.path.join(os.path.dirname(__file__), '..', '..', 'backend', 'index.js')
+
+def backend_scan_queries():
+    """Every SQL string backend/index.js passes to db.get/db.all that reads scan_records"""
+    with open(BACKEND, encoding='utf-8') as f:
+        source = f.read()
+    literals = re.findall(r"db\.(?:get|all)\(\s*(`[^`]*`|'[^']*'|\"[^\"]*\")", source)
+    return [literal[1:-1] for literal in literals if 'scan_records' in literal]
+
+def test_rolled_back_pair_never_reaches_backend_queries(session_db):
+    pair_events = make_log(session_db)
+    scanned, queued, live = (decode_pair_created(pair_log(n)) for n in (101, 102, 103))
+    for event in (scanned, queued, live):
+        asyncio.run(pair_events.record(event, address(1000 + event['block_number'])))
+    for event in (scanned, live):
+        session_db.write_sync(lambda db, event=event: db.execute(
+            "INSERT INTO scan_records (token_address, pair_address, scan_timestamp, total_scans, status) VALUES (?, ?, '2024-01-01 00:00:00', 1, 'active')",
+            (address(1000 + event['block_number']), event['pair'])
+        ))
+
+    # One tombstoned after its scan, one before (a fresh scan_timestamp, so it sorts first)
+    asyncio.run(pair_events.rollback(scanned))
+    asyncio.run(pair_events.rollback(queued))
+    reorged = {address(1101), address(1102)}
+
+    queries = backend_scan_queries()
+    assert len(queries) >= 8
+    for query in queries:
+        for token in (*reorged, address(1103)):
+            params = (token,) * query.count('?')
+            returned = {row[0] for row in session_db.fetchall_sync(f"SELECT token_address FROM ({query})", params)}
+            assert not returned & reorged, query
+            if not params or token == address(1103):
+                assert address(1103) in returned, query
@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+import rate_limiter
+from web3 import AsyncHTTPProvider
+from rate_limiter import RateScheduler, TokenBucket, rate_scheduler
+
+class FakeClock:
+    """time.monotonic and asyncio.sleep for rate_limiter, where sleeping just advances the clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", clock.sleep)
+    return clock
+
+def test_burst_is_served_without_waiting(clock):
+    bucket = TokenBucket("test", rate=2.0, capacity=5)
+    waits = [asyncio.run(bucket.acquire()) for _ in range(5)]
+    assert waits == [0.0] * 5 and clock.sleeps == []
+
+    # The sixth request waits for one token at 2 tokens/s
+    assert asyncio.run(bucket.acquire()) == pytest.approx(0.5)
+    assert bucket.total_acquired == 6 and bucket.total_waits == 1
+
+def test_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket("test", rate=2.0, capacity=5)
+    for _ in range(5):
+        asyncio.run(bucket.acquire())
+
+    clock.now += 1.0
+    bucket.refill()
+    assert bucket.tokens == pytest.approx(2.0)
+
+    clock.now += 60.0
+    bucket.refill()
+    assert bucket.tokens == 5.0
+
+def test_sustained_rate_matches_quota(clock):
+    bucket = TokenBucket("test", rate=10.0, capacity=1)
+    started = clock.now
+    for _ in range(100):
+        asyncio.run(bucket.acquire())
+    # One token up front, then 99 at 10/s
+    assert clock.now - started == pytest.approx(9.9)
+
+def test_pause_blocks_until_the_backoff_ends(clock):
+    bucket = TokenBucket("test", rate=100.0, capacity=10)
+    bucket.pause(30)
+    assert asyncio.run(bucket.acquire()) == pytest.approx(30.0)
+    assert bucket.tokens == pytest.approx(9.0)  # Refilled while blocked
+
+def test_scheduler_quota_comes_from_config():
+    scheduler = RateScheduler()
+    scheduler.configure({"goplus": {"requests_per_minute": 90}})
+    bucket = scheduler.get_bucket("goplus")
+    assert (bucket.rate, bucket.capacity) == (1.5, 5.0)  # Burst kept from the defaults
+
+def test_key_buckets_share_the_upstream_quota_but_not_tokens():
+    scheduler = RateScheduler()
+    scheduler.configure({"infura": {"requests_per_minute": 120, "burst": 3}})
+    first, second = scheduler.get_bucket("infura:aaaa"), scheduler.get_bucket("infura:bbbb")
+
+    assert first is not second
+    assert (first.rate, first.capacity) == (2.0, 3.0)
+    assert (second.rate, second.capacity) == (2.0, 3.0)
+    assert scheduler.get_bucket("infura:aaaa") is first
+
+    # Draining one key leaves the other untouched
+    for _ in range(3):
+        asyncio.run(first.acquire())
+    assert first.tokens < 1 and second.tokens == 3.0
+
+def test_unknown_upstream_gets_sixty_per_minute():
+    bucket = RateScheduler().get_bucket("other:1")
+    assert (bucket.rate, bucket.capacity) == (1.0, 1.0)
+
+def test_configure_recreates_key_buckets():
+    scheduler = RateScheduler()
+    old = scheduler.get_bucket("infura:aaaa")
+    scheduler.configure({"infura": {"requests_per_minute": 60, "burst": 1}})
+    new = scheduler.get_bucket("infura:aaaa")
+    assert new is not old and new.capacity == 1.0
+
+def test_each_key_provider_takes_its_own_bucket(key_manager, monkeypatch):
+    async def answer(self, method, params):
+        return {"jsonrpc": "2.0", "id": 1, "result": "0x1"}
+    monkeypatch.setattr(AsyncHTTPProvider, "make_request", answer)
+
+    first, second = (key_manager.get_web3(key).provider for key in key_manager.infura_keys)
+    assert first.bucket != second.bucket and first.bucket.startswith("infura:")
+
+    for _ in range(3):
+        asyncio.run(first.make_request("eth_blockNumber", []))
+    asyncio.run(second.make_request("eth_blockNumber", []))
+    assert rate_scheduler.get_bucket(first.bucket).total_acquired == 3
+    assert rate_scheduler.get_bucket(second.bucket).total_acquired == 1
@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+import response_cache
+from api_wrapper import goplus_cacheable
+from response_cache import ResponseCache
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, "time", clock.time)
+    return clock
+
+def make_cache(tmp_path, name="api_cache.db"):
+    return ResponseCache({"path": str(tmp_path / name), "ttl": {"goplus": 300}, "stale": {"goplus": 600}})
+
+class Fetcher:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.responses[min(self.calls, len(self.responses)) - 1]
+
+def test_fresh_stale_and_expired(tmp_path, clock):
+    fetch = Fetcher({"v": 1}, {"v": 2}, {"v": 3})
+
+    async def run():
+        cache = make_cache(tmp_path)
+        assert await cache.get_or_fetch("goplus", "0x01", fetch) == {"v": 1}
+        clock.now += 299
+        assert await cache.get_or_fetch("goplus", "0x01", fetch) == {"v": 1}  # Fresh: no call
+        assert fetch.calls == 1
+
+        clock.now += 2  # Stale: old value now, one background refresh
+        assert await cache.get_or_fetch("goplus", "0x01", fetch) == {"v": 1}
+        assert await cache.get_or_fetch("goplus", "0x01", fetch) == {"v": 1}
+        await asyncio.gather(*cache.tasks)
+        assert fetch.calls == 2
+        assert await cache.get_or_fetch("goplus", "0x01", fetch) == {"v": 2}
+
+        clock.now += 901  # Past TTL + stale window: a plain miss
+        assert await cache.get_or_fetch("goplus", "0x01", fetch) == {"v": 3}
+        assert fetch.calls == 3
+        assert cache.get_stats() == {"entries": 1, "hits": 2, "stale_hits": 2, "misses": 2}
+        await cache.close()
+    asyncio.run(run())
+
+def test_uncacheable_responses_are_refetched(tmp_path, clock):
+    not_indexed = {"code": 1, "message": "OK", "result": {}}
+    rate_limited = {"code": 4029, "message": "limit", "result": {"0xab": {"token_name": "x"}}}
+    indexed = {"code": 1, "message": "OK", "result": {"0xab": {"token_name": "x"}}}
+    fetch = Fetcher({}, not_indexed, rate_limited, indexed)
+
+    async def run():
+        cache = make_cache(tmp_path)
+        for expected in ({}, not_indexed, rate_limited, indexed, indexed):
+            assert await cache.get_or_fetch("goplus", "0xab", fetch, cacheable=goplus_cacheable("0xAB")) == expected
+        assert fetch.calls == 4
+        await cache.close()
+    asyncio.run(run())
+
+def test_entries_survive_a_restart(tmp_path, clock):
+    fetch = Fetcher({"v": 1})
+
+    async def run():
+        cache = make_cache(tmp_path)
+        await cache.get_or_fetch("goplus", "0x01", fetch)
+        await cache.close()
+
+        restarted = make_cache(tmp_path)
+        assert await restarted.get_or_fetch("goplus", "0x01", fetch) == {"v": 1}
+        assert fetch.calls == 1
+        await restarted.close()
+    asyncio.run(run())
+
+def test_lru_evicts_least_recently_used(tmp_path, clock):
+    async def run():
+        cache = ResponseCache({"path": str(tmp_path / "api_cache.db"), "max_entries": 2})
+        for key in ("0x01", "0x02"):
+            await cache.get_or_fetch("goplus", key, Fetcher({"key": key}))
+        await cache.lookup("goplus", "0x01")  # 0x02 is now the least recently used
+        await cache.get_or_fetch("goplus", "0x03", Fetcher({"key": "0x03"}))
+        assert list(cache.memory) == [("goplus", "0x01"), ("goplus", "0x03")]
+        await cache.close()
+    asyncio.run(run())
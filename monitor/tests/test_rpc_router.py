@@ -0,0 +1,118 @@
+import asyncio
+import time
+import pytest
+from web3 import AsyncHTTPProvider
+from key_manager import INFURA_BASE_URL
+from rpc_router import RpcRouter
+
+KEY_A, KEY_B = "a" * 32, "b" * 32
+URL_A, URL_B = INFURA_BASE_URL + KEY_A, INFURA_BASE_URL + KEY_B
+NODE = "http://node.local:8545"
+OK = {'jsonrpc': '2.0', 'id': 1, 'result': '0x10'}
+RATE_LIMITED = {'jsonrpc': '2.0', 'id': 1, 'error': {'code': -32005, 'message': 'daily request count exceeded'}}
+
+@pytest.fixture
+def endpoints(monkeypatch):
+    """Per-URL behaviour of the HTTP providers: (delay, response or exception); records every request"""
+    behaviour = {}
+    requests = []
+
+    async def respond(self, method, params):
+        requests.append((self.endpoint_uri, method))
+        delay, outcome = behaviour.get(self.endpoint_uri, (0, OK))
+        await asyncio.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    monkeypatch.setattr(AsyncHTTPProvider, "make_request", respond)
+    return behaviour, requests
+
+def make_router(key_manager, rpc_urls=(), hedge=True):
+    router = RpcRouter(key_manager, list(rpc_urls), hedge=hedge)
+    # Key A is the faster key, with enough samples for a p95 of 10ms
+    for _ in range(20):
+        key_manager.health[KEY_A].record_success(0.01)
+        key_manager.health[KEY_B].record_success(0.05)
+    return router
+
+def request(router, method="eth_blockNumber"):
+    return asyncio.run(router.make_request(method, []))
+
+def test_request_goes_to_the_healthiest_endpoint(key_manager, endpoints):
+    _, requests = endpoints
+    router = make_router(key_manager)
+    assert request(router) == OK
+    assert requests == [(URL_A, "eth_blockNumber")]
+
+def test_error_fails_over_to_the_next_endpoint(key_manager, endpoints):
+    behaviour, requests = endpoints
+    behaviour[URL_A] = (0, ConnectionError("reset"))
+    router = make_router(key_manager, hedge=False)
+
+    assert request(router) == OK
+    assert [url for url, _ in requests] == [URL_A, URL_B]
+    assert router.total_failovers == 1 and key_manager.health[KEY_A].errors == 1
+
+def test_rate_limit_fails_over_and_cools_the_key_down(key_manager, endpoints):
+    behaviour, requests = endpoints
+    behaviour[URL_A] = (0, RATE_LIMITED)
+    router = make_router(key_manager, hedge=False)
+
+    assert request(router) == OK
+    assert key_manager.health[KEY_A].cooling_down(time.monotonic())
+
+    # Skipped while cooling down
+    requests.clear()
+    request(router)
+    assert [url for url, _ in requests] == [URL_B]
+
+def test_every_endpoint_failing_raises_the_last_error(key_manager, endpoints):
+    behaviour, requests = endpoints
+    behaviour[URL_A] = (0, ConnectionError("a down"))
+    behaviour[URL_B] = (0, ConnectionError("b down"))
+    behaviour[NODE] = (0, ConnectionError("node down"))
+    router = make_router(key_manager, [NODE], hedge=False)
+
+    with pytest.raises(ConnectionError):
+        request(router)
+    assert sorted(url for url, _ in requests) == sorted([URL_A, URL_B, NODE])  # Each tried once
+
+def test_slow_primary_is_hedged(key_manager, endpoints):
+    behaviour, requests = endpoints
+    behaviour[URL_A] = (1.0, OK)
+    router = make_router(key_manager)
+
+    started = time.monotonic()
+    assert request(router) == OK
+    assert time.monotonic() - started < 0.5
+    assert [url for url, _ in requests] == [URL_A, URL_B]
+    assert (router.total_hedged, router.total_hedge_wins) == (1, 1)
+
+def test_fast_primary_is_not_hedged(key_manager, endpoints):
+    _, requests = endpoints
+    router = make_router(key_manager)
+    request(router)
+    assert len(requests) == 1 and router.total_hedged == 0
+
+def test_transactions_are_never_hedged(key_manager, endpoints):
+    behaviour, requests = endpoints
+    behaviour[URL_A] = (0.1, OK)
+    router = make_router(key_manager)
+
+    assert request(router, "eth_sendRawTransaction") == OK
+    assert requests == [(URL_A, "eth_sendRawTransaction")]
+    assert router.total_hedged == 0
+
+def test_waits_when_every_endpoint_is_cooling_down(key_manager, endpoints):
+    router = make_router(key_manager)
+    for key in (KEY_A, KEY_B):
+        key_manager.health[key].cooldown_until = time.monotonic() + 0.05
+
+    started = time.monotonic()
+    assert request(router) == OK
+    assert time.monotonic() - started >= 0.04
+
+def test_infura_urls_of_configured_keys_are_not_added_twice(key_manager, endpoints):
+    router = RpcRouter(key_manager, [URL_A, NODE, NODE, ""])
+    assert [endpoint.name for endpoint in router.endpoints] == ["infura 0", "infura 1", "rpc 1"]
+    assert router.get_all_rpc_urls() == [URL_A, URL_B, NODE]
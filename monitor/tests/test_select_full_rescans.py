@@ -0,0 +1,91 @@
+import asyncio
+from datetime import datetime, timedelta
+from GX_Scancheck import TokenChecker
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+LOW_TOKEN = "0x1000000000000000000000000000000000000001"   # Sorts before WETH: WETH is token1
+HIGH_TOKEN = "0xf000000000000000000000000000000000000001"  # Sorts after WETH: WETH is token0
+PAIR = "0x00000000000000000000000000000000000000AA"
+
+class ReserveTracker:
+    """The parts of TokenTracker select_full_rescans uses"""
+
+    def __init__(self, reserves=None, error=None):
+        self.weth_address = WETH
+        self.reserves = reserves or {}
+        self.error = error
+
+    async def get_reserves_many(self, pairs):
+        if self.error:
+            raise self.error
+        return {pair: self.reserves.get(pair) for pair in pairs}
+
+def make_checker(tracker, **settings):
+    checker = TokenChecker.__new__(TokenChecker)
+    checker.tracker = tracker
+    checker.rescan_config = {'light_rescan': True, 'full_rescan_interval': 3600, 'reserve_change_threshold': 0.05, **settings}
+    checker.reserve_baseline = {}
+    return checker
+
+def row(token=LOW_TOKEN, pair=PAIR, age_seconds=60, liquidity=1000.0):
+    scanned = (datetime.now() - timedelta(seconds=age_seconds)).strftime('%Y-%m-%d %H:%M:%S')
+    return (token, pair, 3, scanned, liquidity)
+
+def select(checker, rows):
+    return asyncio.run(checker.select_full_rescans(rows))
+
+def test_first_scan_sets_the_baseline():
+    checker = make_checker(ReserveTracker({PAIR: (500, 100, 0)}))
+    full, light = select(checker, [row()])
+    assert [r[0] for r in full] == [LOW_TOKEN] and light == []
+    assert checker.reserve_baseline[LOW_TOKEN.lower()] == 100  # WETH is token1 for LOW_TOKEN
+
+def test_small_move_is_estimated_from_the_weth_reserve():
+    checker = make_checker(ReserveTracker({PAIR: (500, 104, 0)}))
+    checker.reserve_baseline[LOW_TOKEN.lower()] = 100
+
+    full, light = select(checker, [row(liquidity=1000.0)])
+    assert full == []
+    token, _, scan_no, liquidity, reserves0, reserves1 = light[0]
+    assert (token, scan_no, reserves0, reserves1) == (LOW_TOKEN, 3, '500', '104')
+    assert liquidity == 1040.0
+    assert checker.reserve_baseline[LOW_TOKEN.lower()] == 100  # Baseline only moves on full scans
+
+def test_move_over_threshold_forces_a_full_scan():
+    checker = make_checker(ReserveTracker({PAIR: (500, 105, 0)}))
+    checker.reserve_baseline[LOW_TOKEN.lower()] = 100
+
+    full, light = select(checker, [row()])
+    assert len(full) == 1 and light == []
+    assert checker.reserve_baseline[LOW_TOKEN.lower()] == 105
+
+def test_weth_is_token0_for_tokens_sorting_after_it():
+    checker = make_checker(ReserveTracker({PAIR: (100, 999999, 0)}))
+    checker.reserve_baseline[HIGH_TOKEN.lower()] = 100
+
+    # token1 moved a lot, but only the WETH side (token0) counts
+    full, light = select(checker, [row(token=HIGH_TOKEN)])
+    assert full == [] and light[0][3] == 1000.0
+
+def test_stale_full_scan_is_redone():
+    checker = make_checker(ReserveTracker({PAIR: (500, 100, 0)}), full_rescan_interval=600)
+    checker.reserve_baseline[LOW_TOKEN.lower()] = 100
+
+    full, light = select(checker, [row(age_seconds=601), row(token=HIGH_TOKEN, age_seconds=60)])
+    assert [r[0] for r in full] == [LOW_TOKEN, HIGH_TOKEN]  # HIGH_TOKEN has no baseline yet
+    assert light == []
+
+def test_unreadable_reserves_mean_full_scans():
+    checker = make_checker(ReserveTracker({}))
+    checker.reserve_baseline[LOW_TOKEN.lower()] = 100
+    rows = [row()]
+    assert select(checker, rows) == (rows, [])
+
+    checker = make_checker(ReserveTracker(error=ConnectionError("rpc down")))
+    checker.reserve_baseline[LOW_TOKEN.lower()] = 100
+    assert select(checker, rows) == (rows, [])
+
+def test_disabled_light_rescan_scans_everything():
+    checker = make_checker(ReserveTracker(error=AssertionError("reserves must not be read")), light_rescan=False)
+    rows = [row(), row(token=HIGH_TOKEN)]
+    assert select(checker, rows) == (rows, [])
@@ -0,0 +1,120 @@
+import asyncio
+import pytest
+from eth_abi import encode
+from web3 import AsyncWeb3
+from event_logs import SYNC_TOPIC
+from sync_tracker import SyncTracker
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+
+def token(n: int) -> str:
+    return "0x1" + f"{n:039x}"  # Sorts before WETH: WETH is reserve1
+
+def pair(n: int) -> str:
+    return AsyncWeb3.to_checksum_address("0x2" + f"{n:039x}")
+
+def sync_log(n: int, reserve0: int, reserve1: int, block: int, log_index: int = 0) -> dict:
+    return {
+        'address': pair(n),
+        'topics': [SYNC_TOPIC],
+        'data': encode(['uint112', 'uint112'], [reserve0, reserve1]),
+        'blockNumber': block,
+        'logIndex': log_index
+    }
+
+class Tracker:
+    def __init__(self, web3, reserves):
+        self.web3 = web3
+        self.weth_address = WETH
+        self.reserves = reserves  # pair -> (reserve0, reserve1, ts)
+
+    async def get_reserves_many(self, pairs):
+        return {AsyncWeb3.to_checksum_address(p): self.reserves.get(AsyncWeb3.to_checksum_address(p)) for p in pairs}
+
+class Checker:
+    """scan_records rows, a write-behind buffer that keeps what it is given, and a reserve_baseline to leave alone"""
+
+    def __init__(self, rows):
+        self.rows = rows  # (token_address, pair_address, total_scans, hp_liquidity_amount)
+        self.samples = []
+        self.reserve_baseline = {}
+        self.db = self
+        self.write_behind = self
+
+    async def fetchall(self, sql, params=()):
+        return list(self.rows)
+
+    async def put(self, fn, samples):
+        self.samples.extend(samples)
+
+    @staticmethod
+    def record_light_samples(db, samples):
+        pass
+
+def make_sync(stub_web3, rows, reserves, address_chunk=500):
+    web3 = stub_web3(head=100)
+    checker = Checker(rows)
+    sync = SyncTracker(Tracker(web3, reserves), checker, address_chunk=address_chunk)
+    return sync, web3, checker
+
+def test_first_poll_only_sets_the_start_block(stub_web3):
+    sync, web3, _ = make_sync(stub_web3, [], {})
+    assert asyncio.run(sync.poll()) == 0
+    assert sync.last_block == 100 and web3.eth.get_logs_calls == []
+
+def test_pair_addresses_are_chunked_per_get_logs_call(stub_web3):
+    rows = [(token(n), pair(n), 1, 10.0) for n in range(5)]
+    sync, web3, _ = make_sync(stub_web3, rows, {pair(n): (1, 100, 0) for n in range(5)}, address_chunk=2)
+    asyncio.run(sync.refresh_pairs())
+    asyncio.run(sync.poll())
+
+    web3.eth.head = 110
+    asyncio.run(sync.poll())
+    assert web3.eth.get_logs_calls == [(101, 110)] * 3
+    chunks = [params['address'] for params in web3.eth.get_logs_params]
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert sorted(address for chunk in chunks for address in chunk) == sorted(pair(n) for n in range(5))
+    assert all(params['topics'] == [SYNC_TOPIC] for params in web3.eth.get_logs_params)
+
+def test_liquidity_scales_from_the_reference_reserve(stub_web3):
+    rows = [(token(1), pair(1), 3, 1000.0), (token(2), pair(2), 1, 50.0)]
+    sync, web3, checker = make_sync(stub_web3, rows, {pair(1): (7, 100, 0), pair(2): (7, 200, 0)})
+    asyncio.run(sync.refresh_pairs())
+    asyncio.run(sync.poll())
+
+    # Two Syncs of pair 1 in the window: the latest wins. Pair 2 didn't trade
+    web3.eth.logs = [sync_log(1, 8, 105, 101), sync_log(1, 9, 110, 102, 1)]
+    web3.eth.head = 102
+    assert asyncio.run(sync.poll()) == 1
+    assert checker.samples == [(token(1), checker.samples[0][1], 3, pytest.approx(1100.0), '9', '110')]
+    assert checker.reserve_baseline == {}
+
+def test_full_scan_resets_the_reference(stub_web3):
+    rows = [(token(1), pair(1), 3, 1000.0)]
+    sync, web3, checker = make_sync(stub_web3, rows, {pair(1): (7, 100, 0)})
+    asyncio.run(sync.refresh_pairs())
+    asyncio.run(sync.poll())
+    web3.eth.logs = [sync_log(1, 8, 110, 101)]
+    web3.eth.head = 101
+    asyncio.run(sync.poll())
+
+    # A full scan at WETH reserve 110 measured 2000; later Syncs scale from there, not from 100
+    checker.rows = [(token(1), pair(1), 4, 2000.0)]
+    asyncio.run(sync.refresh_pairs())
+    web3.eth.logs.append(sync_log(1, 9, 121, 102))
+    web3.eth.head = 102
+    asyncio.run(sync.poll())
+    assert checker.samples[-1][2:4] == (4, pytest.approx(2200.0))
+
+    # A refresh without a new full scan keeps the reference
+    asyncio.run(sync.refresh_pairs())
+    assert sync.reference[pair(1).lower()] == (4, 110)
+    assert checker.reserve_baseline == {}
+
+def test_removed_pairs_are_dropped_on_refresh(stub_web3):
+    rows = [(token(1), pair(1), 1, 10.0), (token(2), pair(2), 1, 10.0)]
+    sync, _, checker = make_sync(stub_web3, rows, {pair(1): (1, 100, 0), pair(2): (1, 100, 0)})
+    asyncio.run(sync.refresh_pairs())
+    checker.rows = rows[:1]
+    asyncio.run(sync.refresh_pairs())
+    assert set(sync.pairs) == set(sync.reserves) == set(sync.reference) == {pair(1).lower()}
@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+from worker_pool import TokenWorkerPool
+
+TOKEN = "0x00000000000000000000000000000000000003E9"
+
+def test_duplicate_submit_shares_one_run():
+    calls = []
+    release = None
+
+    async def handler(token_address, pair_address):
+        calls.append(token_address)
+        await release.wait()
+        return pair_address
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        pool = TokenWorkerPool(handler, workers=2)
+        pool.start()
+        first = await pool.submit(TOKEN, "pair")
+        await asyncio.sleep(0)  # Picked up by a worker: deduplicated while in flight, too
+        second = await pool.submit(TOKEN.lower(), "other pair")
+        assert second is first and pool.in_flight == 1
+
+        release.set()
+        result = await first
+        await pool.join()
+        await pool.stop()
+        return pool, result
+
+    pool, result = asyncio.run(scenario())
+    assert calls == [TOKEN] and result == "pair"
+    assert pool.deduplicated == 1 and pool.processed == 1 and pool.in_flight == 0
+
+def test_token_can_be_resubmitted_after_completion():
+    calls = []
+
+    async def handler(token_address, pair_address):
+        calls.append(token_address)
+
+    async def scenario():
+        pool = TokenWorkerPool(handler, workers=1)
+        pool.start()
+        await (await pool.submit(TOKEN, "pair"))
+        await (await pool.submit(TOKEN, "pair"))
+        await pool.stop()
+        return pool
+
+    pool = asyncio.run(scenario())
+    assert len(calls) == 2 and pool.deduplicated == 0
+
+def test_handler_error_reaches_every_waiter():
+    async def handler(token_address, pair_address):
+        await asyncio.sleep(0)
+        raise ValueError("bad token")
+
+    async def scenario():
+        pool = TokenWorkerPool(handler, workers=1)
+        pool.start()
+        first = await pool.submit(TOKEN, "pair")
+        second = await pool.submit(TOKEN, "pair")
+        results = await asyncio.gather(first, second, return_exceptions=True)
+        await pool.stop()
+        return pool, results
+
+    pool, results = asyncio.run(scenario())
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    assert pool.failed == 1 and pool.in_flight == 0
+
+def test_concurrency_is_bounded_by_workers():
+    running = peak = 0
+
+    async def handler(token_address, pair_address):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async def scenario():
+        pool = TokenWorkerPool(handler, workers=3)
+        pool.start()
+        futures = [await pool.submit(f"0x{index:040x}", "pair") for index in range(10)]
+        await asyncio.gather(*futures)
+        await pool.stop()
+        return pool
+
+    pool = asyncio.run(scenario())
+    assert peak == 3 and pool.processed == 10
+
+def test_stop_cancels_the_running_future():
+    async def handler(token_address, pair_address):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        pool = TokenWorkerPool(handler, workers=1)
+        pool.start()
+        running = await pool.submit(TOKEN, "pair")
+        await asyncio.sleep(0)
+        await pool.stop()
+        return running
+
+    running = asyncio.run(scenario())
+    with pytest.raises(asyncio.CancelledError):
+        running.result()
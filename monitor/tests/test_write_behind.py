@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import pytest
+from session_db import WriteBehindBuffer
+
+@pytest.fixture
+def table(session_db):
+    session_db.write_sync(lambda db: db.execute("CREATE TABLE t (v INTEGER)"))
+    return session_db
+
+def insert(db, value):
+    db.execute("INSERT INTO t (v) VALUES (?)", (value,))
+    return value
+
+def insert_then_fail(db, value):
+    db.execute("INSERT INTO t (v) VALUES (?)", (value,))
+    raise ValueError("job failed")
+
+def count(db):
+    return db.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+def values(session_db):
+    return [row[0] for row in session_db.fetchall_sync("SELECT v FROM t ORDER BY rowid")]
+
+def test_failing_job_is_rolled_back_alone(table):
+    async def scenario():
+        buffer = WriteBehindBuffer(table, batch_size=10, flush_interval=60)
+        futures = [await buffer.put(insert, 1), await buffer.put(insert_then_fail, 2),
+                   await buffer.put(insert, 3), await buffer.put(count)]
+        await buffer.close()
+        return buffer, await asyncio.gather(*futures, return_exceptions=True)
+
+    buffer, results = asyncio.run(scenario())
+    assert results[0] == 1 and results[2] == 3
+    assert isinstance(results[1], ValueError)
+    assert results[3] == 2  # Jobs run in order and see the writes queued before them
+    assert values(table) == [1, 3]
+    assert (buffer.total_batches, buffer.total_jobs, buffer.failed_jobs) == (1, 4, 1)
+
+def test_full_batch_flushes_without_waiting_for_the_interval(table):
+    async def scenario():
+        buffer = WriteBehindBuffer(table, batch_size=3, flush_interval=60)
+        futures = [await buffer.put(insert, value) for value in range(3)]
+        results = await asyncio.wait_for(asyncio.gather(*futures), timeout=5)
+        await buffer.close()
+        return buffer, results
+
+    buffer, results = asyncio.run(scenario())
+    assert results == [0, 1, 2] and buffer.total_batches == 1
+
+def test_partial_batch_flushes_after_the_interval(table):
+    async def scenario():
+        buffer = WriteBehindBuffer(table, batch_size=100, flush_interval=0.05)
+        future = await buffer.put(insert, 7)
+        await asyncio.sleep(0)
+        queued = not future.done() and len(buffer.pending) == 1
+        result = await asyncio.wait_for(future, timeout=5)
+        await buffer.close()
+        return queued, result
+
+    queued, result = asyncio.run(scenario())
+    assert queued and result == 7
+    assert values(table) == [7]
+
+def test_put_waits_while_the_buffer_is_full(table):
+    release = threading.Event()
+
+    def slow_insert(db, value):
+        release.wait(5)
+        return insert(db, value)
+
+    async def scenario():
+        buffer = WriteBehindBuffer(table, batch_size=2, flush_interval=60, max_pending=2)
+        first = [await buffer.put(slow_insert, value) for value in range(2)]  # Full batch, stuck on the writer
+        blocked = asyncio.create_task(buffer.put(insert, 2))
+        await asyncio.sleep(0.05)
+        waiting = not blocked.done() and buffer.backpressure_waits == 1
+
+        release.set()
+        third = await asyncio.wait_for(blocked, timeout=5)
+        await asyncio.gather(*first)
+        await buffer.close()
+        return waiting, await third
+
+    waiting, result = asyncio.run(scenario())
+    assert waiting and result == 2
+    assert values(table) == [0, 1, 2]
@@ -0,0 +1,84 @@
+import json
+import sqlite3
+import pytest
+from GX_Scancheck import SCAN_RECORD_COLUMNS, TokenChecker
+
+TOKEN = "0x00000000000000000000000000000000000003e9"
+
+@pytest.fixture
+def checker_db():
+    """A schema-only TokenChecker (no tracker or session) on an in-memory database"""
+    checker = TokenChecker.__new__(TokenChecker)
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    checker.create_schema(conn)
+    yield checker, conn
+    conn.close()
+
+def make_record(**values):
+    record = {column: None for column in SCAN_RECORD_COLUMNS}
+    record.update({
+        'token_address': TOKEN,
+        'scan_timestamp': '2024-01-01 00:00:00',
+        'pair_address': '0x0000000000000000000000000000000000001389',
+        'token_name': 'Test',
+        'hp_is_honeypot': False,
+        'hp_buy_tax': 1.5,
+        'hp_pair_reserves0': '1000',
+        'gp_holder_count': 10,
+        'total_scans': 1,
+        'honeypot_failures': 0,
+        'status': 'active'
+    })
+    record.update(values)
+    return record
+
+def stored(conn):
+    row = conn.execute(f"SELECT {', '.join(SCAN_RECORD_COLUMNS)} FROM scan_records WHERE token_address = ?", (TOKEN,)).fetchone()
+    return dict(zip(SCAN_RECORD_COLUMNS, row)) if row else None
+
+def write(checker, conn, record):
+    return checker.write_scan_record(conn.cursor(), record, stored(conn))
+
+def test_new_token_is_inserted(checker_db):
+    checker, conn = checker_db
+    assert write(checker, conn, make_record()) is None
+    assert stored(conn)['token_name'] == 'Test'
+    assert conn.execute('SELECT COUNT(*) FROM scan_changes').fetchone()[0] == 0
+
+def test_unchanged_scan_only_touches_timestamps(checker_db):
+    checker, conn = checker_db
+    write(checker, conn, make_record())
+    # Same values in the types the normalizer produces (bool, float, int) against what SQLite returns
+    assert write(checker, conn, make_record(scan_timestamp='2024-01-01 00:05:00', total_scans=2)) == []
+    row = stored(conn)
+    assert (row['scan_timestamp'], row['total_scans']) == ('2024-01-01 00:05:00', 2)
+    assert conn.execute('SELECT COUNT(*) FROM scan_changes').fetchone()[0] == 0
+
+def test_changed_columns_are_updated_and_logged(checker_db):
+    checker, conn = checker_db
+    write(checker, conn, make_record())
+    changed = write(checker, conn, make_record(scan_timestamp='2024-01-01 00:05:00', total_scans=2, hp_buy_tax=5.0, gp_holder_count=12))
+    assert changed == ['hp_buy_tax', 'gp_holder_count']
+    assert (stored(conn)['hp_buy_tax'], stored(conn)['gp_holder_count']) == (5.0, 12)
+
+    logged = conn.execute('SELECT scan_timestamp, changed FROM scan_changes WHERE token_address = ?', (TOKEN,)).fetchone()
+    assert logged[0] == '2024-01-01 00:05:00'
+    assert json.loads(logged[1]) == {'hp_buy_tax': 5.0, 'gp_holder_count': 12}
+
+def test_row_removed_since_read_is_reinserted(checker_db):
+    checker, conn = checker_db
+    write(checker, conn, make_record())
+    previous = stored(conn)
+    conn.execute('DELETE FROM scan_records WHERE token_address = ?', (TOKEN,))  # e.g. moved to HONEYPOTS meanwhile
+
+    assert checker.write_scan_record(conn.cursor(), make_record(total_scans=2), previous) is None
+    assert stored(conn)['total_scans'] == 2
+
+def test_same_value_follows_sqlite_type_conversion():
+    assert TokenChecker.same_value(1, True)
+    assert TokenChecker.same_value(0, False)
+    assert TokenChecker.same_value('18', 18)
+    assert TokenChecker.same_value(1.5, 1.5)
+    assert not TokenChecker.same_value('18', '18.0')
+    assert not TokenChecker.same_value(None, '')
+    assert not TokenChecker.same_value(0, None)
@@ -0,0 +1,126 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List
+from terminal_display import log_message
+
+class TokenWorkerPool:
+    def __init__(self, handler: Callable[[str, str], Awaitable], workers: int = 4, max_queue: int = 0):
+        """
+        Bounded async worker pool for token processing
+
+        Args:
+            handler: Coroutine function called as handler(token_address, pair_address)
+            workers: Number of tokens processed concurrently
+            max_queue: Maximum queued tokens (0 = unbounded)
+        """
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(0, int(max_queue)))
+        self.pending: Dict[str, asyncio.Future] = {}  # token address (lowercase) -> completion future
+        self.tasks: List[asyncio.Task] = []
+
+        # Metrics
+        self.active = 0
+        self.processed = 0
+        self.failed = 0
+        self.deduplicated = 0
+        self.max_queue_depth = 0
+        self.total_wait_time = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of tokens waiting for a free worker"""
+        return self.queue.qsize()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of tokens queued or currently being processed"""
+        return len(self.pending)
+
+    def start(self) -> None:
+        """Start worker tasks (must be called from a running event loop)"""
+        if self.tasks:
+            return
+        for worker_id in range(self.workers):
+            self.tasks.append(asyncio.create_task(self.worker(worker_id)))
+        log_message(f"Token worker pool started with {self.workers} workers", "INFO")
+
+    async def submit(self, token_address: str, pair_address: str) -> asyncio.Future:
+        """
+        Queue a token for processing
+
+        If the same token is already queued or being processed, the existing
+        completion future is returned instead of scheduling a second run.
+
+        Returns:
+            Future resolved with the handler result once the token is processed
+        """
+        key = token_address.lower()
+        existing = self.pending.get(key)
+        if existing is not None:
+            self.deduplicated += 1
+            return existing
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[key] = future
+        await self.queue.put((key, token_address, pair_address, time.monotonic()))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return future
+
+    async def worker(self, worker_id: int) -> None:
+        """Pull tokens from the queue and process them until cancelled"""
+        while True:
+            key, token_address, pair_address, queued_at = await self.queue.get()
+            future = self.pending.get(key)
+            self.active += 1
+            self.total_wait_time += time.monotonic() - queued_at
+            try:
+                result = await self.handler(token_address, pair_address)
+                self.processed += 1
+                if future is not None and not future.done():
+                    future.set_result(result)
+            except asyncio.CancelledError:
+                if future is not None and not future.done():
+                    future.cancel()
+                raise
+            except Exception as e:
+                self.failed += 1
+                log_message(f"Worker {worker_id} failed processing {token_address}: {str(e)}", "ERROR")
+                if future is not None and not future.done():
+                    future.set_exception(e)
+                    # Mark retrieved so un-awaited futures don't warn on garbage collection
+                    future.exception()
+            finally:
+                self.active -= 1
+                self.pending.pop(key, None)
+                self.queue.task_done()
+
+    async def join(self) -> None:
+        """Wait until every queued token has been processed"""
+        await self.queue.join()
+
+    async def stop(self) -> None:
+        """Cancel all workers and wait for them to exit"""
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get a snapshot of pool metrics"""
+        started = self.processed + self.failed
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "active": self.active,
+            "processed": self.processed,
+            "failed": self.failed,
+            "deduplicated": self.deduplicated,
+            "max_queue_depth": self.max_queue_depth,
+            "avg_wait_seconds": (self.total_wait_time / started) if started else 0.0
+        }
+
+    def status_line(self) -> str:
+        """Compact status for the live spinner line"""
+        return f"Queue: {self.queue_depth} | Active: {self.active}/{self.workers}"